@@ -3,7 +3,9 @@
     [Parameter(Mandatory=$true)]
     [string]$testSettings,
 
-    [switch]$doc = $false
+    [switch]$doc = $false,
+
+    [switch]$sdkCsproj = $false
  )
 
 $visualStudioVersion = $env:VisualStudioVersion
@@ -24,6 +26,7 @@ $majorVersion = "4.0"
 $releaseVersion = "4.7.0"
 $assemblyInfoPath = "$sourceDir\AppProperties\AssemblyInfo.cs"
 $signKeyPath = "$sourceDir\dropbox_api_key.snk"
+$perTargetProjects = @("Dropbox.Api.Portable", "Dropbox.Api.Portable40")
 
 $builds = @(
     @{Name = "Dropbox.Api"; Configuration="Release"; SignAssembly=$true; TestsName="Dropbox.Api.Tests"},
@@ -32,6 +35,12 @@ $builds = @(
     @{Name = "Dropbox.Api.Doc"; Configuration="Release"; SignAssembly=$false; TestName=$null}
 )
 
+# With -sdkCsproj, Dropbox.Api.csproj builds all of the targets into bin\Release\<target>.
+if ($sdkCsproj)
+{
+    $builds = $builds | Where-Object { $perTargetProjects -notcontains $_.Name }
+}
+
 function RunCommand($command)
 {
     return & $command
@@ -71,6 +80,17 @@ function EnsurePythonExists()
     }
 }
 
+function EnsureDotNetExists()
+{
+    if ($sdkCsproj)
+    {
+        Write-Host "Checking dotnet..."
+        if (!(Get-Command "dotnet" -ErrorAction SilentlyContinue)) {
+            Write-Error "Cannot find dotnet.exe, it is needed to build the SDK-style project." -ErrorAction Stop
+        }
+    }
+}
+
 function EnsurePipExists()
 {
     Write-Host "Checking pip..."
@@ -91,7 +111,29 @@ function GenerateProjectFiles()
     [environment]::SetEnvironmentVariable("PYTHONPATH", $pythonPath)
     $files = Get-ChildItem "$specDir\*" -Include *.stone | Select -ExpandProperty FullName
 
-    RunCommand { python $generatorArgs $files }
+    $extraArgs = @()
+    if ($sdkCsproj)
+    {
+        $extraArgs = @("--", "--sdk-csproj")
+    }
+
+    RunCommand { python $generatorArgs $files $extraArgs }
+
+    if ($sdkCsproj)
+    {
+        RemovePerTargetProjects
+    }
+}
+
+function RemovePerTargetProjects()
+{
+    Write-Host "Removing the per target projects..."
+    foreach ($name in $perTargetProjects)
+    {
+        $projectPath = "$sourceDir\$name.csproj"
+        RunCommand { dotnet sln "$solutionDir\Dropbox.Api.sln" remove $projectPath }
+        Remove-Item $projectPath -ErrorAction SilentlyContinue
+    }
 }
 
 function RestoreNugetPackages()
@@ -202,6 +244,7 @@ function UpdateNugetSpec()
 EnsureNuGetExists
 EnsurePythonExists
 EnsurePipExists
+EnsureDotNetExists
 InstallStoneDependency
 EnsureVisualStudioVersion
 GenerateProjectFiles
@@ -7,8 +7,17 @@
 namespace Dropbox.Api.Tests
 {
     using System;
+    using System.Collections.Generic;
+    using System.IO;
+    using System.Linq;
+    using System.Net;
+    using System.Net.Http;
+    using System.Text;
+    using System.Threading;
+    using System.Threading.Tasks;
     using Microsoft.VisualStudio.TestTools.UnitTesting;
 
+    using Dropbox.Api.Common;
     using Dropbox.Api.Files;
     using Dropbox.Api.Stone;
 
@@ -27,5 +36,1272 @@ namespace Dropbox.Api.Tests
             Assert.IsTrue(obj.IsPath);
             Assert.IsTrue(obj.AsPath.Value.IsNotFound);
         }
+
+        [TestMethod]
+        public void TestVariantCodecs()
+        {
+            var empty = JsonReader.Read(@"{"".tag"": ""empty""}", TestUnion.Decoder);
+            Assert.AreSame(TestUnion.Empty.Instance, empty);
+            Assert.AreEqual(@"{"".tag"":""empty""}", JsonWriter.Write(empty, TestUnion.Encoder));
+
+            var poll = JsonReader.Read(@"{"".tag"": ""poll"", ""changes"": true, ""backoff"": 5}", TestUnion.Decoder);
+            Assert.IsInstanceOfType(poll, typeof(TestUnion.Poll));
+            Assert.IsTrue(((TestUnion.Poll)poll).Value.Changes);
+            Assert.AreEqual(5UL, ((TestUnion.Poll)poll).Value.Backoff);
+            Assert.AreEqual(
+                @"{"".tag"":""poll"",""poll"":{""changes"":true,""backoff"":5}}",
+                JsonWriter.Write(poll, TestUnion.Encoder));
+        }
+
+        [TestMethod]
+        public void TestUnionTagAndVisitor()
+        {
+            var values = new TestUnion[]
+            {
+                TestUnion.Empty.Instance,
+                new TestUnion.Poll(new ListFolderLongpollResult(true)),
+            };
+
+            CollectionAssert.AreEqual(
+                new[] { TestUnion.Tags.Empty, TestUnion.Tags.Poll },
+                values.Select(v => v.Tag).ToArray());
+            CollectionAssert.AreEqual(
+                new[] { "empty", "poll True" },
+                values.Select(v => v.Accept(new TestUnionVisitor())).ToArray());
+
+            var decoded = JsonReader.Read(@"{"".tag"": ""poll"", ""changes"": false}", TestUnion.Decoder);
+            Assert.AreEqual(TestUnion.Tags.Poll, decoded.Tag);
+            Assert.AreEqual("poll False", decoded.Accept(new TestUnionVisitor()));
+        }
+
+        [TestMethod]
+        public void TestDecodeApiException()
+        {
+            var json = @"{
+                ""error_summary"": ""path/not_found/"",
+                ""error"": {"".tag"": ""path"", ""path"": {"".tag"": ""not_found""}},
+                ""user_message"": {""locale"": ""en"", ""text"": ""The file was not found.""}
+            }";
+
+            var exception = StructuredException<GetMetadataError>.Decode(
+                json, GetMetadataError.Decoder, () => new ApiException<GetMetadataError>("id"));
+
+            Assert.AreEqual("path/not_found/", exception.Message);
+            Assert.AreEqual("The file was not found.", exception.UserMessage);
+            Assert.IsTrue(exception.ErrorResponse.AsPath.Value.IsNotFound);
+        }
+
+        [TestMethod]
+        public void TestWriteUtf8()
+        {
+            var value = new GetMetadataError.Path(LookupError.NotFound.Instance);
+
+            using (var buffer = JsonWriter.WriteUtf8(value, GetMetadataError.Encoder))
+            using (var reader = new StreamReader(buffer.OpenStream(), Encoding.UTF8))
+            {
+                Assert.AreEqual(JsonWriter.Write(value, GetMetadataError.Encoder), reader.ReadToEnd());
+            }
+        }
+
+        [TestMethod]
+        public void TestWriteUtf8EscapesDelete()
+        {
+            var value = new GetMetadataError.Path(new LookupError.MalformedPath("a\u007fb"));
+
+            using (var buffer = JsonWriter.WriteUtf8(value, GetMetadataError.Encoder))
+            using (var reader = new StreamReader(buffer.OpenStream(), Encoding.UTF8))
+            {
+                var json = reader.ReadToEnd();
+
+                Assert.AreEqual(JsonWriter.Write(value, GetMetadataError.Encoder), json);
+                Assert.IsTrue(json.Contains("a\\u007fb"));
+            }
+        }
+
+        [TestMethod]
+        public void TestDecodeListFolderResult()
+        {
+            var json = @"{
+                ""entries"": [
+                    {
+                        "".tag"": ""file"",
+                        ""name"": ""a.txt"",
+                        ""id"": ""id:a"",
+                        ""client_modified"": ""2015-05-12T15:50:38Z"",
+                        ""server_modified"": ""2015-05-12T15:50:38Z"",
+                        ""rev"": ""a1c10ce0dd78"",
+                        ""size"": 7212,
+                        ""path_lower"": ""/a.txt"",
+                        ""path_display"": ""/a.txt""
+                    },
+                    {
+                        "".tag"": ""folder"",
+                        ""name"": ""b"",
+                        ""id"": ""id:b"",
+                        ""path_lower"": ""/b"",
+                        ""path_display"": ""/b""
+                    }
+                ],
+                ""cursor"": ""ZtkX9_EHj3x7PMkVuFIhwKYXEpwpLwyxp9vMKomUhllil9q7eWiAu"",
+                ""has_more"": false
+            }";
+
+            var result = JsonReader.Read(json, ListFolderResult.Decoder);
+
+            Assert.AreEqual(2, result.Entries.Count);
+            Assert.IsTrue(result.Entries[0].IsFile);
+            Assert.AreEqual(7212UL, result.Entries[0].AsFile.Size);
+            Assert.IsTrue(result.Entries[1].IsFolder);
+            Assert.AreEqual("/b", result.Entries[1].PathLower);
+            Assert.IsFalse(result.HasMore);
+        }
+
+        [TestMethod]
+        public void TestCodecInstances()
+        {
+            Assert.IsNotNull(ListFolderResult.Encoder);
+            Assert.AreSame(ListFolderResult.Decoder, ListFolderResult.Decoder);
+            Assert.AreSame(LookupError.NotFound.Decoder, LookupError.NotFound.Decoder);
+
+            var value = new ListFolderResult(
+                new Metadata[] { new FolderMetadata("b", "id:b", "/b", "/b") },
+                "cursor",
+                true);
+
+            var result = JsonReader.Read(JsonWriter.Write(value, ListFolderResult.Encoder), ListFolderResult.Decoder);
+
+            Assert.AreEqual("cursor", result.Cursor);
+            Assert.IsTrue(result.HasMore);
+            Assert.AreEqual("/b", result.Entries.Single().AsFolder.PathLower);
+        }
+
+        [TestMethod]
+        public void TestDecodeStructFields()
+        {
+            var arg = JsonReader.Read(
+                @"{""unknown"": {""nested"": [1, 2]}, ""path"": ""/a"", ""limit"": 10}",
+                ListFolderArg.Decoder);
+
+            Assert.AreEqual("/a", arg.Path);
+            Assert.IsFalse(arg.Recursive);
+            Assert.IsFalse(arg.IncludeMediaInfo);
+            Assert.AreEqual(10U, arg.Limit);
+
+            var longpoll = JsonReader.Read(@"{""cursor"": ""c""}", ListFolderLongpollArg.Decoder);
+            Assert.AreEqual(30UL, longpoll.Timeout);
+
+            // Decoding trusts the server and skips the checks the public constructor makes.
+            longpoll = JsonReader.Read(@"{""cursor"": ""c"", ""timeout"": 5}", ListFolderLongpollArg.Decoder);
+            Assert.AreEqual(5UL, longpoll.Timeout);
+
+            try
+            {
+                new ListFolderLongpollArg("c", 5);
+                Assert.Fail("The constructor accepted an invalid timeout.");
+            }
+            catch (ArgumentOutOfRangeException)
+            {
+            }
+        }
+
+        [TestMethod]
+        public void TestLazyValue()
+        {
+            var json = @"{""changes"": true, ""backoff"": 10}";
+            var decoder = new CountingDecoder<ListFolderLongpollResult>(ListFolderLongpollResult.Decoder);
+            var lazy = new LazyValue<ListFolderLongpollResult>(json, decoder);
+            Assert.AreEqual(0, decoder.Count);
+
+            var value = lazy.Value;
+            Assert.IsTrue(value.Changes);
+            Assert.AreEqual(10UL, value.Backoff);
+            Assert.AreSame(value, lazy.Value);
+            Assert.AreEqual(1, decoder.Count);
+
+            decoder = new CountingDecoder<ListFolderLongpollResult>(ListFolderLongpollResult.Decoder);
+            lazy = new LazyValue<ListFolderLongpollResult>(json, decoder);
+            var values = Enumerable.Range(0, 8).Select(i => Task.Run(() => lazy.Value)).ToArray();
+            Assert.IsTrue(values.All(t => t.Result == values[0].Result));
+            Assert.AreEqual(1, decoder.Count);
+
+            Assert.AreSame(value, new LazyValue<ListFolderLongpollResult>(value).Value);
+
+            Assert.AreEqual(
+                @"{""a"":[1,{""b"":null}],""c"":""d""}",
+                JsonReader.Read(@"{""a"": [1, {""b"": null}], ""c"": ""d""}", new RawDecoder()));
+        }
+
+        [TestMethod]
+        public void TestReadListItems()
+        {
+            var json = @"{
+                ""entries"": [
+                    {"".tag"": ""folder"", ""name"": ""a"", ""id"": ""id:a"", ""path_lower"": ""/a""},
+                    {"".tag"": ""folder"", ""name"": ""b"", ""id"": ""id:b"", ""path_lower"": ""/b""}
+                ],
+                ""cursor"": ""cursor""
+            }";
+
+            var items = new List<string>();
+            var page = JsonReader.Read(json, new TestPageDecoder(item => items.Add(item.PathLower)));
+
+            CollectionAssert.AreEqual(new[] { "/a", "/b" }, items);
+            Assert.AreEqual("cursor", page.Cursor);
+        }
+
+        [TestMethod]
+        public void TestIso8601DateTime()
+        {
+            var value = new DateTime(2015, 5, 12, 15, 50, 38, DateTimeKind.Utc);
+
+            var json = JsonWriter.Write(value, Iso8601DateTimeEncoder.Instance);
+            Assert.AreEqual("\"2015-05-12T15:50:38Z\"", json);
+
+            var decoded = JsonReader.Read(json, Iso8601DateTimeDecoder.Instance);
+            Assert.AreEqual(value, decoded);
+            Assert.AreEqual(DateTimeKind.Utc, decoded.Kind);
+
+            decoded = JsonReader.Read("\"2015-05-12T15:50:38.123Z\"", Iso8601DateTimeDecoder.Instance);
+            Assert.AreEqual(value.AddMilliseconds(123), decoded);
+        }
+
+        [TestMethod]
+        public void TestResponseCache()
+        {
+            var cache = new ResponseCache(2, TimeSpan.FromMinutes(5));
+            string response;
+
+            var generation = cache.GetGeneration("/files/get_metadata");
+            cache.Add("/users/get_current_account", "a", "1", 0);
+            cache.Add("/files/get_metadata", "b", "2", generation);
+            Assert.IsTrue(cache.TryGet("a", out response));
+            Assert.AreEqual("1", response);
+
+            cache.Add("/files/get_metadata", "c", "3", generation);
+            Assert.IsFalse(cache.TryGet("b", out response));
+            Assert.IsTrue(cache.TryGet("c", out response));
+            Assert.AreEqual(2, cache.Hits);
+            Assert.AreEqual(1, cache.Misses);
+
+            cache.Invalidate("files");
+            Assert.IsFalse(cache.TryGet("c", out response));
+            Assert.AreEqual(1, cache.Count);
+
+            // A response requested before the invalidation is not cached.
+            cache.Add("/files/get_metadata", "d", "4", generation);
+            Assert.IsFalse(cache.TryGet("d", out response));
+            Assert.AreEqual(generation, cache.GetGeneration("/users/get_current_account"));
+
+            generation = cache.GetGeneration("/files/get_metadata");
+            cache.Clear();
+            cache.Add("/files/get_metadata", "e", "5", generation);
+            Assert.IsFalse(cache.TryGet("e", out response));
+        }
+
+        [TestMethod]
+        public void TestRequestCoalescer()
+        {
+            var coalescer = new RequestCoalescer();
+            var response = new TaskCompletionSource<string>();
+            var calls = 0;
+            Func<Task<string>> call = () =>
+            {
+                calls++;
+                return response.Task;
+            };
+
+            var first = coalescer.RunAsync("a", call);
+            var second = coalescer.RunAsync("a", call);
+            Assert.AreEqual(1, calls);
+            Assert.AreEqual(1, coalescer.Count);
+
+            response.SetResult("result");
+            Assert.AreEqual("result", first.Result);
+            Assert.AreEqual("result", second.Result);
+            Assert.AreEqual(0, coalescer.Count);
+
+            coalescer.RunAsync("a", call).Wait();
+            Assert.AreEqual(2, calls);
+        }
+
+        [TestMethod]
+        public void TestRpcResponse()
+        {
+            var mockHandler = new MockHttpMessageHandler((r, s) => Task.FromResult(new HttpResponseMessage(HttpStatusCode.OK)
+            {
+                Content = new StringContent(@"{""entries"": [], ""cursor"": ""cursor"", ""has_more"": true}")
+            }));
+
+            var config = new DropboxClientConfig { HttpClient = new HttpClient(mockHandler) };
+            ITransport transport = new DropboxRequestHandler(new DropboxRequestHandlerOptions(config, "token"));
+
+            var result = transport.SendRpcRequestAsync(
+                new ListFolderContinueArg("cursor"), "api", "/files/list_folder/continue", "user",
+                ListFolderContinueArg.Encoder, ListFolderResult.Decoder, ListFolderContinueError.Decoder).Result;
+            Assert.AreEqual("cursor", result.Cursor);
+            Assert.IsTrue(result.HasMore);
+
+            Assert.IsNull(new DropboxRequestHandlerOptions(new DropboxClientConfig(), "token").CompressedHttpClient);
+            Assert.IsNotNull(new DropboxRequestHandlerOptions(
+                new DropboxClientConfig { AcceptCompressedResponses = true }, "token").CompressedHttpClient);
+        }
+
+        [TestMethod]
+        public void TestCompressedHttpClientDisposal()
+        {
+            var options = new DropboxRequestHandlerOptions(
+                new DropboxClientConfig { AcceptCompressedResponses = true }, "token");
+            var client = options.CompressedHttpClient;
+            var root = new DropboxRequestHandler(options, ownsOptions: true);
+
+            new DropboxRequestHandler(options, selectUser: "dbmid:member").Dispose();
+            root.WithPathRoot(PathRoot.Home.Instance).Dispose();
+            client.CancelPendingRequests();
+
+            root.Dispose();
+            try
+            {
+                client.CancelPendingRequests();
+                Assert.Fail("The client was not disposed.");
+            }
+            catch (ObjectDisposedException)
+            {
+            }
+        }
+
+        [TestMethod]
+        public void TestCoalescedDecoders()
+        {
+            var json = @"{
+                ""entries"": [
+                    {"".tag"": ""folder"", ""name"": ""a"", ""id"": ""id:a"", ""path_lower"": ""/a""}
+                ],
+                ""cursor"": ""cursor"",
+                ""has_more"": false
+            }";
+
+            var release = new TaskCompletionSource<bool>();
+            var mockHandler = new MockHttpMessageHandler(async (r, s) =>
+            {
+                await release.Task;
+                return new HttpResponseMessage(HttpStatusCode.OK)
+                {
+                    Content = new StringContent(json, Encoding.UTF8, "application/json")
+                };
+            });
+
+            var config = new DropboxClientConfig { HttpClient = new HttpClient(mockHandler), CoalesceRequests = true };
+            ITransport transport = new DropboxRequestHandler(new DropboxRequestHandlerOptions(config, "token"));
+            var arg = new ListFolderArg("/");
+
+            var items = new List<string>();
+            var streaming = transport.SendRpcRequestAsync(
+                arg, "api", "/files/list_folder", "user", ListFolderArg.Encoder,
+                new TestPageDecoder(item => items.Add(item.PathLower)), ListFolderError.Decoder);
+            var plain = transport.SendRpcRequestAsync(
+                arg, "api", "/files/list_folder", "user", ListFolderArg.Encoder,
+                ListFolderResult.Decoder, ListFolderError.Decoder);
+
+            release.SetResult(true);
+            Assert.AreEqual("cursor", streaming.Result.Cursor);
+            CollectionAssert.AreEqual(new[] { "/a" }, items);
+            Assert.AreEqual("/a", plain.Result.Entries.Single().PathLower);
+        }
+
+        [TestMethod]
+        public void TestBatchAggregator()
+        {
+            var batches = 0;
+            var aggregator = new BatchAggregator<int, string>(
+                items =>
+                {
+                    batches++;
+                    IList<string> results = items.Select(i => i.ToString()).ToList();
+                    return Task.FromResult(batches == 1 ? results : null);
+                },
+                item => Task.FromResult("single " + item),
+                2,
+                TimeSpan.FromMinutes(5));
+
+            var first = aggregator.SendAsync(1);
+            var second = aggregator.SendAsync(2);
+            Assert.AreEqual("1", first.Result);
+            Assert.AreEqual("2", second.Result);
+            Assert.AreEqual(1, batches);
+
+            first = aggregator.SendAsync(3);
+            second = aggregator.SendAsync(4);
+            Assert.AreEqual("single 3", first.Result);
+            Assert.AreEqual("single 4", second.Result);
+            Assert.AreEqual(2, batches);
+        }
+
+        [TestMethod]
+        public void TestRateLimiter()
+        {
+            var limiter = new RateLimiter(4);
+
+            limiter.EnterAsync("api").Wait();
+            limiter.EnterAsync("api").Wait();
+            Assert.AreEqual(2, limiter.InFlight);
+
+            limiter.OnRateLimited(TimeSpan.Zero);
+            Assert.AreEqual(2, limiter.ConcurrencyLimit);
+            Assert.AreEqual(1, limiter.RateLimitedCount);
+
+            var third = limiter.EnterAsync("api");
+            Assert.IsFalse(third.IsCompleted);
+            Assert.AreEqual(1, limiter.QueueDepth);
+
+            limiter.Exit(false);
+            Assert.IsTrue(third.Wait(TimeSpan.FromSeconds(5)));
+            Assert.AreEqual(0, limiter.QueueDepth);
+            Assert.AreEqual(2, limiter.InFlight);
+        }
+
+        [TestMethod]
+        public void TestHedgingPolicy()
+        {
+            var policy = new HedgingPolicy(percentile: 0.9, maxHedgeRatio: 0.1, minSamples: 10);
+
+            for (var i = 1; i <= 10; i++)
+            {
+                Assert.IsNull(policy.StartRequest("/files/get_metadata"));
+                policy.Record("/files/get_metadata", TimeSpan.FromMilliseconds(i * 10));
+            }
+
+            var delay = policy.GetHedgeDelay("/files/get_metadata");
+            Assert.IsNotNull(delay);
+            Assert.IsTrue(delay.Value >= TimeSpan.FromMilliseconds(90));
+            Assert.IsTrue(delay.Value < TimeSpan.FromMilliseconds(150));
+
+            Assert.IsTrue(policy.TryStartHedge());
+            Assert.IsFalse(policy.TryStartHedge());
+            Assert.AreEqual(1, policy.HedgedRequests);
+        }
+
+        [TestMethod]
+        public void TestHedgedRequestPrimaryFaults()
+        {
+            var json = @"{""entries"": [], ""cursor"": ""cursor"", ""has_more"": false}";
+
+            var requests = 0;
+            var hedgeSent = new TaskCompletionSource<bool>();
+            var mockHandler = new MockHttpMessageHandler(async (r, s) =>
+            {
+                if (Interlocked.Increment(ref requests) == 1)
+                {
+                    // the primary fails once the hedge has been sent
+                    if (await Task.WhenAny(hedgeSent.Task, Task.Delay(500)) == hedgeSent.Task)
+                    {
+                        throw new HttpRequestException("primary");
+                    }
+                }
+                else
+                {
+                    hedgeSent.TrySetResult(true);
+                }
+
+                return new HttpResponseMessage(HttpStatusCode.OK)
+                {
+                    Content = new StringContent(json, Encoding.UTF8, "application/json")
+                };
+            });
+
+            var policy = new HedgingPolicy(percentile: 0.5, maxHedgeRatio: 1, minSamples: 1);
+            policy.Record("/files/list_folder", TimeSpan.FromMilliseconds(1));
+
+            var config = new DropboxClientConfig { HttpClient = new HttpClient(mockHandler), HedgingPolicy = policy };
+            ITransport transport = new DropboxRequestHandler(new DropboxRequestHandlerOptions(config, "token"));
+
+            var unobserved = 0;
+            EventHandler<UnobservedTaskExceptionEventArgs> onUnobserved = (sender, e) => Interlocked.Increment(ref unobserved);
+            TaskScheduler.UnobservedTaskException += onUnobserved;
+            try
+            {
+                var result = transport.SendRpcRequestAsync(
+                    new ListFolderArg("/"), "api", "/files/list_folder", "user", ListFolderArg.Encoder,
+                    ListFolderResult.Decoder, ListFolderError.Decoder).Result;
+                Assert.AreEqual("cursor", result.Cursor);
+
+                Thread.Sleep(100);
+                GC.Collect();
+                GC.WaitForPendingFinalizers();
+                Assert.AreEqual(0, unobserved);
+            }
+            finally
+            {
+                TaskScheduler.UnobservedTaskException -= onUnobserved;
+            }
+        }
+
+        [TestMethod]
+        public void TestHttpClientPool()
+        {
+            using (var pool = new HttpClientPool())
+            {
+                pool.Content.Timeout = TimeSpan.FromMinutes(10);
+
+                var api = pool.GetClient("api", "api.dropboxapi.com");
+                Assert.AreSame(api, pool.GetClient("api", "api.dropboxapi.com"));
+                Assert.AreEqual(TimeSpan.FromMinutes(10), pool.GetClient("content", "content.dropboxapi.com").Timeout);
+                Assert.AreEqual(TimeSpan.FromSeconds(480), pool.GetClient("notify", "notify.dropboxapi.com").Timeout);
+            }
+        }
+
+        [TestMethod]
+        public void TestDropboxContentHasher()
+        {
+            using (var hasher = new DropboxContentHasher())
+            {
+                Assert.AreEqual(
+                    "bf5d3affb73efd2ec6c36ad3112dd933efed63c4e1cbffcfa88e2759c144f2d8",
+                    DropboxContentHasher.ToHex(hasher.ComputeHash(Encoding.UTF8.GetBytes("a"))));
+            }
+        }
+
+        [TestMethod]
+        public void TestParallelContentHash()
+        {
+            var content = new byte[(2 * DropboxContentHasher.BlockSize) + 1000];
+            new Random(1).NextBytes(content);
+
+            string expected;
+            using (var hasher = new DropboxContentHasher())
+            {
+                expected = DropboxContentHasher.ToHex(hasher.ComputeHash(content));
+            }
+
+            Assert.AreEqual(expected, DropboxContentHasher.HashStreamAsync(new MemoryStream(content), 2).Result);
+
+            var path = Path.GetTempFileName();
+            try
+            {
+                File.WriteAllBytes(path, content);
+                Assert.AreEqual(expected, DropboxContentHasher.HashFileAsync(path).Result);
+            }
+            finally
+            {
+                File.Delete(path);
+            }
+        }
+
+        [TestMethod]
+        public void TestUploadSkipper()
+        {
+            var content = Encoding.UTF8.GetBytes("content");
+            string contentHash;
+            using (var hasher = new DropboxContentHasher())
+            {
+                contentHash = DropboxContentHasher.ToHex(hasher.ComputeHash(content));
+            }
+
+            var existing = new FileMetadata(
+                "a", "id:a", DateTime.UtcNow, DateTime.UtcNow, "0123456789", (ulong)content.Length, contentHash: contentHash);
+            var uploads = 0;
+            Func<Stream, Task<FileMetadata>> upload = stream =>
+            {
+                uploads++;
+                stream.CopyTo(Stream.Null);
+                return Task.FromResult(existing);
+            };
+
+            var result = UploadSkipper.UploadIfChangedAsync(
+                new MemoryStream(content), existing, upload, m => m.Size, m => m.ContentHash).Result;
+            Assert.AreSame(existing, result);
+            Assert.AreEqual(0, uploads);
+
+            result = UploadSkipper.UploadIfChangedAsync(
+                new MemoryStream(content), null, upload, m => m.Size, m => m.ContentHash).Result;
+            Assert.AreEqual(1, uploads);
+        }
+
+        [TestMethod]
+        public void TestRangedDownloader()
+        {
+            var content = Encoding.UTF8.GetBytes("0123456789");
+            string contentHash;
+            using (var hasher = new DropboxContentHasher())
+            {
+                contentHash = DropboxContentHasher.ToHex(hasher.ComputeHash(content));
+            }
+
+            var path = Path.GetTempFileName();
+            try
+            {
+                var requests = 0;
+                Func<long, long, Task<IDownloadResponse<string>>> sendRange = (offset, length) =>
+                {
+                    Interlocked.Increment(ref requests);
+                    var range = content.Skip((int)offset).Take((int)length).ToArray();
+                    return Task.FromResult<IDownloadResponse<string>>(new TestDownloadResponse(contentHash, range));
+                };
+
+                var result = RangedDownloader.DownloadToFileAsync(
+                    sendRange, r => (ulong)content.Length, r => r, null, path, 2, 3).Result;
+
+                Assert.AreEqual(contentHash, result);
+                Assert.AreEqual(4, requests);
+                CollectionAssert.AreEqual(content, File.ReadAllBytes(path));
+                Assert.IsFalse(File.Exists(path + ".ranges"));
+            }
+            finally
+            {
+                File.Delete(path);
+            }
+        }
+
+        [TestMethod]
+        public void TestRangedDownloaderResume()
+        {
+            var content = Encoding.UTF8.GetBytes("0123456789");
+            var path = Path.GetTempFileName();
+            try
+            {
+                var requests = new List<string>();
+                Func<string, long, Func<long, long, Task<IDownloadResponse<string>>>> sender = (revision, failAt) => (offset, length) =>
+                {
+                    requests.Add(offset + "+" + length);
+                    if (offset == failAt)
+                    {
+                        throw new IOException("The connection was reset.");
+                    }
+
+                    var range = content.Skip((int)offset).Take((int)length).ToArray();
+                    return Task.FromResult<IDownloadResponse<string>>(new TestDownloadResponse(revision, range));
+                };
+
+                Func<string, long, string> download = (revision, failAt) => RangedDownloader.DownloadToFileAsync(
+                    sender(revision, failAt), r => (ulong)content.Length, null, r => r, path, 1, 3).Result;
+
+                // The first range is not downloaded again when resuming the same revision.
+                try
+                {
+                    download("rev1", 6);
+                    Assert.Fail("The download should have failed.");
+                }
+                catch (AggregateException e)
+                {
+                    Assert.IsInstanceOfType(e.InnerException, typeof(IOException));
+                }
+
+                requests.Clear();
+                Assert.AreEqual("rev1", download("rev1", -1));
+                CollectionAssert.AreEqual(new[] { "0+1", "6+3", "9+1" }, requests);
+                CollectionAssert.AreEqual(content, File.ReadAllBytes(path));
+                Assert.IsFalse(File.Exists(path + ".ranges"));
+
+                // A record made for another revision of the same size is not used.
+                try
+                {
+                    download("rev1", 6);
+                    Assert.Fail("The download should have failed.");
+                }
+                catch (AggregateException e)
+                {
+                    Assert.IsInstanceOfType(e.InnerException, typeof(IOException));
+                }
+
+                requests.Clear();
+                Assert.AreEqual("rev2", download("rev2", -1));
+                CollectionAssert.AreEqual(new[] { "0+1", "0+3", "3+3", "6+3", "9+1" }, requests);
+                CollectionAssert.AreEqual(content, File.ReadAllBytes(path));
+            }
+            finally
+            {
+                File.Delete(path);
+                File.Delete(path + ".ranges");
+            }
+        }
+
+        [TestMethod]
+        public void TestRangedDownloaderEmptyFile()
+        {
+            var ranges = new List<string>();
+            var mockHandler = new MockHttpMessageHandler((r, s) =>
+            {
+                ranges.Add(r.Headers.Range == null ? null : r.Headers.Range.ToString());
+                var response = r.Headers.Range != null
+                    ? new HttpResponseMessage((HttpStatusCode)416) { Content = new StringContent("") }
+                    : new HttpResponseMessage(HttpStatusCode.OK) { Content = new ByteArrayContent(new byte[0]) };
+                response.Headers.Add("Dropbox-API-Result", @"{""size"": 0}");
+                return Task.FromResult(response);
+            });
+
+            var config = new DropboxClientConfig { HttpClient = new HttpClient(mockHandler) };
+            ITransport transport = new DropboxRequestHandler(new DropboxRequestHandlerOptions(config, "token"));
+
+            var path = Path.GetTempFileName();
+            try
+            {
+                File.WriteAllText(path, "stale");
+
+                var result = RangedDownloader.DownloadToFileAsync(
+                    (offset, length) => transport.SendDownloadRangeRequestAsync(
+                        new DownloadArg("/empty"), offset, length, "content", "/files/download", "user",
+                        DownloadArg.Encoder, new RawDecoder(), DownloadError.Decoder),
+                    r => 0,
+                    null,
+                    null,
+                    path,
+                    2).Result;
+
+                Assert.AreEqual(@"{""size"":0}", result);
+                CollectionAssert.AreEqual(new[] { "bytes=0-8388607", null }, ranges);
+                Assert.AreEqual(0, new FileInfo(path).Length);
+                Assert.IsFalse(File.Exists(path + ".ranges"));
+            }
+            finally
+            {
+                File.Delete(path);
+            }
+        }
+
+        [TestMethod]
+        public void TestCopyDownloadContent()
+        {
+            var content = Enumerable.Range(0, (2 * BufferPool.BufferSize) + 100).Select(i => (byte)i).ToArray();
+
+            using (var response = SendDownload(content))
+            {
+                var destination = new MemoryStream();
+                var reports = new List<long>();
+
+                var copied = response.CopyContentToAsync(destination, new SynchronousProgress<long>(reports)).Result;
+
+                Assert.AreEqual(content.Length, copied);
+                CollectionAssert.AreEqual(content, destination.ToArray());
+                Assert.IsTrue(reports.Count > 1);
+                Assert.IsTrue(reports.Zip(reports.Skip(1), (a, b) => a < b).All(increasing => increasing));
+                Assert.AreEqual(content.Length, reports.Last());
+            }
+
+            using (var response = SendDownload(content))
+            {
+                var parts = new MemoryStream();
+
+                var copied = response.CopyContentToAsync(segment =>
+                {
+                    parts.Write(segment.Array, segment.Offset, segment.Count);
+                    return Task.FromResult(0);
+                }).Result;
+
+                Assert.AreEqual(content.Length, copied);
+                CollectionAssert.AreEqual(content, parts.ToArray());
+            }
+
+            var path = Path.GetTempFileName();
+            try
+            {
+                File.WriteAllText(path, "stale content which is longer than nothing");
+
+                using (var response = SendDownload(content))
+                {
+                    Assert.AreEqual(content.Length, response.CopyContentToFileAsync(path).Result);
+                }
+
+                CollectionAssert.AreEqual(content, File.ReadAllBytes(path));
+            }
+            finally
+            {
+                File.Delete(path);
+            }
+        }
+
+        [TestMethod]
+        public void TestCopyDownloadContentCancelled()
+        {
+            var content = new byte[(2 * BufferPool.BufferSize) + 100];
+            var cancellation = new CancellationTokenSource();
+            byte[] buffer = null;
+            var writes = 0;
+
+            using (var response = SendDownload(content))
+            {
+                var copy = response.CopyContentToAsync(
+                    segment =>
+                    {
+                        buffer = segment.Array;
+                        writes++;
+                        cancellation.Cancel();
+                        return Task.FromResult(0);
+                    },
+                    null,
+                    cancellation.Token);
+
+                try
+                {
+                    copy.Wait();
+                    Assert.Fail("The copy should have been cancelled.");
+                }
+                catch (AggregateException e)
+                {
+                    Assert.IsInstanceOfType(e.InnerException, typeof(OperationCanceledException));
+                }
+            }
+
+            Assert.AreEqual(1, writes);
+
+            var rented = BufferPool.Rent(BufferPool.BufferSize);
+            Assert.AreSame(buffer, rented);
+            BufferPool.Return(rented);
+        }
+
+        [TestMethod]
+        public void TestListFolderIndex()
+        {
+            var index = new ListFolderIndex();
+            index.Apply(new ListFolderResult(
+                new Metadata[]
+                {
+                    new FolderMetadata("A", "id:a", "/a", "/A"),
+                    new FileMetadata("b", "id:b", DateTime.UtcNow, DateTime.UtcNow, "0123456789", 1, "/a/b", "/A/b"),
+                    new FolderMetadata("c", "id:c", "/a/c", "/A/c"),
+                    new FileMetadata("d", "id:d", DateTime.UtcNow, DateTime.UtcNow, "0123456789", 1, "/a/c/d", "/A/c/d"),
+                },
+                "cursor1",
+                false));
+
+            Assert.AreEqual(4, index.Count);
+            Assert.AreEqual(2, index.GetChildren("/A").Count);
+
+            var writer = new StringWriter();
+            index.Save(writer);
+
+            index.Apply(new ListFolderResult(new Metadata[] { new DeletedMetadata("c", "/a/c") }, "cursor2", false));
+            Assert.AreEqual(2, index.Count);
+            Assert.AreEqual("cursor2", index.Cursor);
+
+            var restored = ListFolderIndex.Load(new StringReader(writer.ToString()));
+            Assert.AreEqual(4, restored.Count);
+            Assert.AreEqual("cursor1", restored.Cursor);
+
+            Metadata entry;
+            Assert.IsTrue(restored.TryGetEntry("/A/c/D", out entry));
+            Assert.IsTrue(entry.IsFile);
+        }
+
+        [TestMethod]
+        public void TestFolderTreeWalker()
+        {
+            Func<string, Metadata> folder = path => new FolderMetadata(path.Substring(path.LastIndexOf('/') + 1), "id:" + path, path);
+            Func<string, Metadata> file = path => new FileMetadata(
+                path.Substring(path.LastIndexOf('/') + 1), "id:" + path, DateTime.UtcNow, DateTime.UtcNow, "0123456789", 1, path);
+
+            var tree = new Dictionary<string, Metadata[]>
+            {
+                { string.Empty, new[] { folder("/a"), folder("/b"), file("/f") } },
+                { "/a", new[] { file("/a/x"), folder("/a/c") } },
+                { "/a/c", new[] { file("/a/c/y") } },
+                { "/b", new Metadata[0] },
+            };
+
+            var walker = new FolderTreeWalker(
+                path => Task.FromResult(new ListFolderResult(tree[path], "cursor", false)),
+                cursor => { throw new InvalidOperationException(); },
+                path => Task.FromResult("latest"),
+                3);
+
+            var seen = new List<string>();
+            var reports = new List<FolderWalkProgress>();
+            var latest = walker.WalkAsync(
+                string.Empty,
+                entries =>
+                {
+                    lock (seen)
+                    {
+                        seen.AddRange(entries.Select(e => e.PathLower));
+                    }
+
+                    return Task.FromResult(0);
+                },
+                new SynchronousProgress<FolderWalkProgress>(reports)).Result;
+
+            Assert.AreEqual("latest", latest);
+            CollectionAssert.AreEquivalent(new[] { "/a", "/b", "/f", "/a/x", "/a/c", "/a/c/y" }, seen);
+            Assert.AreEqual(4, reports.Count);
+
+            var subtreeA = reports.Where(r => r.Subtree == "/a").OrderBy(r => r.SubtreeEntries).Last();
+            Assert.AreEqual(3, subtreeA.SubtreeEntries);
+            Assert.AreEqual(0, subtreeA.SubtreeFoldersPending);
+        }
+
+        [TestMethod]
+        public void TestLongpollWatcher()
+        {
+            var polls = new List<string>();
+            var inFlight = 0;
+            var maxInFlight = 0;
+
+            Func<string, ulong, Task<ListFolderLongpollResult>> longpoll = async (cursor, timeout) =>
+            {
+                lock (polls)
+                {
+                    polls.Add(cursor);
+                    maxInFlight = Math.Max(maxInFlight, ++inFlight);
+                }
+
+                await Task.Delay(10);
+
+                lock (polls)
+                {
+                    inFlight--;
+                }
+
+                return new ListFolderLongpollResult(cursor.StartsWith("changed"));
+            };
+
+            using (var watcher = new LongpollWatcher(longpoll, 2, 30))
+            {
+                watcher.Watch("a", "quiet-a");
+                watcher.Watch("b", "changed-b");
+                watcher.Watch("c", "quiet-c");
+
+                Assert.AreEqual("b", watcher.WaitForChangeAsync().Result);
+
+                Thread.Sleep(100);
+                watcher.Watch("b", "changed-b2");
+                Assert.AreEqual("b", watcher.WaitForChangeAsync().Result);
+
+                Assert.IsTrue(watcher.Unwatch("a"));
+                Assert.AreEqual(2, watcher.WatchCount);
+
+                lock (polls)
+                {
+                    Assert.IsTrue(maxInFlight <= 2);
+                    Assert.AreEqual(1, polls.Count(p => p == "changed-b"));
+                    Assert.IsTrue(polls.Count(p => p == "quiet-a") > 1);
+                }
+            }
+        }
+
+        [TestMethod]
+        public void TestLongpollWatcherErrors()
+        {
+            Func<string, ulong, Task<ListFolderLongpollResult>> longpoll = async (cursor, timeout) =>
+            {
+                await Task.Delay(10);
+
+                if (cursor == "bad")
+                {
+                    throw new BadInputException("request-id", "Invalid cursor.");
+                }
+
+                if (cursor == "flaky")
+                {
+                    throw new HttpRequestException("The connection was reset.");
+                }
+
+                return new ListFolderLongpollResult(cursor.StartsWith("changed"));
+            };
+
+            using (var watcher = new LongpollWatcher(longpoll, 4, 30))
+            {
+                var cancellation = new CancellationTokenSource();
+                var cancelled = watcher.WaitForChangeAsync(cancellation.Token);
+                cancellation.Cancel();
+                Assert.IsTrue(cancelled.IsCanceled);
+
+                watcher.Watch("bad", "bad");
+                watcher.Watch("flaky", "flaky");
+
+                try
+                {
+                    watcher.WaitForChangeAsync().Wait();
+                    Assert.Fail("The wait should have failed.");
+                }
+                catch (AggregateException e)
+                {
+                    var error = (LongpollWatchException)e.InnerException;
+                    Assert.AreEqual("bad", error.Key);
+                    Assert.IsInstanceOfType(error.InnerException, typeof(BadInputException));
+                }
+
+                // the transient error is retried, so only the bad cursor is dropped
+                Assert.AreEqual(1, watcher.WatchCount);
+
+                watcher.Watch("c", "changed-c");
+                Assert.AreEqual("c", watcher.WaitForChangeAsync().Result);
+            }
+        }
+
+        private static IDownloadResponse<string> SendDownload(byte[] content)
+        {
+            var mockHandler = new MockHttpMessageHandler((r, s) =>
+            {
+                var response = new HttpResponseMessage(HttpStatusCode.OK) { Content = new ByteArrayContent(content) };
+                response.Headers.Add("Dropbox-API-Result", @"{""size"": " + content.Length + "}");
+                return Task.FromResult(response);
+            });
+
+            var config = new DropboxClientConfig { HttpClient = new HttpClient(mockHandler) };
+            ITransport transport = new DropboxRequestHandler(new DropboxRequestHandlerOptions(config, "token"));
+
+            return transport.SendDownloadRequestAsync(
+                new DownloadArg("/file"), "content", "/files/download", "user",
+                DownloadArg.Encoder, new RawDecoder(), DownloadError.Decoder).Result;
+        }
+
+        private class SynchronousProgress<T> : IProgress<T>
+        {
+            private readonly List<T> reports;
+
+            public SynchronousProgress(List<T> reports)
+            {
+                this.reports = reports;
+            }
+
+            public void Report(T value)
+            {
+                lock (this.reports)
+                {
+                    this.reports.Add(value);
+                }
+            }
+        }
+
+        private class CountingDecoder<T> : IDecoder<T>
+        {
+            private readonly IDecoder<T> decoder;
+
+            public CountingDecoder(IDecoder<T> decoder)
+            {
+                this.decoder = decoder;
+            }
+
+            public int Count { get; private set; }
+
+            public T Decode(IJsonReader reader)
+            {
+                lock (this.decoder)
+                {
+                    this.Count++;
+                }
+
+                return this.decoder.Decode(reader);
+            }
+        }
+
+        private class RawDecoder : IDecoder<string>
+        {
+            public string Decode(IJsonReader reader)
+            {
+                return reader.ReadRaw();
+            }
+        }
+
+        private class TestPage
+        {
+            public string Cursor { get; set; }
+        }
+
+        private class TestPageDecoder : StructDecoder<TestPage>
+        {
+            private readonly Action<Metadata> onItem;
+
+            public TestPageDecoder(Action<Metadata> onItem)
+            {
+                this.onItem = onItem;
+            }
+
+            protected override TestPage Create()
+            {
+                return new TestPage();
+            }
+
+            protected override void SetField(TestPage value, string fieldName, IJsonReader reader)
+            {
+                switch (fieldName)
+                {
+                    case "entries":
+                        ReadListItems(reader, Metadata.Decoder, this.onItem);
+                        break;
+                    case "cursor":
+                        value.Cursor = StringDecoder.Instance.Decode(reader);
+                        break;
+                    default:
+                        reader.Skip();
+                        break;
+                }
+            }
+        }
+
+        private class TestUnionVisitor : TestUnion.IVisitor<string>
+        {
+            public string VisitEmpty(TestUnion.Empty value)
+            {
+                return "empty";
+            }
+
+            public string VisitPoll(TestUnion.Poll value)
+            {
+                return "poll " + value.Value.Changes;
+            }
+        }
+
+        private class TestUnion
+        {
+            internal static readonly StructEncoder<TestUnion> Encoder = new TestUnionEncoder();
+
+            internal static readonly StructDecoder<TestUnion> Decoder = new TestUnionDecoder();
+
+            public enum Tags
+            {
+                Empty,
+                Poll
+            }
+
+            public interface IVisitor<TResult>
+            {
+                TResult VisitEmpty(Empty value);
+
+                TResult VisitPoll(Poll value);
+            }
+
+            public virtual Tags Tag
+            {
+                get
+                {
+                    throw new InvalidOperationException();
+                }
+            }
+
+            public virtual TResult Accept<TResult>(IVisitor<TResult> visitor)
+            {
+                throw new InvalidOperationException();
+            }
+
+            public sealed class Empty : TestUnion
+            {
+                public static readonly Empty Instance = new Empty();
+
+                internal static readonly new StructEncoder<Empty> Encoder = VoidVariantCodec<Empty>.Encoder;
+
+                internal static readonly new StructDecoder<Empty> Decoder = VoidVariantCodec<Empty>.CreateDecoder(Instance);
+
+                public override Tags Tag
+                {
+                    get
+                    {
+                        return Tags.Empty;
+                    }
+                }
+
+                public override TResult Accept<TResult>(IVisitor<TResult> visitor)
+                {
+                    return visitor.VisitEmpty(this);
+                }
+            }
+
+            public sealed class Poll : TestUnion
+            {
+                internal static readonly new StructEncoder<Poll> Encoder =
+                    StructVariantCodec<Poll, ListFolderLongpollResult>.CreateEncoder("poll", v => v.Value, ListFolderLongpollResult.Encoder);
+
+                internal static readonly new StructDecoder<Poll> Decoder =
+                    StructVariantCodec<Poll, ListFolderLongpollResult>.CreateDecoder(v => new Poll(v), ListFolderLongpollResult.Decoder);
+
+                public Poll(ListFolderLongpollResult value)
+                {
+                    this.Value = value;
+                }
+
+                public ListFolderLongpollResult Value { get; private set; }
+
+                public override Tags Tag
+                {
+                    get
+                    {
+                        return Tags.Poll;
+                    }
+                }
+
+                public override TResult Accept<TResult>(IVisitor<TResult> visitor)
+                {
+                    return visitor.VisitPoll(this);
+                }
+            }
+
+            private class TestUnionEncoder : StructEncoder<TestUnion>
+            {
+                public override void EncodeFields(TestUnion value, IJsonWriter writer)
+                {
+                    if (value is Empty)
+                    {
+                        WriteProperty(".tag", "empty", writer, StringEncoder.Instance);
+                        Empty.Encoder.EncodeFields((Empty)value, writer);
+                        return;
+                    }
+
+                    WriteProperty(".tag", "poll", writer, StringEncoder.Instance);
+                    Poll.Encoder.EncodeFields((Poll)value, writer);
+                }
+            }
+
+            private class TestUnionDecoder : UnionDecoder<TestUnion>
+            {
+                protected override TestUnion Create()
+                {
+                    return new TestUnion();
+                }
+
+                protected override TestUnion Decode(string tag, IJsonReader reader)
+                {
+                    switch (tag)
+                    {
+                        case "empty":
+                            return Empty.Decoder.DecodeFields(reader);
+                        case "poll":
+                            return Poll.Decoder.DecodeFields(reader);
+                        default:
+                            throw new InvalidOperationException(tag);
+                    }
+                }
+            }
+        }
+
+        private class TestDownloadResponse : IDownloadResponse<string>
+        {
+            private readonly byte[] content;
+
+            public TestDownloadResponse(string response, byte[] content)
+            {
+                this.Response = response;
+                this.content = content;
+            }
+
+            public string Response { get; private set; }
+
+            public Task<Stream> GetContentAsStreamAsync()
+            {
+                return Task.FromResult<Stream>(new MemoryStream(this.content));
+            }
+
+            public Task<byte[]> GetContentAsByteArrayAsync()
+            {
+                return Task.FromResult(this.content);
+            }
+
+            public Task<string> GetContentAsStringAsync()
+            {
+                return Task.FromResult(Encoding.UTF8.GetString(this.content));
+            }
+
+            public async Task<long> CopyContentToAsync(Stream destination, IProgress<long> progress = null, CancellationToken cancellationToken = default(CancellationToken))
+            {
+                await destination.WriteAsync(this.content, 0, this.content.Length, cancellationToken);
+                return this.content.Length;
+            }
+
+            public async Task<long> CopyContentToAsync(Func<ArraySegment<byte>, Task> write, IProgress<long> progress = null, CancellationToken cancellationToken = default(CancellationToken))
+            {
+                await write(new ArraySegment<byte>(this.content));
+                return this.content.Length;
+            }
+
+            public void Dispose()
+            {
+            }
+        }
     }
 }
@@ -0,0 +1,249 @@
+//-----------------------------------------------------------------------------
+// <copyright file="BatchAggregator.cs" company="Dropbox Inc">
+//  Copyright (c) Dropbox Inc. All rights reserved.
+// </copyright>
+//-----------------------------------------------------------------------------
+
+namespace Dropbox.Api
+{
+    using System;
+    using System.Collections.Generic;
+    using System.Threading.Tasks;
+
+    /// <summary>
+    /// Sends single calls to a route that has a batch variant as calls to the
+    /// batch route, and hands each caller the result for its own item.
+    /// </summary>
+    /// <remarks>
+    /// <para>Aggregators are created by the <c>Create*Aggregator</c> methods of
+    /// the route classes, which exist for the route pairs mapped when the SDK is
+    /// generated.</para>
+    /// <para>The first call starts a batch, which is sent when the window has
+    /// passed or when it reaches <see cref="MaxItems"/> items, whichever comes
+    /// first. If the batch route rejects the batch, each item is sent to the
+    /// single route instead, so callers get the result or error of their own
+    /// call.</para>
+    /// </remarks>
+    /// <typeparam name="TItem">The type of the item a single call is made for.</typeparam>
+    /// <typeparam name="TResult">The type of the result of a single call.</typeparam>
+    public sealed class BatchAggregator<TItem, TResult>
+    {
+        /// <summary>
+        /// Sends a batch, returns <c>null</c> if the batch route rejected it.
+        /// </summary>
+        private readonly Func<IList<TItem>, Task<IList<TResult>>> sendBatch;
+
+        /// <summary>
+        /// Sends a single item.
+        /// </summary>
+        private readonly Func<TItem, Task<TResult>> sendSingle;
+
+        /// <summary>
+        /// The lock that guards <see cref="pending"/>.
+        /// </summary>
+        private readonly object pendingLock = new object();
+
+        /// <summary>
+        /// The batch that is collecting items, if any.
+        /// </summary>
+        private Batch pending;
+
+        /// <summary>
+        /// Initializes a new instance of the <see cref="BatchAggregator{TItem, TResult}"/> class.
+        /// </summary>
+        /// <param name="sendBatch">Sends a batch, the task returns <c>null</c> if the
+        /// batch route rejected it.</param>
+        /// <param name="sendSingle">Sends a single item.</param>
+        /// <param name="maxItems">The maximum number of items in a batch.</param>
+        /// <param name="window">How long to wait for more items before sending a batch.</param>
+        internal BatchAggregator(
+            Func<IList<TItem>, Task<IList<TResult>>> sendBatch,
+            Func<TItem, Task<TResult>> sendSingle,
+            int maxItems,
+            TimeSpan window)
+        {
+            if (maxItems <= 0)
+            {
+                throw new ArgumentOutOfRangeException("maxItems");
+            }
+
+            if (window < TimeSpan.Zero)
+            {
+                throw new ArgumentOutOfRangeException("window");
+            }
+
+            this.sendBatch = sendBatch;
+            this.sendSingle = sendSingle;
+            this.MaxItems = maxItems;
+            this.Window = window;
+        }
+
+        /// <summary>
+        /// Gets the maximum number of items in a batch.
+        /// </summary>
+        public int MaxItems { get; private set; }
+
+        /// <summary>
+        /// Gets how long to wait for more items before sending a batch.
+        /// </summary>
+        public TimeSpan Window { get; private set; }
+
+        /// <summary>
+        /// Adds an item to the next batch.
+        /// </summary>
+        /// <param name="item">The item.</param>
+        /// <returns>The task that represents the asynchronous send operation. The
+        /// TResult parameter contains the result for the item.</returns>
+        public Task<TResult> SendAsync(TItem item)
+        {
+            var completion = new TaskCompletionSource<TResult>();
+            Batch started = null;
+            Batch full = null;
+
+            lock (this.pendingLock)
+            {
+                if (this.pending == null)
+                {
+                    this.pending = started = new Batch();
+                }
+
+                this.pending.Items.Add(item);
+                this.pending.Completions.Add(completion);
+
+                if (this.pending.Items.Count >= this.MaxItems)
+                {
+                    full = this.pending;
+                    this.pending = null;
+                }
+            }
+
+            // Not awaited on purpose: the batch is sent in the background, and
+            // any failure is set on the task of each item rather than thrown.
+            if (full != null)
+            {
+                var ignored = this.SendBatchAsync(full);
+            }
+            else if (started != null)
+            {
+                var ignored = this.SendAfterWindowAsync(started);
+            }
+
+            return completion.Task;
+        }
+
+        /// <summary>
+        /// Sends a batch once the window has passed, unless it was sent because
+        /// it filled up.
+        /// </summary>
+        /// <param name="batch">The batch.</param>
+        /// <returns>The task that represents the asynchronous send operation.</returns>
+        private async Task SendAfterWindowAsync(Batch batch)
+        {
+#if PORTABLE40
+            await TaskEx.Delay(this.Window).ConfigureAwait(false);
+#else
+            await Task.Delay(this.Window).ConfigureAwait(false);
+#endif
+
+            lock (this.pendingLock)
+            {
+                if (this.pending != batch)
+                {
+                    return;
+                }
+
+                this.pending = null;
+            }
+
+            await this.SendBatchAsync(batch).ConfigureAwait(false);
+        }
+
+        /// <summary>
+        /// Sends a batch and completes the task of each item.
+        /// </summary>
+        /// <param name="batch">The batch.</param>
+        /// <returns>The task that represents the asynchronous send operation.</returns>
+        private async Task SendBatchAsync(Batch batch)
+        {
+            IList<TResult> results;
+            try
+            {
+                results = await this.sendBatch(batch.Items).ConfigureAwait(false);
+            }
+            catch (Exception e)
+            {
+                foreach (var completion in batch.Completions)
+                {
+                    completion.TrySetException(e);
+                }
+
+                return;
+            }
+
+            if (results != null && results.Count == batch.Items.Count)
+            {
+                for (var i = 0; i < results.Count; i++)
+                {
+                    batch.Completions[i].TrySetResult(results[i]);
+                }
+
+                return;
+            }
+
+            var singles = new List<Task>(batch.Items.Count);
+            for (var i = 0; i < batch.Items.Count; i++)
+            {
+                singles.Add(this.SendSingleAsync(batch.Items[i], batch.Completions[i]));
+            }
+
+#if PORTABLE40
+            await TaskEx.WhenAll(singles).ConfigureAwait(false);
+#else
+            await Task.WhenAll(singles).ConfigureAwait(false);
+#endif
+        }
+
+        /// <summary>
+        /// Sends an item to the single route and completes its task.
+        /// </summary>
+        /// <param name="item">The item.</param>
+        /// <param name="completion">The completion source of the item.</param>
+        /// <returns>The task that represents the asynchronous send operation.</returns>
+        private async Task SendSingleAsync(TItem item, TaskCompletionSource<TResult> completion)
+        {
+            try
+            {
+                completion.TrySetResult(await this.sendSingle(item).ConfigureAwait(false));
+            }
+            catch (Exception e)
+            {
+                completion.TrySetException(e);
+            }
+        }
+
+        /// <summary>
+        /// The items of a batch and the completion sources of their tasks.
+        /// </summary>
+        private class Batch
+        {
+            /// <summary>
+            /// Initializes a new instance of the <see cref="Batch"/> class.
+            /// </summary>
+            public Batch()
+            {
+                this.Items = new List<TItem>();
+                this.Completions = new List<TaskCompletionSource<TResult>>();
+            }
+
+            /// <summary>
+            /// Gets the items.
+            /// </summary>
+            public List<TItem> Items { get; private set; }
+
+            /// <summary>
+            /// Gets the completion sources, in the order of the items.
+            /// </summary>
+            public List<TaskCompletionSource<TResult>> Completions { get; private set; }
+        }
+    }
+}
@@ -39,9 +39,10 @@ namespace Dropbox.Api
         /// <summary>
         /// Initializes a new instance of the <see cref="T:Dropbox.Api.DropboxAppClient"/> class.
         /// </summary>
-        /// <param name="options">The request handler options.</param>
+        /// <param name="options">The request handler options, which are disposed with
+        /// the client.</param>
         private DropboxAppClient(DropboxRequestHandlerOptions options)
-            : base(new DropboxRequestHandler(options))
+            : base(new DropboxRequestHandler(options, ownsOptions: true))
         {
         }
 
@@ -46,7 +46,7 @@ namespace Dropbox.Api
         /// <param name="oauth2AccessToken">The oauth2 access token for making client requests.</param>
         /// <param name="config">The <see cref="DropboxClientConfig"/>.</param>
         public DropboxClient(string oauth2AccessToken, DropboxClientConfig config)
-            : this(new DropboxRequestHandlerOptions(config, oauth2AccessToken))
+            : this(new DropboxRequestHandler(new DropboxRequestHandlerOptions(config, oauth2AccessToken), ownsOptions: true))
         {
             if (oauth2AccessToken == null)
             {
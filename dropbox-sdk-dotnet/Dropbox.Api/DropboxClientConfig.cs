@@ -66,5 +66,70 @@ namespace Dropbox.Api
         /// http client with a longer timeout (480 seconds) will be created.
         /// </summary>
         public HttpClient LongPollHttpClient { get; set; }
+
+        /// <summary>
+        /// Gets or sets the cache for the responses of read only routes. If not set,
+        /// responses are not cached.
+        /// </summary>
+        /// <remarks>
+        /// One cache can be shared by several clients, entries are kept apart by the
+        /// credentials and user selection of each client.
+        /// </remarks>
+        public ResponseCache ResponseCache { get; set; }
+
+        /// <summary>
+        /// Gets or sets a value indicating whether identical concurrent calls to
+        /// idempotent routes, such as <c>files/get_metadata</c>, share one request.
+        /// Defaults to <c>false</c>.
+        /// </summary>
+        /// <remarks>
+        /// Calls are identical when they have the same route, argument, credentials
+        /// and user selection. The callers that share a request each decode its
+        /// response, so each gets its own result object.
+        /// </remarks>
+        public bool CoalesceRequests { get; set; }
+
+        /// <summary>
+        /// Gets or sets the limiter for the requests sent by the client. If not set,
+        /// requests are not limited and rate limit errors are thrown to the caller.
+        /// </summary>
+        /// <remarks>
+        /// With a limiter, requests that get a rate limit error are sent again once
+        /// the time given by the server has passed, up to <see cref="MaxRetriesOnError"/>
+        /// times. Share one limiter between the clients that use the same access token.
+        /// </remarks>
+        public RateLimiter RateLimiter { get; set; }
+
+        /// <summary>
+        /// Gets or sets the policy for sending a second request when a call to an
+        /// idempotent route is slow. If not set, requests are not hedged.
+        /// </summary>
+        public HedgingPolicy HedgingPolicy { get; set; }
+
+        /// <summary>
+        /// Gets or sets the pool of http clients, one per API host, each with its
+        /// own connection settings. Used for the hosts whose client is not set
+        /// through <see cref="HttpClient"/> or <see cref="LongPollHttpClient"/>.
+        /// </summary>
+        /// <remarks>
+        /// Share one pool between clients so they share connections. The pool is
+        /// not disposed with the client.
+        /// </remarks>
+        public HttpClientPool HttpClientPool { get; set; }
+
+        /// <summary>
+        /// Gets or sets a value indicating whether the default http client asks for
+        /// gzip or deflate compressed responses from RPC routes, and decompresses
+        /// them as they are read. Default value is <c>false</c>.
+        /// </summary>
+        /// <remarks>
+        /// Download routes are sent to another host and always return the raw file
+        /// content. Has no effect when <see cref="HttpClient"/> or
+        /// <see cref="HttpClientPool"/> is set, or on platforms without automatic
+        /// decompression. The http client is shared by all clients created from
+        /// this client, such as with <see cref="DropboxTeamClient.AsMember"/>, and is
+        /// disposed with the client created from this config.
+        /// </remarks>
+        public bool AcceptCompressedResponses { get; set; }
     }
 }
@@ -0,0 +1,334 @@
+//-----------------------------------------------------------------------------
+// <copyright file="DropboxContentHasher.cs" company="Dropbox Inc">
+//  Copyright (c) Dropbox Inc. All rights reserved.
+// </copyright>
+//-----------------------------------------------------------------------------
+
+#if !PORTABLE && !PORTABLE40
+namespace Dropbox.Api
+{
+    using System;
+    using System.Collections.Generic;
+    using System.IO;
+    using System.Linq;
+    using System.Security.Cryptography;
+    using System.Text;
+    using System.Threading;
+    using System.Threading.Tasks;
+
+    /// <summary>
+    /// Computes the content hash Dropbox reports for files, the <c>content_hash</c>
+    /// field of the file metadata.
+    /// </summary>
+    /// <remarks>
+    /// <para>The content is split into blocks of <see cref="BlockSize"/> bytes, each block
+    /// is hashed with SHA-256 and the hash is the SHA-256 of the concatenated block
+    /// hashes.</para>
+    /// <para>An instance hashes its input on the calling thread, as any
+    /// <see cref="HashAlgorithm"/> does. <see cref="HashStreamAsync"/> and
+    /// <see cref="HashFileAsync"/> hash the blocks on several cores at once.</para>
+    /// </remarks>
+    public sealed class DropboxContentHasher : HashAlgorithm
+    {
+        /// <summary>
+        /// The size of the blocks the content is split into.
+        /// </summary>
+        public const int BlockSize = 4 * 1024 * 1024;
+
+        /// <summary>
+        /// The hash of the block hashes.
+        /// </summary>
+        private readonly SHA256 overallHasher = SHA256.Create();
+
+        /// <summary>
+        /// The hash of the current block.
+        /// </summary>
+        private readonly SHA256 blockHasher = SHA256.Create();
+
+        /// <summary>
+        /// The number of bytes hashed into the current block.
+        /// </summary>
+        private int blockPosition;
+
+        /// <summary>
+        /// Initializes a new instance of the <see cref="DropboxContentHasher"/> class.
+        /// </summary>
+        public DropboxContentHasher()
+        {
+            this.HashSizeValue = 256;
+        }
+
+        /// <summary>
+        /// Converts a hash to the lower case hexadecimal form used by the API.
+        /// </summary>
+        /// <param name="hash">The hash.</param>
+        /// <returns>The hexadecimal string.</returns>
+        public static string ToHex(byte[] hash)
+        {
+            if (hash == null)
+            {
+                throw new ArgumentNullException("hash");
+            }
+
+            var builder = new StringBuilder(hash.Length * 2);
+            foreach (var b in hash)
+            {
+                builder.Append(b.ToString("x2"));
+            }
+
+            return builder.ToString();
+        }
+
+        /// <summary>
+        /// Computes the content hash of a stream from its current position to its
+        /// end, hashing blocks on several cores while the next blocks are read.
+        /// </summary>
+        /// <param name="stream">The stream.</param>
+        /// <param name="parallelism">The number of blocks hashed at a time, or zero
+        /// for the number of processors.</param>
+        /// <returns>The task that represents the asynchronous hash. The TResult
+        /// parameter contains the hash in hexadecimal form.</returns>
+        public static async Task<string> HashStreamAsync(Stream stream, int parallelism = 0)
+        {
+            if (stream == null)
+            {
+                throw new ArgumentNullException("stream");
+            }
+
+            parallelism = GetParallelism(parallelism);
+
+            var blockHashes = new List<byte[]>();
+            var window = new Queue<KeyValuePair<Task<byte[]>, byte[]>>();
+            while (true)
+            {
+                byte[] buffer;
+                if (window.Count == parallelism)
+                {
+                    var oldest = window.Dequeue();
+                    blockHashes.Add(await oldest.Key.ConfigureAwait(false));
+                    buffer = oldest.Value;
+                }
+                else
+                {
+                    buffer = new byte[BlockSize];
+                }
+
+                var count = await ReadBlockAsync(stream, buffer).ConfigureAwait(false);
+                if (count == 0)
+                {
+                    break;
+                }
+
+                window.Enqueue(new KeyValuePair<Task<byte[]>, byte[]>(
+                    Task.Run(() => HashBlock(buffer, count)), buffer));
+
+                if (count < BlockSize)
+                {
+                    break;
+                }
+            }
+
+            while (window.Count > 0)
+            {
+                blockHashes.Add(await window.Dequeue().Key.ConfigureAwait(false));
+            }
+
+            return CombineBlockHashes(blockHashes);
+        }
+
+        /// <summary>
+        /// Computes the content hash of a file, reading and hashing blocks on
+        /// several cores at once.
+        /// </summary>
+        /// <param name="path">The path of the file.</param>
+        /// <param name="parallelism">The number of blocks hashed at a time, or zero
+        /// for the number of processors.</param>
+        /// <returns>The task that represents the asynchronous hash. The TResult
+        /// parameter contains the hash in hexadecimal form.</returns>
+        public static async Task<string> HashFileAsync(string path, int parallelism = 0)
+        {
+            if (path == null)
+            {
+                throw new ArgumentNullException("path");
+            }
+
+            var length = new FileInfo(path).Length;
+            var blockHashes = new byte[(length + BlockSize - 1) / BlockSize][];
+            var next = -1;
+
+            var workers = Enumerable.Range(0, Math.Min(GetParallelism(parallelism), blockHashes.Length))
+                .Select(_ => Task.Run(() =>
+                {
+                    using (var file = new FileStream(path, FileMode.Open, FileAccess.Read, FileShare.Read))
+                    {
+                        var buffer = new byte[BlockSize];
+                        int index;
+                        while ((index = Interlocked.Increment(ref next)) < blockHashes.Length)
+                        {
+                            file.Position = (long)index * BlockSize;
+                            var count = ReadBlock(file, buffer);
+                            blockHashes[index] = HashBlock(buffer, count);
+                        }
+                    }
+                }));
+
+            await Task.WhenAll(workers).ConfigureAwait(false);
+            return CombineBlockHashes(blockHashes);
+        }
+
+        /// <summary>
+        /// Resets the hasher so it can hash new content.
+        /// </summary>
+        public override void Initialize()
+        {
+            this.overallHasher.Initialize();
+            this.blockHasher.Initialize();
+            this.blockPosition = 0;
+        }
+
+        /// <summary>
+        /// Hashes a part of the content.
+        /// </summary>
+        /// <param name="array">The buffer that holds the content.</param>
+        /// <param name="ibStart">The offset of the content in the buffer.</param>
+        /// <param name="cbSize">The number of bytes of content.</param>
+        protected override void HashCore(byte[] array, int ibStart, int cbSize)
+        {
+            while (cbSize > 0)
+            {
+                if (this.blockPosition == BlockSize)
+                {
+                    this.FinishBlock();
+                }
+
+                var count = Math.Min(cbSize, BlockSize - this.blockPosition);
+                this.blockHasher.TransformBlock(array, ibStart, count, array, ibStart);
+                this.blockPosition += count;
+                ibStart += count;
+                cbSize -= count;
+            }
+        }
+
+        /// <summary>
+        /// Finishes the hash.
+        /// </summary>
+        /// <returns>The hash.</returns>
+        protected override byte[] HashFinal()
+        {
+            if (this.blockPosition > 0)
+            {
+                this.FinishBlock();
+            }
+
+            this.overallHasher.TransformFinalBlock(new byte[0], 0, 0);
+            return this.overallHasher.Hash;
+        }
+
+        /// <summary>
+        /// Releases the hashers.
+        /// </summary>
+        /// <param name="disposing">If called from <see cref="IDisposable.Dispose"/>.</param>
+        protected override void Dispose(bool disposing)
+        {
+            if (disposing)
+            {
+                this.overallHasher.Dispose();
+                this.blockHasher.Dispose();
+            }
+
+            base.Dispose(disposing);
+        }
+
+        /// <summary>
+        /// Gets the number of blocks hashed at a time.
+        /// </summary>
+        /// <param name="parallelism">The requested number, or zero for the number of processors.</param>
+        /// <returns>The number of blocks.</returns>
+        private static int GetParallelism(int parallelism)
+        {
+            if (parallelism < 0)
+            {
+                throw new ArgumentOutOfRangeException("parallelism");
+            }
+
+            return parallelism == 0 ? Environment.ProcessorCount : parallelism;
+        }
+
+        /// <summary>
+        /// Reads a block, or what is left of the stream if that is shorter.
+        /// </summary>
+        /// <param name="stream">The stream.</param>
+        /// <param name="buffer">The buffer of <see cref="BlockSize"/> bytes.</param>
+        /// <returns>The number of bytes read.</returns>
+        private static int ReadBlock(Stream stream, byte[] buffer)
+        {
+            var count = 0;
+            int read;
+            while (count < BlockSize && (read = stream.Read(buffer, count, BlockSize - count)) > 0)
+            {
+                count += read;
+            }
+
+            return count;
+        }
+
+        /// <summary>
+        /// Asynchronously reads a block, or what is left of the stream if that is shorter.
+        /// </summary>
+        /// <param name="stream">The stream.</param>
+        /// <param name="buffer">The buffer of <see cref="BlockSize"/> bytes.</param>
+        /// <returns>The number of bytes read.</returns>
+        private static async Task<int> ReadBlockAsync(Stream stream, byte[] buffer)
+        {
+            var count = 0;
+            int read;
+            while (count < BlockSize &&
+                (read = await stream.ReadAsync(buffer, count, BlockSize - count).ConfigureAwait(false)) > 0)
+            {
+                count += read;
+            }
+
+            return count;
+        }
+
+        /// <summary>
+        /// Hashes one block.
+        /// </summary>
+        /// <param name="buffer">The buffer that holds the block.</param>
+        /// <param name="count">The length of the block.</param>
+        /// <returns>The hash of the block.</returns>
+        private static byte[] HashBlock(byte[] buffer, int count)
+        {
+            using (var sha = SHA256.Create())
+            {
+                return sha.ComputeHash(buffer, 0, count);
+            }
+        }
+
+        /// <summary>
+        /// Hashes the block hashes into the content hash.
+        /// </summary>
+        /// <param name="blockHashes">The block hashes, in content order.</param>
+        /// <returns>The hash in hexadecimal form.</returns>
+        private static string CombineBlockHashes(IEnumerable<byte[]> blockHashes)
+        {
+            using (var sha = SHA256.Create())
+            {
+                return ToHex(sha.ComputeHash(blockHashes.SelectMany(h => h).ToArray()));
+            }
+        }
+
+        /// <summary>
+        /// Adds the hash of the current block to the overall hash and starts a new block.
+        /// </summary>
+        private void FinishBlock()
+        {
+            this.blockHasher.TransformFinalBlock(new byte[0], 0, 0);
+            var blockHash = this.blockHasher.Hash;
+            this.overallHasher.TransformBlock(blockHash, 0, blockHash.Length, blockHash, 0);
+            this.blockHasher.Initialize();
+            this.blockPosition = 0;
+        }
+    }
+}
+#endif
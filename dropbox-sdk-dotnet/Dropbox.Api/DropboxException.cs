@@ -252,4 +252,31 @@ namespace Dropbox.Api
             get { return true; }
         }
     }
+
+    /// <summary>
+    /// An exception that is caused by a cursor watched by a <see cref="LongpollWatcher"/>
+    /// failing to poll with an error that retrying does not fix. The cursor is no longer
+    /// watched.
+    /// </summary>
+    public class LongpollWatchException : DropboxException
+    {
+        /// <summary>
+        /// Initializes a new instance of the <see cref="LongpollWatchException"/> class.
+        /// </summary>
+        /// <param name="key">The caller's key for the cursor.</param>
+        /// <param name="inner">The error of the poll.</param>
+        internal LongpollWatchException(string key, Exception inner)
+            : base(null, "Stopped watching the cursor of " + key + ": " + inner.Message, inner)
+        {
+            this.Key = key;
+        }
+
+        /// <summary>
+        /// Gets the caller's key for the cursor that is no longer watched.
+        /// </summary>
+        /// <value>
+        /// The key.
+        /// </value>
+        public string Key { get; private set; }
+    }
 }
@@ -16,13 +16,12 @@ namespace Dropbox.Api
     using System.Net.Http.Headers;
     using System.Reflection;
     using System.Text;
+    using System.Threading;
     using System.Threading.Tasks;
 
     using Dropbox.Api.Stone;
     using Dropbox.Api.Common;
 
-    using Newtonsoft.Json.Linq;
-
     /// <summary>
     /// The object used to to make requests to the Dropbox API.
     /// </summary>
@@ -43,6 +42,12 @@ namespace Dropbox.Api
         /// </summary>
         private const string DropboxApiResultHeader = "Dropbox-API-Result";
 
+        /// <summary>
+        /// The random source for retry backoff, shared so that concurrent retries
+        /// are spread out rather than seeded alike.
+        /// </summary>
+        private static readonly Random Jitter = new Random();
+
         /// <summary>
         /// The member id of the selected user.
         /// </summary>
@@ -63,6 +68,12 @@ namespace Dropbox.Api
         /// </summary>
         private readonly DropboxRequestHandlerOptions options;
 
+        /// <summary>
+        /// If the handler disposes the options, which is the case for the handler of
+        /// the client created from the config but not for the handlers derived from it.
+        /// </summary>
+        private readonly bool ownsOptions;
+
         /// <summary>
         /// The default http client instance.
         /// </summary>
@@ -79,11 +90,14 @@ namespace Dropbox.Api
         /// <param name="options">The configuration options for dropbox client.</param>
         /// <param name="selectUser">The member id of the selected user.</param>
         /// <param name="selectAdmin">The member id of the selected admin.</param>
+        /// <param name="pathRoot">The path root value used as Dropbox-Api-Path-Root header.</param>
+        /// <param name="ownsOptions">If the handler disposes the options when it is disposed.</param>
         public DropboxRequestHandler(
             DropboxRequestHandlerOptions options,
             string selectUser = null,
             string selectAdmin = null,
-            PathRoot pathRoot = null)
+            PathRoot pathRoot = null,
+            bool ownsOptions = false)
         {
             if (options == null)
             {
@@ -94,6 +108,7 @@ namespace Dropbox.Api
             this.selectUser = selectUser;
             this.selectAdmin = selectAdmin;
             this.pathRoot = pathRoot;
+            this.ownsOptions = ownsOptions;
         }
 
         /// <summary>
@@ -167,9 +182,29 @@ namespace Dropbox.Api
             IDecoder<TResponse> resposneDecoder,
             IDecoder<TError> errorDecoder)
         {
-            var serializedArg = JsonWriter.Write(request, requestEncoder);
-            var res = await this.RequestJsonStringWithRetry(host, route, auth, RouteStyle.Rpc, serializedArg)
-                .ConfigureAwait(false);
+            var cache = this.options.ResponseCache;
+            var cacheable = cache != null && RouteTraits.Has(route, RouteTrait.Cacheable);
+            var idempotent = RouteTraits.Has(route, RouteTrait.Idempotent);
+            if (cacheable || (idempotent && (this.options.RequestCoalescer != null || this.options.HedgingPolicy != null)))
+            {
+                return await this.SendSharedRpcRequestAsync(
+                    cacheable ? cache : null, request, host, route, auth, requestEncoder, resposneDecoder, errorDecoder)
+                    .ConfigureAwait(false);
+            }
+
+            Result res;
+            using (var serializedArg = JsonWriter.WriteUtf8(request, requestEncoder))
+            {
+                res = await this.RequestJsonStringWithRetry(
+                    host,
+                    route,
+                    auth,
+                    RouteStyle.Rpc,
+                    null,
+                    serializedArg.OpenStream(),
+                    readResponse: json => JsonReader.Read(json, resposneDecoder))
+                    .ConfigureAwait(false);
+            }
 
             if (res.IsError)
             {
@@ -177,7 +212,12 @@ namespace Dropbox.Api
                     res.ObjectResult, errorDecoder, () => new ApiException<TError>(res.RequestId));
             }
 
-            return JsonReader.Read(res.ObjectResult, resposneDecoder);
+            if (cache != null && !idempotent)
+            {
+                cache.Invalidate(ResponseCache.GetNamespace(route));
+            }
+
+            return (TResponse)res.Response;
         }
 
         /// <summary>
@@ -218,6 +258,11 @@ namespace Dropbox.Api
                     res.ObjectResult, errorDecoder, () => new ApiException<TError>(res.RequestId));
             }
 
+            if (this.options.ResponseCache != null)
+            {
+                this.options.ResponseCache.Invalidate(ResponseCache.GetNamespace(route));
+            }
+
             return JsonReader.Read(res.ObjectResult, resposneDecoder);
         }
 
@@ -238,8 +283,104 @@ namespace Dropbox.Api
         /// <exception cref="ApiException{TError}">
         /// This exception is thrown when there is an error reported by the server.
         /// </exception>
-        async Task<IDownloadResponse<TResponse>> ITransport.SendDownloadRequestAsync<TRequest, TResponse, TError>(
+        Task<IDownloadResponse<TResponse>> ITransport.SendDownloadRequestAsync<TRequest, TResponse, TError>(
+            TRequest request,
+            string host,
+            string route,
+            string auth,
+            IEncoder<TRequest> requestEncoder,
+            IDecoder<TResponse> resposneDecoder,
+            IDecoder<TError> errorDecoder)
+        {
+            return this.SendDownloadRequestAsync(
+                request, null, host, route, auth, requestEncoder, resposneDecoder, errorDecoder);
+        }
+
+        /// <summary>
+        /// Sends the download request for a byte range of the content asynchronously.
+        /// </summary>
+        /// <typeparam name="TRequest">The type of the request.</typeparam>
+        /// <typeparam name="TResponse">The type of the response.</typeparam>
+        /// <typeparam name="TError">The type of the error.</typeparam>
+        /// <param name="request">The request.</param>
+        /// <param name="offset">The offset of the first byte of the range.</param>
+        /// <param name="length">The length of the range.</param>
+        /// <param name="host">The server host to send the request to.</param>
+        /// <param name="route">The route name.</param>
+        /// <param name="auth">The auth type of the route.</param>
+        /// <param name="requestEncoder">The request encoder.</param>
+        /// <param name="resposneDecoder">The response decoder.</param>
+        /// <param name="errorDecoder">The error decoder.</param>
+        /// <returns>An asynchronous task for the response.</returns>
+        /// <exception cref="ApiException{TError}">
+        /// This exception is thrown when there is an error reported by the server.
+        /// </exception>
+        async Task<IDownloadResponse<TResponse>> ITransport.SendDownloadRangeRequestAsync<TRequest, TResponse, TError>(
             TRequest request,
+            long offset,
+            long length,
+            string host,
+            string route,
+            string auth,
+            IEncoder<TRequest> requestEncoder,
+            IDecoder<TResponse> resposneDecoder,
+            IDecoder<TError> errorDecoder)
+        {
+            if (offset < 0)
+            {
+                throw new ArgumentOutOfRangeException("offset");
+            }
+
+            if (length <= 0)
+            {
+                throw new ArgumentOutOfRangeException("length");
+            }
+
+            try
+            {
+                return await this.SendDownloadRequestAsync(
+                    request,
+                    new RangeHeaderValue(offset, offset + length - 1),
+                    host,
+                    route,
+                    auth,
+                    requestEncoder,
+                    resposneDecoder,
+                    errorDecoder).ConfigureAwait(false);
+            }
+            catch (HttpException e)
+            {
+                // 416 - Range Not Satisfiable, the content is empty so even its
+                // first byte is out of range
+                if (offset > 0 || e.StatusCode != 416)
+                {
+                    throw;
+                }
+            }
+
+            return await this.SendDownloadRequestAsync(
+                request, null, host, route, auth, requestEncoder, resposneDecoder, errorDecoder)
+                .ConfigureAwait(false);
+        }
+
+        /// <summary>
+        /// Sends the download request asynchronously.
+        /// </summary>
+        /// <typeparam name="TRequest">The type of the request.</typeparam>
+        /// <typeparam name="TResponse">The type of the response.</typeparam>
+        /// <typeparam name="TError">The type of the error.</typeparam>
+        /// <param name="request">The request.</param>
+        /// <param name="range">The byte range to download, or <c>null</c> for all content.</param>
+        /// <param name="host">The server host to send the request to.</param>
+        /// <param name="route">The route name.</param>
+        /// <param name="auth">The auth type of the route.</param>
+        /// <param name="requestEncoder">The request encoder.</param>
+        /// <param name="resposneDecoder">The response decoder.</param>
+        /// <param name="errorDecoder">The error decoder.</param>
+        /// <returns>An asynchronous task for the response.</returns>
+        private async Task<IDownloadResponse<TResponse>> SendDownloadRequestAsync<TRequest, TResponse, TError>(
+            TRequest request,
+            RangeHeaderValue range,
             string host,
             string route,
             string auth,
@@ -248,7 +389,8 @@ namespace Dropbox.Api
             IDecoder<TError> errorDecoder)
         {
             var serializedArg = JsonWriter.Write(request, requestEncoder, true);
-            var res = await this.RequestJsonStringWithRetry(host, route, auth, RouteStyle.Download, serializedArg)
+            var res = await this.RequestJsonStringWithRetry(
+                host, route, auth, RouteStyle.Download, serializedArg, range: range)
                 .ConfigureAwait(false);
 
             if (res.IsError)
@@ -261,6 +403,99 @@ namespace Dropbox.Api
             return new DownloadResponse<TResponse>(response, res.HttpResponse);
         }
 
+        /// <summary>
+        /// Sends the RPC request of a cacheable or idempotent route, answering it
+        /// from the response cache or joining an identical request in flight when
+        /// possible, and hedging it when enabled.
+        /// </summary>
+        /// <typeparam name="TRequest">The type of the request.</typeparam>
+        /// <typeparam name="TResponse">The type of the response.</typeparam>
+        /// <typeparam name="TError">The type of the error.</typeparam>
+        /// <param name="cache">The response cache, or <c>null</c> if the route is
+        /// not cached.</param>
+        /// <param name="request">The request.</param>
+        /// <param name="host">The server host to send the request to.</param>
+        /// <param name="route">The route name.</param>
+        /// <param name="auth">The auth type of the route.</param>
+        /// <param name="requestEncoder">The request encoder.</param>
+        /// <param name="resposneDecoder">The response decoder.</param>
+        /// <param name="errorDecoder">The error decoder.</param>
+        /// <returns>An asynchronous task for the response.</returns>
+        private async Task<TResponse> SendSharedRpcRequestAsync<TRequest, TResponse, TError>(
+            ResponseCache cache,
+            TRequest request,
+            string host,
+            string route,
+            string auth,
+            IEncoder<TRequest> requestEncoder,
+            IDecoder<TResponse> resposneDecoder,
+            IDecoder<TError> errorDecoder)
+        {
+            var serializedArg = JsonWriter.Write(request, requestEncoder);
+            var key = ResponseCache.CreateKey(route, this.GetRequestContext(), serializedArg);
+
+            string cached;
+            if (cache != null && cache.TryGet(key, out cached))
+            {
+                return JsonReader.Read(cached, resposneDecoder);
+            }
+
+            var idempotent = RouteTraits.Has(route, RouteTrait.Idempotent);
+            Func<Task<Result>> call = async () =>
+            {
+                var generation = cache != null ? cache.GetGeneration(route) : 0;
+
+                Result res;
+                if (idempotent && this.options.HedgingPolicy != null)
+                {
+                    res = await this.RequestJsonStringWithHedging(host, route, auth, serializedArg)
+                        .ConfigureAwait(false);
+                }
+                else
+                {
+                    res = await this.RequestJsonStringWithRetry(host, route, auth, RouteStyle.Rpc, serializedArg)
+                        .ConfigureAwait(false);
+                }
+
+                if (!res.IsError && cache != null)
+                {
+                    cache.Add(route, key, res.ObjectResult, generation);
+                }
+
+                return res;
+            };
+
+            // Callers that join a call share the response json rather than the
+            // decoded response, so each decodes it with its own decoder.
+            var coalescer = this.options.RequestCoalescer;
+            var result = coalescer != null && idempotent
+                ? await coalescer.RunAsync(key, call).ConfigureAwait(false)
+                : await call().ConfigureAwait(false);
+
+            if (result.IsError)
+            {
+                throw StructuredException<TError>.Decode<ApiException<TError>>(
+                    result.ObjectResult, errorDecoder, () => new ApiException<TError>(result.RequestId));
+            }
+
+            return JsonReader.Read(result.ObjectResult, resposneDecoder);
+        }
+
+        /// <summary>
+        /// Gets the part of the response cache and coalescing keys that identifies
+        /// the credentials and user selection of this handler.
+        /// </summary>
+        /// <returns>The request context.</returns>
+        private string GetRequestContext()
+        {
+            return string.Join(
+                "\n",
+                this.options.OAuth2AccessToken,
+                this.selectUser,
+                this.selectAdmin,
+                this.pathRoot == null ? null : JsonWriter.Write(this.pathRoot, PathRoot.Encoder));
+        }
+
         /// <summary>
         /// Requests the JSON string with retry.
         /// </summary>
@@ -268,9 +503,17 @@ namespace Dropbox.Api
         /// <param name="auth">The auth type of the route.</param>
         /// <param name="routeName">Name of the route.</param>
         /// <param name="routeStyle">The route style.</param>
-        /// <param name="requestArg">The request argument.</param>
+        /// <param name="requestArg">The request argument, if it is not given as
+        /// UTF-8 in <paramref name="body"/> for <see cref="RouteStyle.Rpc"/>.</param>
         /// <param name="body">The body to upload if <paramref name="routeStyle"/>
-        /// is <see cref="RouteStyle.Upload"/>.</param>
+        /// is <see cref="RouteStyle.Upload"/>, or the UTF-8 encoded request argument
+        /// for <see cref="RouteStyle.Rpc"/>.</param>
+        /// <param name="cancellationToken">Cancels the request.</param>
+        /// <param name="range">The byte range to download for <see cref="RouteStyle.Download"/>,
+        /// or <c>null</c> for all content.</param>
+        /// <param name="readResponse">Decodes the response of a successful
+        /// <see cref="RouteStyle.Rpc"/> request from the buffered content, or
+        /// <c>null</c> to return it as a string.</param>
         /// <returns>The asynchronous task with the result.</returns>
         private async Task<Result> RequestJsonStringWithRetry(
             string host,
@@ -278,11 +521,15 @@ namespace Dropbox.Api
             string auth,
             RouteStyle routeStyle,
             string requestArg,
-            Stream body = null)
+            Stream body = null,
+            CancellationToken cancellationToken = default(CancellationToken),
+            RangeHeaderValue range = null,
+            Func<TextReader, object> readResponse = null)
         {
             var attempt = 0;
+            var rateLimitAttempt = 0;
             var maxRetries = this.options.MaxClientRetries;
-            var r = new Random();
+            var limiter = host == HostType.ApiNotify ? null : this.options.RateLimiter;
 
             if (routeStyle == RouteStyle.Upload)
             {
@@ -303,14 +550,32 @@ namespace Dropbox.Api
             {
                 while (true)
                 {
+                    if (limiter != null)
+                    {
+                        await limiter.EnterAsync(host).ConfigureAwait(false);
+                    }
+
+                    var succeeded = false;
+                    TimeSpan backoff;
                     try
                     {
-                        return await this.RequestJsonString(host, routeName, auth, routeStyle, requestArg, body)
+                        var result = await this.RequestJsonString(
+                            host, routeName, auth, routeStyle, requestArg, body, cancellationToken, range, readResponse)
                             .ConfigureAwait(false);
+                        succeeded = true;
+                        return result;
                     }
-                    catch (RateLimitException)
+                    catch (RateLimitException e)
                     {
-                        throw;
+                        // without a limiter the caller decides how to wait, with one
+                        // the request waits for the limiter along with all others
+                        if (limiter == null || ++rateLimitAttempt > maxRetries)
+                        {
+                            throw;
+                        }
+
+                        limiter.OnRateLimited(TimeSpan.FromSeconds(e.ErrorResponse != null ? e.RetryAfter : 1));
+                        backoff = TimeSpan.Zero;
                     }
                     catch (RetryException)
                     {
@@ -320,15 +585,27 @@ namespace Dropbox.Api
                         {
                             throw;
                         }
+
+                        // use exponential backoff
+                        backoff = TimeSpan.FromSeconds(Math.Pow(2, attempt) * NextJitter());
+                    }
+                    finally
+                    {
+                        if (limiter != null)
+                        {
+                            limiter.Exit(succeeded);
+                        }
                     }
 
-                    // use exponential backoff
-                    var backoff = TimeSpan.FromSeconds(Math.Pow(2, attempt) * r.NextDouble());
+                    if (backoff > TimeSpan.Zero)
+                    {
 #if PORTABLE40
-                    await TaskEx.Delay(backoff);
+                        await TaskEx.Delay(backoff);
 #else
-                    await Task.Delay(backoff);
+                        await Task.Delay(backoff);
 #endif
+                    }
+
                     if (body != null)
                     {
                         body.Position = 0;
@@ -344,6 +621,110 @@ namespace Dropbox.Api
             }
         }
 
+        /// <summary>
+        /// Requests the JSON string of an idempotent RPC route, sending a second
+        /// request if the first is slow according to the hedging policy.
+        /// </summary>
+        /// <param name="host">The host.</param>
+        /// <param name="routeName">Name of the route.</param>
+        /// <param name="auth">The auth type of the route.</param>
+        /// <param name="requestArg">The request argument.</param>
+        /// <returns>The asynchronous task with the result of the first request
+        /// that succeeds.</returns>
+        private async Task<Result> RequestJsonStringWithHedging(
+            string host,
+            string routeName,
+            string auth,
+            string requestArg)
+        {
+            var policy = this.options.HedgingPolicy;
+            var delay = policy.StartRequest(routeName);
+            var started = DateTime.UtcNow;
+
+            if (delay == null)
+            {
+                var result = await this.RequestJsonStringWithRetry(host, routeName, auth, RouteStyle.Rpc, requestArg)
+                    .ConfigureAwait(false);
+                policy.Record(routeName, DateTime.UtcNow - started);
+                return result;
+            }
+
+            using (var primaryCancellation = new CancellationTokenSource())
+            using (var hedgeCancellation = new CancellationTokenSource())
+            {
+                var primary = this.RequestJsonStringWithRetry(
+                    host, routeName, auth, RouteStyle.Rpc, requestArg, null, primaryCancellation.Token);
+#if PORTABLE40
+                var first = await TaskEx.WhenAny(primary, TaskEx.Delay(delay.Value)).ConfigureAwait(false);
+#else
+                var first = await Task.WhenAny(primary, Task.Delay(delay.Value)).ConfigureAwait(false);
+#endif
+                if (first == primary || !policy.TryStartHedge())
+                {
+                    var result = await primary.ConfigureAwait(false);
+                    policy.Record(routeName, DateTime.UtcNow - started);
+                    return result;
+                }
+
+                var hedgeStarted = DateTime.UtcNow;
+                var hedge = this.RequestJsonStringWithRetry(
+                    host, routeName, auth, RouteStyle.Rpc, requestArg, null, hedgeCancellation.Token);
+#if PORTABLE40
+                var winner = await TaskEx.WhenAny(primary, hedge).ConfigureAwait(false);
+#else
+                var winner = await Task.WhenAny(primary, hedge).ConfigureAwait(false);
+#endif
+                // Whichever request is not awaited below, the faulted or the
+                // cancelled one, must have its exception observed.
+                ObserveException(primary);
+                ObserveException(hedge);
+
+                var loser = winner == primary ? hedge : primary;
+                if (winner.Status != TaskStatus.RanToCompletion)
+                {
+                    // the first to finish failed, the other one decides the outcome
+                    winner = loser;
+                    loser = null;
+                }
+
+                try
+                {
+                    var result = await winner.ConfigureAwait(false);
+                    policy.Record(routeName, DateTime.UtcNow - (winner == primary ? started : hedgeStarted));
+                    return result;
+                }
+                finally
+                {
+                    if (loser != null)
+                    {
+                        (loser == primary ? primaryCancellation : hedgeCancellation).Cancel();
+                    }
+                }
+            }
+        }
+
+        /// <summary>
+        /// Observes the exception of a task if it faults, so that it is not raised
+        /// as an unobserved task exception when the task is not awaited.
+        /// </summary>
+        /// <param name="task">The task.</param>
+        private static void ObserveException(Task task)
+        {
+            task.ContinueWith(t => { var ignored = t.Exception; }, TaskContinuationOptions.OnlyOnFaulted);
+        }
+
+        /// <summary>
+        /// Gets a random number between 0 and 1 used to spread out retries.
+        /// </summary>
+        /// <returns>The random number.</returns>
+        private static double NextJitter()
+        {
+            lock (Jitter)
+            {
+                return Jitter.NextDouble();
+            }
+        }
+
         /// <summary>
         /// Attempts to extract the value of a field named <c>error</c> from <paramref name="text"/>
         /// if it is a valid JSON object.
@@ -354,14 +735,7 @@ namespace Dropbox.Api
         {
             try
             {
-                var obj = JObject.Parse(text);
-                JToken error;
-                if (obj.TryGetValue("error", out error))
-                {
-                    return error.ToString();
-                }
-
-                return text;
+                return JsonReader.Read(text, ErrorFieldDecoder.Instance) ?? text;
             }
             catch (Exception)
             {
@@ -376,9 +750,17 @@ namespace Dropbox.Api
         /// <param name="routeName">Name of the route.</param>
         /// <param name="auth">The auth type of the route.</param>
         /// <param name="routeStyle">The route style.</param>
-        /// <param name="requestArg">The request argument.</param>
+        /// <param name="requestArg">The request argument, if it is not given as
+        /// UTF-8 in <paramref name="body"/> for <see cref="RouteStyle.Rpc"/>.</param>
         /// <param name="body">The body to upload if <paramref name="routeStyle"/>
-        /// is <see cref="RouteStyle.Upload"/>.</param>
+        /// is <see cref="RouteStyle.Upload"/>, or the UTF-8 encoded request argument
+        /// for <see cref="RouteStyle.Rpc"/>.</param>
+        /// <param name="cancellationToken">Cancels the request.</param>
+        /// <param name="range">The byte range to download for <see cref="RouteStyle.Download"/>,
+        /// or <c>null</c> for all content.</param>
+        /// <param name="readResponse">Decodes the response of a successful
+        /// <see cref="RouteStyle.Rpc"/> request from the buffered content, or
+        /// <c>null</c> to return it as a string.</param>
         /// <returns>The asynchronous task with the result.</returns>
         private async Task<Result> RequestJsonString(
             string host,
@@ -386,13 +768,25 @@ namespace Dropbox.Api
             string auth,
             RouteStyle routeStyle,
             string requestArg,
-            Stream body = null)
+            Stream body = null,
+            CancellationToken cancellationToken = default(CancellationToken),
+            RangeHeaderValue range = null,
+            Func<TextReader, object> readResponse = null)
         {
             var hostname = this.options.HostMap[host];
             var uri = this.GetRouteUri(hostname, routeName);
 
             var request = new HttpRequestMessage(HttpMethod.Post, uri);
 
+            if (this.options.HttpClientPool != null)
+            {
+                var version = this.options.HttpClientPool.GetSettings(host).HttpVersion;
+                if (version != null)
+                {
+                    request.Version = version;
+                }
+            }
+
             if (auth == AuthType.User || auth == AuthType.Team)
             {
                 request.Headers.Authorization = new AuthenticationHeaderValue("Bearer", this.options.OAuth2AccessToken);
@@ -433,10 +827,26 @@ namespace Dropbox.Api
             switch (routeStyle)
             {
                 case RouteStyle.Rpc:
-                    request.Content = new StringContent(requestArg, Encoding.UTF8, "application/json");
+                    if (body != null)
+                    {
+                        request.Content = new CustomStreamContent(body);
+                        request.Content.Headers.ContentType = new MediaTypeHeaderValue("application/json")
+                        {
+                            CharSet = "utf-8"
+                        };
+                    }
+                    else
+                    {
+                        request.Content = new StringContent(requestArg, Encoding.UTF8, "application/json");
+                    }
+
                     break;
                 case RouteStyle.Download:
                     request.Headers.Add(DropboxApiArgHeader, requestArg);
+                    if (range != null)
+                    {
+                        request.Headers.Range = range;
+                    }
 
                     // This is required to force libcurl remove default content type header.
                     request.Content = new StringContent("");
@@ -462,7 +872,8 @@ namespace Dropbox.Api
             }
 
             var disposeResponse = true;
-            var response = await this.getHttpClient(host).SendAsync(request, completionOption).ConfigureAwait(false);
+            var response = await this.getHttpClient(host).SendAsync(request, completionOption, cancellationToken)
+                .ConfigureAwait(false);
 
             var requestId = GetRequestId(response);
             try
@@ -515,6 +926,13 @@ namespace Dropbox.Api
                 {
                     if (routeStyle == RouteStyle.Download)
                     {
+                        if (range != null && range.Ranges.First().From > 0 &&
+                            response.StatusCode != HttpStatusCode.PartialContent)
+                        {
+                            throw new HttpException(
+                                requestId, (int)response.StatusCode, "The server ignored the requested range.", uri);
+                        }
+
                         disposeResponse = false;
                         return new Result
                         {
@@ -523,6 +941,20 @@ namespace Dropbox.Api
                             HttpResponse = response
                         };
                     }
+                    else if (readResponse != null)
+                    {
+                        // The content has been read into the buffer of the response by now,
+                        // so the decoder reads from memory without blocking on the network.
+                        using (var stream = await response.Content.ReadAsStreamAsync().ConfigureAwait(false))
+                        using (var reader = new StreamReader(stream, Encoding.UTF8))
+                        {
+                            return new Result
+                            {
+                                IsError = false,
+                                Response = readResponse(reader)
+                            };
+                        }
+                    }
                     else
                     {
                         return new Result
@@ -585,13 +1017,25 @@ namespace Dropbox.Api
         /// <returns>The <see cref="HttpClient"/>.</returns>
         private HttpClient getHttpClient(string host)
         {
-            if (host == HostType.ApiNotify)
+            var custom = host == HostType.ApiNotify ? this.options.LongPollHttpClient : this.options.HttpClient;
+            if (custom != null)
             {
-                return this.options.LongPollHttpClient ?? this.defaultLongPollHttpClient;
+                return custom;
             }
-            else
+
+            if (this.options.HttpClientPool != null)
+            {
+                return this.options.HttpClientPool.GetClient(host, this.options.HostMap[host]);
+            }
+
+            switch (host)
             {
-                return this.options.HttpClient ?? this.defaultHttpClient;
+                case HostType.Api:
+                    return this.options.CompressedHttpClient ?? this.defaultHttpClient;
+                case HostType.ApiNotify:
+                    return this.defaultLongPollHttpClient;
+                default:
+                    return this.defaultHttpClient;
             }
         }
 
@@ -606,6 +1050,11 @@ namespace Dropbox.Api
                 // HttpClient is safe for multiple disposal.
                 this.defaultHttpClient.Dispose();
                 this.defaultLongPollHttpClient.Dispose();
+
+                if (this.ownsOptions)
+                {
+                    this.options.Dispose();
+                }
             }
         }
 
@@ -641,6 +1090,15 @@ namespace Dropbox.Api
             /// </value>
             public string ObjectResult { get; set; }
 
+            /// <summary>
+            /// Gets or sets the decoded response, this is only set if the request
+            /// was given a reader for it.
+            /// </summary>
+            /// <value>
+            /// The decoded response.
+            /// </value>
+            public object Response { get; set; }
+
             /// <summary>
             /// Gets or sets the Dropbox request id.
             /// </summary>
@@ -656,6 +1114,54 @@ namespace Dropbox.Api
             public HttpResponseMessage HttpResponse { get; set; }
         }
 
+        /// <summary>
+        /// Decodes the <c>error</c> field of an error response in a single pass over
+        /// the json, as a string if it is one and as raw json otherwise.
+        /// </summary>
+        private sealed class ErrorFieldDecoder : StructDecoder<string>
+        {
+            /// <summary>
+            /// The instance.
+            /// </summary>
+            public static readonly ErrorFieldDecoder Instance = new ErrorFieldDecoder();
+
+            /// <summary>
+            /// Decode fields without ensuring start and end object.
+            /// </summary>
+            /// <param name="reader">The json reader.</param>
+            /// <returns>The error field, or <c>null</c> if there isn't one.</returns>
+            public override string DecodeFields(IJsonReader reader)
+            {
+                string error = null;
+                string fieldName;
+
+                while (TryReadPropertyName(reader, out fieldName))
+                {
+                    if (fieldName == "error" && error == null)
+                    {
+                        error = reader.IsStartObject || reader.IsStartArray
+                            ? reader.ReadRaw()
+                            : reader.ReadString();
+                    }
+                    else
+                    {
+                        reader.Skip();
+                    }
+                }
+
+                return error;
+            }
+
+            /// <summary>
+            /// Create a struct instance.
+            /// </summary>
+            /// <returns>The struct instance.</returns>
+            protected override string Create()
+            {
+                throw new InvalidOperationException();
+            }
+        }
+
         /// <summary>
         /// An implementation of the <see cref="T:Dropbox.Api.Stone.IDownloadResponse`1"/> interface.
         /// </summary>
@@ -709,6 +1215,72 @@ namespace Dropbox.Api
                 return this.httpResponse.Content.ReadAsStringAsync();
             }
 
+            /// <summary>
+            /// Asynchronously copies the content to a stream.
+            /// </summary>
+            /// <param name="destination">The stream to write the content to.</param>
+            /// <param name="progress">Reports the number of bytes copied so far, or <c>null</c>.</param>
+            /// <param name="cancellationToken">Cancels the copy.</param>
+            /// <returns>The number of bytes copied.</returns>
+            public Task<long> CopyContentToAsync(
+                Stream destination,
+                IProgress<long> progress = null,
+                CancellationToken cancellationToken = default(CancellationToken))
+            {
+                if (destination == null)
+                {
+                    throw new ArgumentNullException("destination");
+                }
+
+                return this.CopyContentToAsync(
+                    segment => destination.WriteAsync(segment.Array, segment.Offset, segment.Count, cancellationToken),
+                    progress,
+                    cancellationToken);
+            }
+
+            /// <summary>
+            /// Asynchronously passes the content to a callback, one pooled buffer at a time.
+            /// </summary>
+            /// <param name="write">Called with each part of the content.</param>
+            /// <param name="progress">Reports the number of bytes copied so far, or <c>null</c>.</param>
+            /// <param name="cancellationToken">Cancels the copy.</param>
+            /// <returns>The number of bytes copied.</returns>
+            public async Task<long> CopyContentToAsync(
+                Func<ArraySegment<byte>, Task> write,
+                IProgress<long> progress = null,
+                CancellationToken cancellationToken = default(CancellationToken))
+            {
+                if (write == null)
+                {
+                    throw new ArgumentNullException("write");
+                }
+
+                var buffer = BufferPool.Rent(BufferPool.BufferSize);
+                try
+                {
+                    long copied = 0;
+                    using (var content = await this.httpResponse.Content.ReadAsStreamAsync().ConfigureAwait(false))
+                    {
+                        int read;
+                        while ((read = await content.ReadAsync(buffer, 0, buffer.Length, cancellationToken).ConfigureAwait(false)) > 0)
+                        {
+                            await write(new ArraySegment<byte>(buffer, 0, read)).ConfigureAwait(false);
+                            copied += read;
+                            if (progress != null)
+                            {
+                                progress.Report(copied);
+                            }
+                        }
+                    }
+
+                    return copied;
+                }
+                finally
+                {
+                    BufferPool.Return(buffer);
+                }
+            }
+
             /// <summary>
             /// Disposes of the <see cref="HttpResponseMessage"/> in this instance.
             /// </summary>
@@ -794,7 +1366,7 @@ namespace Dropbox.Api
     /// <summary>
     /// The class which contains configurations for the request handler.
     /// </summary>
-    internal sealed class DropboxRequestHandlerOptions
+    internal sealed class DropboxRequestHandlerOptions : IDisposable
     {
         /// <summary>
         /// The default api domain
@@ -827,6 +1399,16 @@ namespace Dropbox.Api
             config.HttpClient,
             config.LongPollHttpClient)
         {
+            this.ResponseCache = config.ResponseCache;
+            this.RequestCoalescer = config.CoalesceRequests ? new RequestCoalescer() : null;
+            this.RateLimiter = config.RateLimiter;
+            this.HedgingPolicy = config.HedgingPolicy;
+            this.HttpClientPool = config.HttpClientPool;
+
+            if (config.AcceptCompressedResponses && config.HttpClient == null && config.HttpClientPool == null)
+            {
+                this.CompressedHttpClient = new HttpClient(HttpClientPool.CreateHandler(true));
+            }
         }
 
 
@@ -906,9 +1488,54 @@ namespace Dropbox.Api
         /// </summary>
         public string UserAgent { get; private set; }
 
+        /// <summary>
+        /// Gets the cache for the responses of read only routes, if any.
+        /// </summary>
+        public ResponseCache ResponseCache { get; private set; }
+
+        /// <summary>
+        /// Gets the coalescer for identical concurrent requests to idempotent routes,
+        /// if enabled.
+        /// </summary>
+        public RequestCoalescer RequestCoalescer { get; private set; }
+
+        /// <summary>
+        /// Gets the limiter for the requests sent, if any.
+        /// </summary>
+        public RateLimiter RateLimiter { get; private set; }
+
+        /// <summary>
+        /// Gets the policy for hedging slow calls to idempotent routes, if any.
+        /// </summary>
+        public HedgingPolicy HedgingPolicy { get; private set; }
+
+        /// <summary>
+        /// Gets the pool of per host http clients, if any.
+        /// </summary>
+        public HttpClientPool HttpClientPool { get; private set; }
+
+        /// <summary>
+        /// Gets the default http client for RPC routes when it accepts compressed
+        /// responses, if enabled. It is shared by every handler created with these
+        /// options, such as those of <see cref="DropboxTeamClient.AsMember"/>, and is
+        /// disposed with the options.
+        /// </summary>
+        public HttpClient CompressedHttpClient { get; private set; }
+
         /// <summary>
         /// Gets the maps from host types to domain names.
         /// </summary>
         public IDictionary<string, string> HostMap { get; private set; }
+
+        /// <summary>
+        /// Disposes the http client created for the options, if any.
+        /// </summary>
+        public void Dispose()
+        {
+            if (this.CompressedHttpClient != null)
+            {
+                this.CompressedHttpClient.Dispose();
+            }
+        }
     }
 }
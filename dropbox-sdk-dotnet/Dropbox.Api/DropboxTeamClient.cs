@@ -55,9 +55,10 @@ namespace Dropbox.Api
         /// <summary>
         /// Initializes a new instance of the <see cref="T:Dropbox.Api.DropboxTeamClient"/> class.
         /// </summary>
-        /// <param name="options">The request handler options.</param>
+        /// <param name="options">The request handler options, which are disposed with
+        /// the client.</param>
         private DropboxTeamClient(DropboxRequestHandlerOptions options)
-            : base(new DropboxRequestHandler(options))
+            : base(new DropboxRequestHandler(options, ownsOptions: true))
         {
             this.options = options;
         }
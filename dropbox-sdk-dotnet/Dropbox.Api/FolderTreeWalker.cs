@@ -0,0 +1,502 @@
+//-----------------------------------------------------------------------------
+// <copyright file="FolderTreeWalker.cs" company="Dropbox Inc">
+//  Copyright (c) Dropbox Inc. All rights reserved.
+// </copyright>
+//-----------------------------------------------------------------------------
+
+namespace Dropbox.Api
+{
+    using System;
+    using System.Collections.Generic;
+    using System.Threading;
+    using System.Threading.Tasks;
+
+    using Dropbox.Api.Files;
+    using Dropbox.Api.Files.Routes;
+
+    /// <summary>
+    /// Lists a folder and everything below it by listing many folders at once,
+    /// rather than following the single cursor of a recursive listing.
+    /// </summary>
+    /// <remarks>
+    /// <para>Each folder is listed without recursion by one of a bounded number of
+    /// workers. A worker lists the subfolders it finds itself, deepest first, and a
+    /// worker that runs out of folders takes the oldest folder found by another
+    /// worker, so the work spreads out over the whole tree.</para>
+    /// <para>The cursor returned by <see cref="WalkAsync"/> is taken from
+    /// <c>files/list_folder/get_latest_cursor</c> before the first folder is listed.
+    /// Passing it to <c>files/list_folder/continue</c> returns every change made
+    /// while the tree was walked, so the walk and the changes after it together
+    /// are consistent.</para>
+    /// </remarks>
+    public sealed class FolderTreeWalker
+    {
+        /// <summary>
+        /// Lists a folder, given its path.
+        /// </summary>
+        private readonly Func<string, Task<ListFolderResult>> listFolder;
+
+        /// <summary>
+        /// Continues a listing, given its cursor.
+        /// </summary>
+        private readonly Func<string, Task<ListFolderResult>> listFolderContinue;
+
+        /// <summary>
+        /// Gets the cursor of a recursive listing, given its path.
+        /// </summary>
+        private readonly Func<string, Task<string>> getLatestCursor;
+
+        /// <summary>
+        /// Initializes a new instance of the <see cref="FolderTreeWalker"/> class.
+        /// </summary>
+        /// <param name="files">The file routes of the client to list with.</param>
+        /// <param name="maxConcurrency">The maximum number of folders listed at a time.</param>
+        public FolderTreeWalker(FilesUserRoutes files, int maxConcurrency = 8)
+            : this(
+                path => files.ListFolderAsync(new ListFolderArg(path)),
+                cursor => files.ListFolderContinueAsync(new ListFolderContinueArg(cursor)),
+                async path => (await files.ListFolderGetLatestCursorAsync(
+                    new ListFolderArg(path, recursive: true)).ConfigureAwait(false)).Cursor,
+                maxConcurrency)
+        {
+            if (files == null)
+            {
+                throw new ArgumentNullException("files");
+            }
+        }
+
+        /// <summary>
+        /// Initializes a new instance of the <see cref="FolderTreeWalker"/> class.
+        /// </summary>
+        /// <param name="listFolder">Lists a folder, given its path.</param>
+        /// <param name="listFolderContinue">Continues a listing, given its cursor.</param>
+        /// <param name="getLatestCursor">Gets the cursor of a recursive listing, given its path.</param>
+        /// <param name="maxConcurrency">The maximum number of folders listed at a time.</param>
+        internal FolderTreeWalker(
+            Func<string, Task<ListFolderResult>> listFolder,
+            Func<string, Task<ListFolderResult>> listFolderContinue,
+            Func<string, Task<string>> getLatestCursor,
+            int maxConcurrency)
+        {
+            if (maxConcurrency <= 0)
+            {
+                throw new ArgumentOutOfRangeException("maxConcurrency");
+            }
+
+            this.listFolder = listFolder;
+            this.listFolderContinue = listFolderContinue;
+            this.getLatestCursor = getLatestCursor;
+            this.MaxConcurrency = maxConcurrency;
+        }
+
+        /// <summary>
+        /// Gets the maximum number of folders listed at a time.
+        /// </summary>
+        public int MaxConcurrency { get; private set; }
+
+        /// <summary>
+        /// Lists a folder and everything below it.
+        /// </summary>
+        /// <param name="path">The path of the folder, the empty string for the root.</param>
+        /// <param name="onEntries">Called with the entries of each page as it is listed.
+        /// It is called by several workers at once, and the workers wait for the
+        /// returned task before they list more.</param>
+        /// <param name="progress">Reports the progress each time a folder has been
+        /// listed, or <c>null</c>.</param>
+        /// <param name="cancellationToken">Cancels the walk.</param>
+        /// <returns>The task that represents the asynchronous walk. The TResult
+        /// parameter contains a cursor for the changes made since the walk started,
+        /// for <c>files/list_folder/continue</c>.</returns>
+        public async Task<string> WalkAsync(
+            string path,
+            Func<IList<Metadata>, Task> onEntries,
+            IProgress<FolderWalkProgress> progress = null,
+            CancellationToken cancellationToken = default(CancellationToken))
+        {
+            if (path == null)
+            {
+                throw new ArgumentNullException("path");
+            }
+
+            if (onEntries == null)
+            {
+                throw new ArgumentNullException("onEntries");
+            }
+
+            var cursor = await this.getLatestCursor(path).ConfigureAwait(false);
+
+            var walk = new Walk(this, path, onEntries, progress, cancellationToken);
+            var workers = new List<Task>(this.MaxConcurrency);
+            for (var i = 0; i < this.MaxConcurrency; i++)
+            {
+                workers.Add(walk.RunWorkerAsync(i));
+            }
+
+#if PORTABLE40
+            await TaskEx.WhenAll(workers).ConfigureAwait(false);
+#else
+            await Task.WhenAll(workers).ConfigureAwait(false);
+#endif
+
+            return cursor;
+        }
+
+        /// <summary>
+        /// The state of one walk.
+        /// </summary>
+        private sealed class Walk
+        {
+            /// <summary>
+            /// The walker.
+            /// </summary>
+            private readonly FolderTreeWalker walker;
+
+            /// <summary>
+            /// The path of the folder being walked.
+            /// </summary>
+            private readonly string root;
+
+            /// <summary>
+            /// Called with the entries of each page.
+            /// </summary>
+            private readonly Func<IList<Metadata>, Task> onEntries;
+
+            /// <summary>
+            /// Reports the progress, may be <c>null</c>.
+            /// </summary>
+            private readonly IProgress<FolderWalkProgress> progress;
+
+            /// <summary>
+            /// Cancels the walk.
+            /// </summary>
+            private readonly CancellationToken cancellationToken;
+
+            /// <summary>
+            /// The folders found by each worker and not yet listed. Also used as the lock.
+            /// </summary>
+            private readonly LinkedList<Folder>[] queues;
+
+            /// <summary>
+            /// The workers waiting for folders to list.
+            /// </summary>
+            private readonly Queue<TaskCompletionSource<bool>> idle = new Queue<TaskCompletionSource<bool>>();
+
+            /// <summary>
+            /// The progress of each subtree, keyed by path.
+            /// </summary>
+            private readonly Dictionary<string, SubtreeProgress> subtrees =
+                new Dictionary<string, SubtreeProgress>(StringComparer.Ordinal);
+
+            /// <summary>
+            /// The number of folders being listed.
+            /// </summary>
+            private int active;
+
+            /// <summary>
+            /// The number of folders found and not yet listed.
+            /// </summary>
+            private int pending;
+
+            /// <summary>
+            /// The number of folders listed.
+            /// </summary>
+            private int listed;
+
+            /// <summary>
+            /// The number of entries listed.
+            /// </summary>
+            private long entries;
+
+            /// <summary>
+            /// Whether the walk has ended, because it completed or failed.
+            /// </summary>
+            private bool ended;
+
+            /// <summary>
+            /// Initializes a new instance of the <see cref="Walk"/> class.
+            /// </summary>
+            /// <param name="walker">The walker.</param>
+            /// <param name="root">The path of the folder being walked.</param>
+            /// <param name="onEntries">Called with the entries of each page.</param>
+            /// <param name="progress">Reports the progress, may be <c>null</c>.</param>
+            /// <param name="cancellationToken">Cancels the walk.</param>
+            public Walk(
+                FolderTreeWalker walker,
+                string root,
+                Func<IList<Metadata>, Task> onEntries,
+                IProgress<FolderWalkProgress> progress,
+                CancellationToken cancellationToken)
+            {
+                this.walker = walker;
+                this.root = root;
+                this.onEntries = onEntries;
+                this.progress = progress;
+                this.cancellationToken = cancellationToken;
+
+                this.queues = new LinkedList<Folder>[walker.MaxConcurrency];
+                for (var i = 0; i < this.queues.Length; i++)
+                {
+                    this.queues[i] = new LinkedList<Folder>();
+                }
+
+                this.queues[0].AddLast(new Folder { Path = root, Subtree = root });
+                this.subtrees.Add(root, new SubtreeProgress { Pending = 1 });
+                this.pending = 1;
+            }
+
+            /// <summary>
+            /// Lists folders until the walk has ended.
+            /// </summary>
+            /// <param name="worker">The index of the worker.</param>
+            /// <returns>The task that represents the asynchronous work.</returns>
+            public async Task RunWorkerAsync(int worker)
+            {
+                while (true)
+                {
+                    Folder folder;
+                    TaskCompletionSource<bool> wait = null;
+
+                    lock (this.queues)
+                    {
+                        if (this.ended)
+                        {
+                            return;
+                        }
+
+                        folder = this.Take(worker);
+                        if (folder != null)
+                        {
+                            this.active++;
+                        }
+                        else if (this.active == 0)
+                        {
+                            this.End();
+                            return;
+                        }
+                        else
+                        {
+                            wait = new TaskCompletionSource<bool>();
+                            this.idle.Enqueue(wait);
+                        }
+                    }
+
+                    if (wait != null)
+                    {
+                        await wait.Task.ConfigureAwait(false);
+                        continue;
+                    }
+
+                    try
+                    {
+                        await this.ListAsync(worker, folder).ConfigureAwait(false);
+                    }
+                    catch
+                    {
+                        lock (this.queues)
+                        {
+                            this.End();
+                        }
+
+                        throw;
+                    }
+
+                    lock (this.queues)
+                    {
+                        this.active--;
+                        if (this.active == 0 && this.pending == 0)
+                        {
+                            this.End();
+                        }
+                    }
+                }
+            }
+
+            /// <summary>
+            /// Lists one folder, queueing its subfolders.
+            /// </summary>
+            /// <param name="worker">The index of the worker.</param>
+            /// <param name="folder">The folder.</param>
+            /// <returns>The task that represents the asynchronous listing.</returns>
+            private async Task ListAsync(int worker, Folder folder)
+            {
+                long count = 0;
+                var result = await this.walker.listFolder(folder.Path).ConfigureAwait(false);
+                while (true)
+                {
+                    this.cancellationToken.ThrowIfCancellationRequested();
+
+                    foreach (var entry in result.Entries)
+                    {
+                        if (entry.IsFolder)
+                        {
+                            var subtree = folder.Path == this.root ? entry.PathLower : folder.Subtree;
+                            this.Add(worker, new Folder
+                            {
+                                Path = entry.PathLower ?? entry.AsFolder.Id,
+                                Subtree = subtree ?? folder.Subtree
+                            });
+                        }
+                    }
+
+                    count += result.Entries.Count;
+                    await this.onEntries(result.Entries).ConfigureAwait(false);
+
+                    if (!result.HasMore)
+                    {
+                        break;
+                    }
+
+                    result = await this.walker.listFolderContinue(result.Cursor).ConfigureAwait(false);
+                }
+
+                this.Report(folder, count);
+            }
+
+            /// <summary>
+            /// Queues a folder found by a worker and wakes a waiting worker.
+            /// </summary>
+            /// <param name="worker">The index of the worker.</param>
+            /// <param name="folder">The folder.</param>
+            private void Add(int worker, Folder folder)
+            {
+                TaskCompletionSource<bool> wake = null;
+
+                lock (this.queues)
+                {
+                    this.queues[worker].AddLast(folder);
+                    this.pending++;
+
+                    SubtreeProgress subtree;
+                    if (!this.subtrees.TryGetValue(folder.Subtree, out subtree))
+                    {
+                        subtree = new SubtreeProgress();
+                        this.subtrees.Add(folder.Subtree, subtree);
+                    }
+
+                    subtree.Pending++;
+
+                    if (this.idle.Count > 0)
+                    {
+                        wake = this.idle.Dequeue();
+                    }
+                }
+
+                if (wake != null)
+                {
+                    wake.TrySetResult(true);
+                }
+            }
+
+            /// <summary>
+            /// Records that a folder has been listed and reports the progress.
+            /// </summary>
+            /// <param name="folder">The folder.</param>
+            /// <param name="count">The number of entries in the folder.</param>
+            private void Report(Folder folder, long count)
+            {
+                FolderWalkProgress report;
+
+                lock (this.queues)
+                {
+                    var subtree = this.subtrees[folder.Subtree];
+                    subtree.Pending--;
+                    subtree.Entries += count;
+                    this.listed++;
+                    this.entries += count;
+
+                    report = new FolderWalkProgress
+                    {
+                        Path = folder.Path,
+                        Subtree = folder.Subtree,
+                        SubtreeEntries = subtree.Entries,
+                        SubtreeFoldersPending = subtree.Pending,
+                        TotalEntries = this.entries,
+                        FoldersListed = this.listed,
+                        FoldersPending = this.pending + this.active - 1
+                    };
+                }
+
+                if (this.progress != null)
+                {
+                    this.progress.Report(report);
+                }
+            }
+
+            /// <summary>
+            /// Takes the next folder for a worker, its own newest or else the oldest of
+            /// another worker. The caller must hold the lock.
+            /// </summary>
+            /// <param name="worker">The index of the worker.</param>
+            /// <returns>The folder, or <c>null</c> if there are none.</returns>
+            private Folder Take(int worker)
+            {
+                var own = this.queues[worker];
+                if (own.Count > 0)
+                {
+                    var folder = own.Last.Value;
+                    own.RemoveLast();
+                    this.pending--;
+                    return folder;
+                }
+
+                for (var i = 1; i < this.queues.Length; i++)
+                {
+                    var other = this.queues[(worker + i) % this.queues.Length];
+                    if (other.Count > 0)
+                    {
+                        var folder = other.First.Value;
+                        other.RemoveFirst();
+                        this.pending--;
+                        return folder;
+                    }
+                }
+
+                return null;
+            }
+
+            /// <summary>
+            /// Ends the walk and wakes all waiting workers. The caller must hold the lock.
+            /// </summary>
+            private void End()
+            {
+                this.ended = true;
+                while (this.idle.Count > 0)
+                {
+                    this.idle.Dequeue().TrySetResult(true);
+                }
+            }
+        }
+
+        /// <summary>
+        /// A folder to list.
+        /// </summary>
+        private sealed class Folder
+        {
+            /// <summary>
+            /// Gets or sets the path of the folder.
+            /// </summary>
+            public string Path { get; set; }
+
+            /// <summary>
+            /// Gets or sets the path of the subtree the folder is in.
+            /// </summary>
+            public string Subtree { get; set; }
+        }
+
+        /// <summary>
+        /// The progress of a subtree.
+        /// </summary>
+        private sealed class SubtreeProgress
+        {
+            /// <summary>
+            /// Gets or sets the number of folders of the subtree not yet listed.
+            /// </summary>
+            public int Pending { get; set; }
+
+            /// <summary>
+            /// Gets or sets the number of entries listed in the subtree.
+            /// </summary>
+            public long Entries { get; set; }
+        }
+    }
+}
@@ -0,0 +1,56 @@
+//-----------------------------------------------------------------------------
+// <copyright file="FolderWalkProgress.cs" company="Dropbox Inc">
+//  Copyright (c) Dropbox Inc. All rights reserved.
+// </copyright>
+//-----------------------------------------------------------------------------
+
+namespace Dropbox.Api
+{
+    /// <summary>
+    /// The progress of a <see cref="FolderTreeWalker"/>, reported each time a
+    /// folder has been listed.
+    /// </summary>
+    /// <remarks>
+    /// A subtree is one of the folders directly in the folder being walked, with
+    /// everything below it. Entries directly in the walked folder count towards
+    /// the subtree of the walked folder itself.
+    /// </remarks>
+    public sealed class FolderWalkProgress
+    {
+        /// <summary>
+        /// Gets the path of the folder that was listed.
+        /// </summary>
+        public string Path { get; internal set; }
+
+        /// <summary>
+        /// Gets the path of the subtree the folder is in.
+        /// </summary>
+        public string Subtree { get; internal set; }
+
+        /// <summary>
+        /// Gets the number of entries listed in the subtree so far.
+        /// </summary>
+        public long SubtreeEntries { get; internal set; }
+
+        /// <summary>
+        /// Gets the number of folders of the subtree that are still to be listed,
+        /// zero once the subtree has been walked.
+        /// </summary>
+        public int SubtreeFoldersPending { get; internal set; }
+
+        /// <summary>
+        /// Gets the number of entries listed so far.
+        /// </summary>
+        public long TotalEntries { get; internal set; }
+
+        /// <summary>
+        /// Gets the number of folders listed so far.
+        /// </summary>
+        public int FoldersListed { get; internal set; }
+
+        /// <summary>
+        /// Gets the number of folders still to be listed.
+        /// </summary>
+        public int FoldersPending { get; internal set; }
+    }
+}
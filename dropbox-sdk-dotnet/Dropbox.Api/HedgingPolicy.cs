@@ -0,0 +1,232 @@
+//-----------------------------------------------------------------------------
+// <copyright file="HedgingPolicy.cs" company="Dropbox Inc">
+//  Copyright (c) Dropbox Inc. All rights reserved.
+// </copyright>
+//-----------------------------------------------------------------------------
+
+namespace Dropbox.Api
+{
+    using System;
+    using System.Collections.Generic;
+
+    /// <summary>
+    /// Controls when a second, hedged, request is sent for a slow call to an
+    /// idempotent route, such as <c>files/get_metadata</c>.
+    /// </summary>
+    /// <remarks>
+    /// <para>Set an instance on <see cref="DropboxClientConfig.HedgingPolicy"/>.
+    /// The latency of each idempotent route is recorded in a histogram. Once a
+    /// route has <see cref="MinSamples"/> samples, a call that has had no response
+    /// after the <see cref="Percentile"/> latency of its route gets a duplicate
+    /// request. The first successful response is used and the other request is
+    /// cancelled.</para>
+    /// <para>At most <see cref="MaxHedgeRatio"/> of all requests are hedged, so a
+    /// slow server does not see its load doubled.</para>
+    /// </remarks>
+    public sealed class HedgingPolicy
+    {
+        /// <summary>
+        /// The latency histograms, keyed by route. Also used as the lock.
+        /// </summary>
+        private readonly Dictionary<string, LatencyHistogram> histograms =
+            new Dictionary<string, LatencyHistogram>(StringComparer.Ordinal);
+
+        /// <summary>
+        /// The number of requests started.
+        /// </summary>
+        private long requests;
+
+        /// <summary>
+        /// The number of hedged requests started.
+        /// </summary>
+        private long hedges;
+
+        /// <summary>
+        /// Initializes a new instance of the <see cref="HedgingPolicy"/> class.
+        /// </summary>
+        /// <param name="percentile">The latency percentile, between 0 and 1, after
+        /// which a call is hedged.</param>
+        /// <param name="maxHedgeRatio">The maximum fraction of requests, between 0
+        /// and 1, that are hedged.</param>
+        /// <param name="minSamples">The number of samples a route needs before its
+        /// calls are hedged.</param>
+        public HedgingPolicy(double percentile = 0.95, double maxHedgeRatio = 0.05, int minSamples = 20)
+        {
+            if (percentile <= 0 || percentile >= 1)
+            {
+                throw new ArgumentOutOfRangeException("percentile");
+            }
+
+            if (maxHedgeRatio < 0 || maxHedgeRatio > 1)
+            {
+                throw new ArgumentOutOfRangeException("maxHedgeRatio");
+            }
+
+            if (minSamples <= 0)
+            {
+                throw new ArgumentOutOfRangeException("minSamples");
+            }
+
+            this.Percentile = percentile;
+            this.MaxHedgeRatio = maxHedgeRatio;
+            this.MinSamples = minSamples;
+        }
+
+        /// <summary>
+        /// Gets the latency percentile after which a call is hedged.
+        /// </summary>
+        public double Percentile { get; private set; }
+
+        /// <summary>
+        /// Gets the maximum fraction of requests that are hedged.
+        /// </summary>
+        public double MaxHedgeRatio { get; private set; }
+
+        /// <summary>
+        /// Gets the number of samples a route needs before its calls are hedged.
+        /// </summary>
+        public int MinSamples { get; private set; }
+
+        /// <summary>
+        /// Gets the number of hedged requests sent.
+        /// </summary>
+        public long HedgedRequests
+        {
+            get
+            {
+                lock (this.histograms)
+                {
+                    return this.hedges;
+                }
+            }
+        }
+
+        /// <summary>
+        /// Gets the current hedge delay of a route.
+        /// </summary>
+        /// <param name="route">The route path, for example <c>/files/get_metadata</c>.</param>
+        /// <returns>The delay, or <c>null</c> if the route does not have enough samples.</returns>
+        public TimeSpan? GetHedgeDelay(string route)
+        {
+            lock (this.histograms)
+            {
+                LatencyHistogram histogram;
+                if (!this.histograms.TryGetValue(route, out histogram) || histogram.Count < this.MinSamples)
+                {
+                    return null;
+                }
+
+                return histogram.GetPercentile(this.Percentile);
+            }
+        }
+
+        /// <summary>
+        /// Records that a call was started and gets its hedge delay.
+        /// </summary>
+        /// <param name="route">The route path.</param>
+        /// <returns>The delay, or <c>null</c> if the call is not hedged.</returns>
+        internal TimeSpan? StartRequest(string route)
+        {
+            lock (this.histograms)
+            {
+                this.requests++;
+            }
+
+            return this.GetHedgeDelay(route);
+        }
+
+        /// <summary>
+        /// Takes a hedge from the budget.
+        /// </summary>
+        /// <returns><c>true</c> if a hedged request may be sent.</returns>
+        internal bool TryStartHedge()
+        {
+            lock (this.histograms)
+            {
+                if (this.hedges + 1 > this.MaxHedgeRatio * this.requests)
+                {
+                    return false;
+                }
+
+                this.hedges++;
+                return true;
+            }
+        }
+
+        /// <summary>
+        /// Records the latency of a request that completed.
+        /// </summary>
+        /// <param name="route">The route path.</param>
+        /// <param name="latency">The latency.</param>
+        internal void Record(string route, TimeSpan latency)
+        {
+            lock (this.histograms)
+            {
+                LatencyHistogram histogram;
+                if (!this.histograms.TryGetValue(route, out histogram))
+                {
+                    histogram = new LatencyHistogram();
+                    this.histograms.Add(route, histogram);
+                }
+
+                histogram.Add(latency);
+            }
+        }
+
+        /// <summary>
+        /// A histogram of latencies with buckets that grow by a quarter, from one
+        /// millisecond to about twenty minutes.
+        /// </summary>
+        private class LatencyHistogram
+        {
+            /// <summary>
+            /// The factor between the bounds of neighbouring buckets.
+            /// </summary>
+            private const double Growth = 1.25;
+
+            /// <summary>
+            /// The sample counts per bucket.
+            /// </summary>
+            private readonly long[] buckets = new long[64];
+
+            /// <summary>
+            /// Gets the number of samples.
+            /// </summary>
+            public long Count { get; private set; }
+
+            /// <summary>
+            /// Adds a sample.
+            /// </summary>
+            /// <param name="latency">The latency.</param>
+            public void Add(TimeSpan latency)
+            {
+                var milliseconds = Math.Max(1, latency.TotalMilliseconds);
+                var index = (int)Math.Min(this.buckets.Length - 1, Math.Log(milliseconds, Growth));
+                this.buckets[index]++;
+                this.Count++;
+            }
+
+            /// <summary>
+            /// Gets the upper bound of the bucket that holds the given percentile.
+            /// </summary>
+            /// <param name="percentile">The percentile, between 0 and 1.</param>
+            /// <returns>The latency.</returns>
+            public TimeSpan GetPercentile(double percentile)
+            {
+                var rank = (long)Math.Ceiling(percentile * this.Count);
+                long seen = 0;
+                var index = 0;
+                for (; index < this.buckets.Length - 1; index++)
+                {
+                    seen += this.buckets[index];
+                    if (seen >= rank)
+                    {
+                        break;
+                    }
+                }
+
+                return TimeSpan.FromMilliseconds(Math.Pow(Growth, index + 1));
+            }
+        }
+    }
+}
@@ -0,0 +1,63 @@
+//-----------------------------------------------------------------------------
+// <copyright file="HostSettings.cs" company="Dropbox Inc">
+//  Copyright (c) Dropbox Inc. All rights reserved.
+// </copyright>
+//-----------------------------------------------------------------------------
+
+namespace Dropbox.Api
+{
+    using System;
+
+    /// <summary>
+    /// The connection settings for one of the hosts of the Dropbox API.
+    /// </summary>
+    /// <remarks>
+    /// <para>The settings are used by <see cref="HttpClientPool"/> when it creates the
+    /// client of a host, changes made after the first request to the host are
+    /// ignored.</para>
+    /// <para>The connection limit, idle timeout and connection lifetime are applied
+    /// through the service point of the host, and are ignored in the portable
+    /// builds of the SDK.</para>
+    /// </remarks>
+    public sealed class HostSettings
+    {
+        /// <summary>
+        /// Gets or sets the maximum number of connections to the host, or zero for
+        /// the runtime default.
+        /// </summary>
+        public int MaxConnections { get; set; }
+
+        /// <summary>
+        /// Gets or sets how long an idle connection is kept open, or <c>null</c> for
+        /// the runtime default.
+        /// </summary>
+        public TimeSpan? IdleTimeout { get; set; }
+
+        /// <summary>
+        /// Gets or sets how long a connection is used before it is closed, so that
+        /// changes to the DNS records of the host are picked up. <c>null</c> keeps
+        /// connections open for as long as they are used.
+        /// </summary>
+        public TimeSpan? ConnectionLifetime { get; set; }
+
+        /// <summary>
+        /// Gets or sets the request timeout, or <c>null</c> for the
+        /// <see cref="System.Net.Http.HttpClient"/> default.
+        /// </summary>
+        public TimeSpan? Timeout { get; set; }
+
+        /// <summary>
+        /// Gets or sets the HTTP version requested, for example 2.0 to multiplex
+        /// requests over one connection where the runtime supports it. <c>null</c>
+        /// uses the runtime default.
+        /// </summary>
+        public Version HttpVersion { get; set; }
+
+        /// <summary>
+        /// Gets or sets a value indicating whether gzip or deflate compressed
+        /// responses are asked for and decompressed as they are read, where the
+        /// platform supports it.
+        /// </summary>
+        public bool AcceptCompressedResponses { get; set; }
+    }
+}
@@ -0,0 +1,169 @@
+//-----------------------------------------------------------------------------
+// <copyright file="HttpClientPool.cs" company="Dropbox Inc">
+//  Copyright (c) Dropbox Inc. All rights reserved.
+// </copyright>
+//-----------------------------------------------------------------------------
+
+namespace Dropbox.Api
+{
+    using System;
+    using System.Collections.Generic;
+    using System.Net;
+    using System.Net.Http;
+
+    /// <summary>
+    /// The HTTP clients used to reach the hosts of the Dropbox API, one per host,
+    /// each with its own connection settings.
+    /// </summary>
+    /// <remarks>
+    /// <para>Set an instance on <see cref="DropboxClientConfig.HttpClientPool"/>. One
+    /// pool can be shared by any number of clients, including the clients created by
+    /// <see cref="DropboxTeamClient.AsMember"/>, so they all share the connections
+    /// to each host. The pool is not disposed by the clients that use it.</para>
+    /// <para><see cref="DropboxClientConfig.HttpClient"/> and
+    /// <see cref="DropboxClientConfig.LongPollHttpClient"/> take precedence over
+    /// the pool when they are set.</para>
+    /// </remarks>
+    public sealed class HttpClientPool : IDisposable
+    {
+        /// <summary>
+        /// The clients, keyed by host name. Also used as the lock.
+        /// </summary>
+        private readonly Dictionary<string, HttpClient> clients =
+            new Dictionary<string, HttpClient>(StringComparer.OrdinalIgnoreCase);
+
+        /// <summary>
+        /// Initializes a new instance of the <see cref="HttpClientPool"/> class.
+        /// </summary>
+        public HttpClientPool()
+        {
+            this.Api = new HostSettings { AcceptCompressedResponses = true };
+            this.Content = new HostSettings();
+            this.Notify = new HostSettings { Timeout = TimeSpan.FromSeconds(480) };
+        }
+
+        /// <summary>
+        /// Gets the settings for the host of RPC routes. Compressed responses are
+        /// accepted by default.
+        /// </summary>
+        public HostSettings Api { get; private set; }
+
+        /// <summary>
+        /// Gets the settings for the host of upload and download routes.
+        /// </summary>
+        public HostSettings Content { get; private set; }
+
+        /// <summary>
+        /// Gets the settings for the host of long poll routes. The timeout defaults
+        /// to eight minutes, longer than the longest long poll.
+        /// </summary>
+        public HostSettings Notify { get; private set; }
+
+        /// <summary>
+        /// Disposes the clients of the pool.
+        /// </summary>
+        public void Dispose()
+        {
+            lock (this.clients)
+            {
+                foreach (var client in this.clients.Values)
+                {
+                    client.Dispose();
+                }
+
+                this.clients.Clear();
+            }
+        }
+
+        /// <summary>
+        /// Gets the settings for a host type.
+        /// </summary>
+        /// <param name="host">The host type.</param>
+        /// <returns>The settings.</returns>
+        internal HostSettings GetSettings(string host)
+        {
+            switch (host)
+            {
+                case HostType.ApiContent:
+                    return this.Content;
+                case HostType.ApiNotify:
+                    return this.Notify;
+                default:
+                    return this.Api;
+            }
+        }
+
+        /// <summary>
+        /// Gets the client for a host, creating it on first use.
+        /// </summary>
+        /// <param name="host">The host type.</param>
+        /// <param name="hostname">The host name the host type maps to.</param>
+        /// <returns>The client.</returns>
+        internal HttpClient GetClient(string host, string hostname)
+        {
+            lock (this.clients)
+            {
+                HttpClient client;
+                if (!this.clients.TryGetValue(hostname, out client))
+                {
+                    client = CreateClient(this.GetSettings(host), hostname);
+                    this.clients.Add(hostname, client);
+                }
+
+                return client;
+            }
+        }
+
+        /// <summary>
+        /// Creates a message handler.
+        /// </summary>
+        /// <param name="decompress">If the handler should ask for compressed responses
+        /// and decompress them as they are read, where the platform supports it.</param>
+        /// <returns>The handler.</returns>
+        internal static HttpClientHandler CreateHandler(bool decompress)
+        {
+            var handler = new HttpClientHandler();
+            if (decompress && handler.SupportsAutomaticDecompression)
+            {
+                handler.AutomaticDecompression = DecompressionMethods.GZip | DecompressionMethods.Deflate;
+            }
+
+            return handler;
+        }
+
+        /// <summary>
+        /// Creates the client for a host.
+        /// </summary>
+        /// <param name="settings">The settings of the host.</param>
+        /// <param name="hostname">The host name.</param>
+        /// <returns>The client.</returns>
+        private static HttpClient CreateClient(HostSettings settings, string hostname)
+        {
+#if !PORTABLE && !PORTABLE40
+            var servicePoint = ServicePointManager.FindServicePoint(new Uri("https://" + hostname));
+            if (settings.MaxConnections > 0)
+            {
+                servicePoint.ConnectionLimit = settings.MaxConnections;
+            }
+
+            if (settings.IdleTimeout != null)
+            {
+                servicePoint.MaxIdleTime = (int)settings.IdleTimeout.Value.TotalMilliseconds;
+            }
+
+            if (settings.ConnectionLifetime != null)
+            {
+                servicePoint.ConnectionLeaseTimeout = (int)settings.ConnectionLifetime.Value.TotalMilliseconds;
+            }
+#endif
+
+            var client = new HttpClient(CreateHandler(settings.AcceptCompressedResponses));
+            if (settings.Timeout != null)
+            {
+                client.Timeout = settings.Timeout.Value;
+            }
+
+            return client;
+        }
+    }
+}
@@ -0,0 +1,299 @@
+//-----------------------------------------------------------------------------
+// <copyright file="ListFolderIndex.cs" company="Dropbox Inc">
+//  Copyright (c) Dropbox Inc. All rights reserved.
+// </copyright>
+//-----------------------------------------------------------------------------
+
+namespace Dropbox.Api
+{
+    using System;
+    using System.Collections.Generic;
+    using System.IO;
+    using System.Linq;
+
+    using Dropbox.Api.Files;
+    using Dropbox.Api.Stone;
+
+    /// <summary>
+    /// A local copy of the metadata of a folder, kept up to date from the pages of
+    /// <c>files/list_folder</c> and <c>files/list_folder/continue</c>.
+    /// </summary>
+    /// <remarks>
+    /// <para>Entries are keyed by their <see cref="Metadata.PathLower"/>, entries
+    /// without one are ignored. Pages are applied as the API documents: a deleted
+    /// entry removes the entry and, for a folder, everything below it, and a file
+    /// that replaces a folder removes the folder's contents as well.</para>
+    /// <para>The index, including the cursor of the last page applied, can be saved
+    /// with <see cref="Save"/> and restored with <see cref="Load"/>, so a client that
+    /// restarts continues from the cursor instead of listing the folder again. When
+    /// the server resets the cursor, call <see cref="Clear"/> and list again.</para>
+    /// <para>All members are safe to call from several threads.</para>
+    /// </remarks>
+    public sealed class ListFolderIndex
+    {
+        /// <summary>
+        /// The entries, keyed by lower case path. Also used as the lock.
+        /// </summary>
+        private readonly Dictionary<string, Metadata> entries =
+            new Dictionary<string, Metadata>(StringComparer.Ordinal);
+
+        /// <summary>
+        /// The lower case paths of the entries in each folder, keyed by the lower
+        /// case path of the folder, the empty string for the root.
+        /// </summary>
+        private readonly Dictionary<string, HashSet<string>> children =
+            new Dictionary<string, HashSet<string>>(StringComparer.Ordinal);
+
+        /// <summary>
+        /// The cursor of the last page applied.
+        /// </summary>
+        private string cursor;
+
+        /// <summary>
+        /// Gets the cursor of the last page applied, or <c>null</c> if none has been.
+        /// </summary>
+        public string Cursor
+        {
+            get
+            {
+                lock (this.entries)
+                {
+                    return this.cursor;
+                }
+            }
+        }
+
+        /// <summary>
+        /// Gets the number of entries.
+        /// </summary>
+        public int Count
+        {
+            get
+            {
+                lock (this.entries)
+                {
+                    return this.entries.Count;
+                }
+            }
+        }
+
+        /// <summary>
+        /// Restores an index saved with <see cref="Save"/>.
+        /// </summary>
+        /// <param name="reader">The reader of the saved index.</param>
+        /// <returns>The index.</returns>
+        public static ListFolderIndex Load(TextReader reader)
+        {
+            if (reader == null)
+            {
+                throw new ArgumentNullException("reader");
+            }
+
+            var snapshot = JsonReader.Read(reader, ListFolderResult.Decoder);
+            var index = new ListFolderIndex();
+            index.Apply(snapshot);
+            index.cursor = snapshot.Cursor.Length > 0 ? snapshot.Cursor : null;
+            return index;
+        }
+
+        /// <summary>
+        /// Saves the entries and the cursor.
+        /// </summary>
+        /// <param name="writer">The writer to save to, which is flushed but not closed.</param>
+        public void Save(TextWriter writer)
+        {
+            if (writer == null)
+            {
+                throw new ArgumentNullException("writer");
+            }
+
+            ListFolderResult snapshot;
+            lock (this.entries)
+            {
+                snapshot = new ListFolderResult(this.entries.Values.ToList(), this.cursor ?? string.Empty, false);
+            }
+
+            JsonWriter.Write(snapshot, ListFolderResult.Encoder, writer);
+        }
+
+        /// <summary>
+        /// Applies a page of <c>files/list_folder</c> or <c>files/list_folder/continue</c>
+        /// and keeps its cursor.
+        /// </summary>
+        /// <param name="page">The page.</param>
+        public void Apply(ListFolderResult page)
+        {
+            if (page == null)
+            {
+                throw new ArgumentNullException("page");
+            }
+
+            lock (this.entries)
+            {
+                foreach (var entry in page.Entries)
+                {
+                    var path = entry.PathLower;
+                    if (path == null)
+                    {
+                        continue;
+                    }
+
+                    if (entry.IsDeleted)
+                    {
+                        this.Remove(path);
+                        continue;
+                    }
+
+                    Metadata current;
+                    if (this.entries.TryGetValue(path, out current))
+                    {
+                        if (current.IsFolder && !entry.IsFolder)
+                        {
+                            this.Remove(path);
+                        }
+                        else
+                        {
+                            this.entries[path] = entry;
+                            continue;
+                        }
+                    }
+
+                    this.entries.Add(path, entry);
+
+                    var parent = GetParent(path);
+                    HashSet<string> siblings;
+                    if (!this.children.TryGetValue(parent, out siblings))
+                    {
+                        siblings = new HashSet<string>(StringComparer.Ordinal);
+                        this.children.Add(parent, siblings);
+                    }
+
+                    siblings.Add(path);
+                }
+
+                this.cursor = page.Cursor;
+            }
+        }
+
+        /// <summary>
+        /// Removes all entries and the cursor, for example after the server reset
+        /// the cursor.
+        /// </summary>
+        public void Clear()
+        {
+            lock (this.entries)
+            {
+                this.entries.Clear();
+                this.children.Clear();
+                this.cursor = null;
+            }
+        }
+
+        /// <summary>
+        /// Gets the entry at a path.
+        /// </summary>
+        /// <param name="path">The path, in any case.</param>
+        /// <param name="entry">The entry, or <c>null</c> if there is none.</param>
+        /// <returns><c>true</c> if there is an entry at the path.</returns>
+        public bool TryGetEntry(string path, out Metadata entry)
+        {
+            if (path == null)
+            {
+                throw new ArgumentNullException("path");
+            }
+
+            lock (this.entries)
+            {
+                return this.entries.TryGetValue(path.ToLowerInvariant(), out entry);
+            }
+        }
+
+        /// <summary>
+        /// Gets the entries directly in a folder.
+        /// </summary>
+        /// <param name="path">The path of the folder in any case, the empty string
+        /// for the root.</param>
+        /// <returns>The entries, in no particular order.</returns>
+        public IList<Metadata> GetChildren(string path)
+        {
+            if (path == null)
+            {
+                throw new ArgumentNullException("path");
+            }
+
+            lock (this.entries)
+            {
+                HashSet<string> paths;
+                if (!this.children.TryGetValue(path.ToLowerInvariant(), out paths))
+                {
+                    return new List<Metadata>();
+                }
+
+                return paths.Select(p => this.entries[p]).ToList();
+            }
+        }
+
+        /// <summary>
+        /// Gets all entries.
+        /// </summary>
+        /// <returns>The entries, in no particular order.</returns>
+        public IList<Metadata> GetEntries()
+        {
+            lock (this.entries)
+            {
+                return this.entries.Values.ToList();
+            }
+        }
+
+        /// <summary>
+        /// Gets the lower case path of the folder that holds a path.
+        /// </summary>
+        /// <param name="path">The lower case path.</param>
+        /// <returns>The path of the folder, the empty string for the root.</returns>
+        private static string GetParent(string path)
+        {
+            var slash = path.LastIndexOf('/');
+            return slash > 0 ? path.Substring(0, slash) : string.Empty;
+        }
+
+        /// <summary>
+        /// Removes an entry and everything below it, the caller must hold the lock.
+        /// </summary>
+        /// <param name="path">The lower case path.</param>
+        private void Remove(string path)
+        {
+            if (this.entries.Remove(path))
+            {
+                HashSet<string> siblings;
+                var parent = GetParent(path);
+                if (this.children.TryGetValue(parent, out siblings))
+                {
+                    siblings.Remove(path);
+                    if (siblings.Count == 0)
+                    {
+                        this.children.Remove(parent);
+                    }
+                }
+            }
+
+            var pending = new Stack<string>();
+            pending.Push(path);
+            while (pending.Count > 0)
+            {
+                HashSet<string> paths;
+                var folder = pending.Pop();
+                if (!this.children.TryGetValue(folder, out paths))
+                {
+                    continue;
+                }
+
+                this.children.Remove(folder);
+                foreach (var child in paths)
+                {
+                    this.entries.Remove(child);
+                    pending.Push(child);
+                }
+            }
+        }
+    }
+}
@@ -0,0 +1,588 @@
+//-----------------------------------------------------------------------------
+// <copyright file="LongpollWatcher.cs" company="Dropbox Inc">
+//  Copyright (c) Dropbox Inc. All rights reserved.
+// </copyright>
+//-----------------------------------------------------------------------------
+
+namespace Dropbox.Api
+{
+    using System;
+    using System.Collections.Generic;
+    using System.Net.Http;
+    using System.Threading;
+    using System.Threading.Tasks;
+
+    using Dropbox.Api.Files;
+    using Dropbox.Api.Files.Routes;
+
+    /// <summary>
+    /// Watches many <c>files/list_folder</c> cursors for changes with a bounded
+    /// number of <c>files/list_folder/longpoll</c> requests in flight.
+    /// </summary>
+    /// <remarks>
+    /// <para>Each watched cursor is added under a key of the caller's choice, for
+    /// example a team member id. The long poll route needs no authentication, so
+    /// one watcher created from any client can watch the cursors of all members
+    /// of a team over the connections of that one client.</para>
+    /// <para>At most <see cref="MaxConnections"/> cursors are polled at a time,
+    /// the others wait their turn. A poll that times out without changes is sent
+    /// again, after the <c>backoff</c> the server asked for if any. When a cursor
+    /// has changes, its key is returned by <see cref="WaitForChangeAsync"/> and the
+    /// cursor is no longer polled; call <c>files/list_folder/continue</c> and pass
+    /// the new cursor to <see cref="Watch"/> to watch it again.</para>
+    /// <para>Polls that fail with a transient error, such as a network error or a
+    /// server error, are retried after a delay. Any other error stops the watch of
+    /// the cursor and faults the next <see cref="WaitForChangeAsync"/> with a
+    /// <see cref="LongpollWatchException"/> carrying its key.</para>
+    /// </remarks>
+    public sealed class LongpollWatcher : IDisposable
+    {
+        /// <summary>
+        /// How long to wait before polling a cursor again after a failed poll.
+        /// </summary>
+        private static readonly TimeSpan RetryDelay = TimeSpan.FromSeconds(5);
+
+        /// <summary>
+        /// Sends a long poll, given the cursor and the timeout in seconds.
+        /// </summary>
+        private readonly Func<string, ulong, Task<ListFolderLongpollResult>> longpoll;
+
+        /// <summary>
+        /// The watched cursors, keyed by the caller's key. Also used as the lock.
+        /// </summary>
+        private readonly Dictionary<string, WatchedCursor> watches =
+            new Dictionary<string, WatchedCursor>(StringComparer.Ordinal);
+
+        /// <summary>
+        /// The cursors waiting to be polled, in order.
+        /// </summary>
+        private readonly Queue<WatchedCursor> ready = new Queue<WatchedCursor>();
+
+        /// <summary>
+        /// The keys of the changed cursors that have not been returned yet.
+        /// </summary>
+        private readonly Queue<string> changes = new Queue<string>();
+
+        /// <summary>
+        /// The errors of the cursors no longer watched that have not been returned yet.
+        /// </summary>
+        private readonly Queue<LongpollWatchException> failures = new Queue<LongpollWatchException>();
+
+        /// <summary>
+        /// The callers waiting for a change, in order.
+        /// </summary>
+        private readonly LinkedList<TaskCompletionSource<string>> receivers = new LinkedList<TaskCompletionSource<string>>();
+
+        /// <summary>
+        /// The number of polls in flight.
+        /// </summary>
+        private int inFlight;
+
+        /// <summary>
+        /// Whether the watcher has been disposed.
+        /// </summary>
+        private bool disposed;
+
+        /// <summary>
+        /// Initializes a new instance of the <see cref="LongpollWatcher"/> class.
+        /// </summary>
+        /// <param name="files">The file routes of the client to poll with.</param>
+        /// <param name="maxConnections">The maximum number of polls in flight.</param>
+        /// <param name="timeoutSeconds">The timeout of each poll, between 30 and 480
+        /// seconds. Shorter polls let waiting cursors have their turn sooner.</param>
+        public LongpollWatcher(FilesUserRoutes files, int maxConnections = 16, int timeoutSeconds = 30)
+            : this(
+                (cursor, timeout) => files.ListFolderLongpollAsync(new ListFolderLongpollArg(cursor, timeout)),
+                maxConnections,
+                timeoutSeconds)
+        {
+            if (files == null)
+            {
+                throw new ArgumentNullException("files");
+            }
+        }
+
+        /// <summary>
+        /// Initializes a new instance of the <see cref="LongpollWatcher"/> class.
+        /// </summary>
+        /// <param name="longpoll">Sends a long poll, given the cursor and the timeout in seconds.</param>
+        /// <param name="maxConnections">The maximum number of polls in flight.</param>
+        /// <param name="timeoutSeconds">The timeout of each poll in seconds.</param>
+        internal LongpollWatcher(
+            Func<string, ulong, Task<ListFolderLongpollResult>> longpoll,
+            int maxConnections,
+            int timeoutSeconds)
+        {
+            if (maxConnections <= 0)
+            {
+                throw new ArgumentOutOfRangeException("maxConnections");
+            }
+
+            if (timeoutSeconds < 30 || timeoutSeconds > 480)
+            {
+                throw new ArgumentOutOfRangeException("timeoutSeconds");
+            }
+
+            this.longpoll = longpoll;
+            this.MaxConnections = maxConnections;
+            this.TimeoutSeconds = timeoutSeconds;
+        }
+
+        /// <summary>
+        /// Gets the maximum number of polls in flight.
+        /// </summary>
+        public int MaxConnections { get; private set; }
+
+        /// <summary>
+        /// Gets the timeout of each poll in seconds.
+        /// </summary>
+        public int TimeoutSeconds { get; private set; }
+
+        /// <summary>
+        /// Gets the number of watched cursors.
+        /// </summary>
+        public int WatchCount
+        {
+            get
+            {
+                lock (this.watches)
+                {
+                    return this.watches.Count;
+                }
+            }
+        }
+
+        /// <summary>
+        /// Gets the number of polls in flight.
+        /// </summary>
+        public int InFlight
+        {
+            get
+            {
+                lock (this.watches)
+                {
+                    return this.inFlight;
+                }
+            }
+        }
+
+        /// <summary>
+        /// Watches a cursor, replacing the cursor watched under the same key.
+        /// </summary>
+        /// <param name="key">The caller's key for the cursor.</param>
+        /// <param name="cursor">The cursor of a <c>files/list_folder</c> listing.</param>
+        public void Watch(string key, string cursor)
+        {
+            if (key == null)
+            {
+                throw new ArgumentNullException("key");
+            }
+
+            if (cursor == null)
+            {
+                throw new ArgumentNullException("cursor");
+            }
+
+            lock (this.watches)
+            {
+                if (this.disposed)
+                {
+                    throw new ObjectDisposedException("LongpollWatcher");
+                }
+
+                WatchedCursor watch;
+                if (!this.watches.TryGetValue(key, out watch))
+                {
+                    watch = new WatchedCursor { Key = key };
+                    this.watches.Add(key, watch);
+                }
+
+                watch.Cursor = cursor;
+                watch.Version++;
+                watch.Changed = false;
+                this.Enqueue(watch);
+            }
+
+            this.Pump();
+        }
+
+        /// <summary>
+        /// Stops watching a cursor. A poll in flight for it is left to finish and
+        /// its result ignored.
+        /// </summary>
+        /// <param name="key">The caller's key for the cursor.</param>
+        /// <returns><c>true</c> if the cursor was watched.</returns>
+        public bool Unwatch(string key)
+        {
+            if (key == null)
+            {
+                throw new ArgumentNullException("key");
+            }
+
+            lock (this.watches)
+            {
+                return this.watches.Remove(key);
+            }
+        }
+
+        /// <summary>
+        /// Waits for a watched cursor to have changes.
+        /// </summary>
+        /// <param name="cancellationToken">Cancels the wait.</param>
+        /// <returns>The task that represents the asynchronous wait. The TResult
+        /// parameter contains the key of the changed cursor.</returns>
+        /// <exception cref="LongpollWatchException">A cursor is no longer watched
+        /// because its poll failed with an error that is not transient.</exception>
+        public Task<string> WaitForChangeAsync(CancellationToken cancellationToken = default(CancellationToken))
+        {
+            var receiver = new TaskCompletionSource<string>();
+
+            lock (this.watches)
+            {
+                if (this.disposed)
+                {
+                    throw new ObjectDisposedException("LongpollWatcher");
+                }
+
+                if (this.failures.Count > 0)
+                {
+                    receiver.SetException(this.failures.Dequeue());
+                    return receiver.Task;
+                }
+
+                if (this.changes.Count > 0)
+                {
+                    receiver.SetResult(this.changes.Dequeue());
+                    return receiver.Task;
+                }
+
+                this.receivers.AddLast(receiver);
+            }
+
+            if (cancellationToken.CanBeCanceled)
+            {
+                var registration = cancellationToken.Register(() => this.Cancel(receiver));
+                receiver.Task.ContinueWith(
+                    task => registration.Dispose(),
+                    CancellationToken.None,
+                    TaskContinuationOptions.ExecuteSynchronously,
+                    TaskScheduler.Default);
+            }
+
+            return receiver.Task;
+        }
+
+        /// <summary>
+        /// Stops watching all cursors and cancels the callers waiting for changes.
+        /// </summary>
+        public void Dispose()
+        {
+            var waiting = new List<TaskCompletionSource<string>>();
+
+            lock (this.watches)
+            {
+                this.disposed = true;
+                this.watches.Clear();
+                this.ready.Clear();
+                this.failures.Clear();
+                waiting.AddRange(this.receivers);
+                this.receivers.Clear();
+            }
+
+            foreach (var receiver in waiting)
+            {
+                receiver.TrySetCanceled();
+            }
+        }
+
+        /// <summary>
+        /// Gets whether a poll error is transient, so the poll is retried.
+        /// </summary>
+        /// <param name="e">The error.</param>
+        /// <returns><c>true</c> if the error is transient.</returns>
+        private static bool IsTransient(Exception e)
+        {
+            var httpException = e as HttpException;
+            return e is RetryException
+                || e is HttpRequestException
+                || (httpException != null && httpException.StatusCode >= 500);
+        }
+
+        /// <summary>
+        /// Queues a cursor to be polled unless it is queued or polled already. The
+        /// caller must hold the lock.
+        /// </summary>
+        /// <param name="watch">The cursor.</param>
+        private void Enqueue(WatchedCursor watch)
+        {
+            if (!watch.Queued && !watch.Polling)
+            {
+                watch.Queued = true;
+                this.ready.Enqueue(watch);
+            }
+        }
+
+        /// <summary>
+        /// Starts polls for the queued cursors while there are connections to spare.
+        /// </summary>
+        private void Pump()
+        {
+            var polls = new List<KeyValuePair<WatchedCursor, int>>();
+            var delayed = new List<KeyValuePair<WatchedCursor, TimeSpan>>();
+
+            lock (this.watches)
+            {
+                var now = DateTime.UtcNow;
+                while (!this.disposed && this.inFlight < this.MaxConnections && this.ready.Count > 0)
+                {
+                    var watch = this.ready.Dequeue();
+                    if (!this.IsWatched(watch))
+                    {
+                        watch.Queued = false;
+                        continue;
+                    }
+
+                    if (watch.NotBefore > now)
+                    {
+                        delayed.Add(new KeyValuePair<WatchedCursor, TimeSpan>(watch, watch.NotBefore - now));
+                        continue;
+                    }
+
+                    watch.Queued = false;
+                    watch.Polling = true;
+                    this.inFlight++;
+                    polls.Add(new KeyValuePair<WatchedCursor, int>(watch, watch.Version));
+                }
+            }
+
+            // Not awaited on purpose: the waits and polls run in the background,
+            // and poll failures are caught and either retried after a delay or
+            // handed to the next caller waiting for a change.
+            foreach (var pair in delayed)
+            {
+                var ignored = this.RequeueAfterAsync(pair.Key, pair.Value);
+            }
+
+            foreach (var pair in polls)
+            {
+                var ignored = this.PollAsync(pair.Key, pair.Key.Cursor, pair.Value);
+            }
+        }
+
+        /// <summary>
+        /// Polls a cursor once and acts on the result.
+        /// </summary>
+        /// <param name="watch">The cursor.</param>
+        /// <param name="cursor">The cursor value polled.</param>
+        /// <param name="version">The version of the cursor polled.</param>
+        /// <returns>The task that represents the asynchronous poll.</returns>
+        private async Task PollAsync(WatchedCursor watch, string cursor, int version)
+        {
+            ListFolderLongpollResult result = null;
+            Exception failure = null;
+            var retryDelay = RetryDelay;
+            try
+            {
+#if PORTABLE40
+                await TaskEx.Yield();
+#else
+                await Task.Yield();
+#endif
+                result = await this.longpoll(cursor, (ulong)this.TimeoutSeconds).ConfigureAwait(false);
+            }
+            catch (ApiException<ListFolderLongpollError>)
+            {
+                // the cursor was reset, which the caller finds out from list_folder/continue
+                result = new ListFolderLongpollResult(true);
+            }
+            catch (RateLimitException e)
+            {
+                if (e.ErrorResponse != null)
+                {
+                    retryDelay = TimeSpan.FromSeconds(e.RetryAfter);
+                }
+            }
+            catch (Exception e)
+            {
+                if (!IsTransient(e))
+                {
+                    failure = e;
+                }
+            }
+
+            var changed = false;
+            LongpollWatchException error = null;
+            lock (this.watches)
+            {
+                this.inFlight--;
+                watch.Polling = false;
+
+                if (failure != null && watch.Version == version && this.IsWatched(watch))
+                {
+                    this.watches.Remove(watch.Key);
+                    error = new LongpollWatchException(watch.Key, failure);
+                }
+                else if (this.IsWatched(watch))
+                {
+                    if (result != null && result.Backoff != null)
+                    {
+                        watch.NotBefore = DateTime.UtcNow + TimeSpan.FromSeconds(result.Backoff.Value);
+                    }
+                    else if (result == null)
+                    {
+                        watch.NotBefore = DateTime.UtcNow + retryDelay;
+                    }
+
+                    if (watch.Version == version && result != null && result.Changes)
+                    {
+                        watch.Changed = true;
+                        changed = true;
+                    }
+                    else
+                    {
+                        this.Enqueue(watch);
+                    }
+                }
+            }
+
+            if (changed || error != null)
+            {
+                this.Publish(watch.Key, error);
+            }
+
+            this.Pump();
+        }
+
+        /// <summary>
+        /// Queues a cursor again once its backoff has passed.
+        /// </summary>
+        /// <param name="watch">The cursor, which stays marked as queued meanwhile.</param>
+        /// <param name="delay">The time left of the backoff.</param>
+        /// <returns>The task that represents the asynchronous wait.</returns>
+        private async Task RequeueAfterAsync(WatchedCursor watch, TimeSpan delay)
+        {
+#if PORTABLE40
+            await TaskEx.Delay(delay).ConfigureAwait(false);
+#else
+            await Task.Delay(delay).ConfigureAwait(false);
+#endif
+
+            lock (this.watches)
+            {
+                watch.Queued = false;
+                if (this.IsWatched(watch) && !watch.Changed)
+                {
+                    this.Enqueue(watch);
+                }
+            }
+
+            this.Pump();
+        }
+
+        /// <summary>
+        /// Hands the key of a changed cursor, or the error of a cursor no longer
+        /// watched, to a waiting caller, or keeps it for the next one.
+        /// </summary>
+        /// <param name="key">The key.</param>
+        /// <param name="error">The error, or <c>null</c> if the cursor has changes.</param>
+        private void Publish(string key, LongpollWatchException error)
+        {
+            while (true)
+            {
+                TaskCompletionSource<string> receiver;
+                lock (this.watches)
+                {
+                    if (this.receivers.Count == 0)
+                    {
+                        if (error != null)
+                        {
+                            this.failures.Enqueue(error);
+                        }
+                        else
+                        {
+                            this.changes.Enqueue(key);
+                        }
+
+                        return;
+                    }
+
+                    receiver = this.receivers.First.Value;
+                    this.receivers.RemoveFirst();
+                }
+
+                if (error != null ? receiver.TrySetException(error) : receiver.TrySetResult(key))
+                {
+                    return;
+                }
+            }
+        }
+
+        /// <summary>
+        /// Cancels a waiting caller and stops waiting for a change for it.
+        /// </summary>
+        /// <param name="receiver">The waiting caller.</param>
+        private void Cancel(TaskCompletionSource<string> receiver)
+        {
+            lock (this.watches)
+            {
+                this.receivers.Remove(receiver);
+            }
+
+            receiver.TrySetCanceled();
+        }
+
+        /// <summary>
+        /// Gets whether a cursor is still watched under its key. The caller must
+        /// hold the lock.
+        /// </summary>
+        /// <param name="watch">The cursor.</param>
+        /// <returns><c>true</c> if the cursor is watched.</returns>
+        private bool IsWatched(WatchedCursor watch)
+        {
+            WatchedCursor current;
+            return !this.disposed && this.watches.TryGetValue(watch.Key, out current) && current == watch;
+        }
+
+        /// <summary>
+        /// A watched cursor and its polling state.
+        /// </summary>
+        private sealed class WatchedCursor
+        {
+            /// <summary>
+            /// Gets or sets the caller's key.
+            /// </summary>
+            public string Key { get; set; }
+
+            /// <summary>
+            /// Gets or sets the cursor.
+            /// </summary>
+            public string Cursor { get; set; }
+
+            /// <summary>
+            /// Gets or sets the version of the cursor, incremented when it is replaced.
+            /// </summary>
+            public int Version { get; set; }
+
+            /// <summary>
+            /// Gets or sets a value indicating whether the cursor is waiting to be polled.
+            /// </summary>
+            public bool Queued { get; set; }
+
+            /// <summary>
+            /// Gets or sets a value indicating whether a poll is in flight.
+            /// </summary>
+            public bool Polling { get; set; }
+
+            /// <summary>
+            /// Gets or sets a value indicating whether the cursor has changes the
+            /// caller has not yet replaced it for.
+            /// </summary>
+            public bool Changed { get; set; }
+
+            /// <summary>
+            /// Gets or sets the time before which the cursor must not be polled.
+            /// </summary>
+            public DateTime NotBefore { get; set; }
+        }
+    }
+}
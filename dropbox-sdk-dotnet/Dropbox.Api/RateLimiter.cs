@@ -0,0 +1,337 @@
+//-----------------------------------------------------------------------------
+// <copyright file="RateLimiter.cs" company="Dropbox Inc">
+//  Copyright (c) Dropbox Inc. All rights reserved.
+// </copyright>
+//-----------------------------------------------------------------------------
+
+namespace Dropbox.Api
+{
+    using System;
+    using System.Collections.Generic;
+    using System.Threading.Tasks;
+
+    /// <summary>
+    /// Limits the requests sent by the clients that share it, adapting to the
+    /// rate limit errors returned by the server.
+    /// </summary>
+    /// <remarks>
+    /// <para>Set an instance on <see cref="DropboxClientConfig.RateLimiter"/>.
+    /// Clients that use the same access token should share one instance, since
+    /// the server applies its limits per user or app.</para>
+    /// <para>At most <see cref="ConcurrencyLimit"/> requests are in flight at a
+    /// time. The limit starts at the maximum given to the constructor, is halved
+    /// whenever the server returns a rate limit error and grows back slowly as
+    /// requests succeed. A rate limit error also holds back all requests until
+    /// the <c>retry_after</c> time given by the server has passed, after which
+    /// the rate limited request is sent again automatically. When a request rate
+    /// is given, requests to each host are paced with a token bucket.
+    /// Long poll requests are not limited.</para>
+    /// </remarks>
+    public sealed class RateLimiter
+    {
+        /// <summary>
+        /// The lock that guards the state.
+        /// </summary>
+        private readonly object sync = new object();
+
+        /// <summary>
+        /// The requests waiting for a slot, in arrival order.
+        /// </summary>
+        private readonly Queue<TaskCompletionSource<bool>> waiters = new Queue<TaskCompletionSource<bool>>();
+
+        /// <summary>
+        /// The token buckets, keyed by route class.
+        /// </summary>
+        private readonly Dictionary<string, Bucket> buckets = new Dictionary<string, Bucket>(StringComparer.Ordinal);
+
+        /// <summary>
+        /// The current concurrency limit, kept fractional so it can grow slowly.
+        /// </summary>
+        private double limit;
+
+        /// <summary>
+        /// The number of requests in flight.
+        /// </summary>
+        private int inFlight;
+
+        /// <summary>
+        /// The number of requests waiting to be sent.
+        /// </summary>
+        private int queueDepth;
+
+        /// <summary>
+        /// The number of rate limit errors seen.
+        /// </summary>
+        private long rateLimitedCount;
+
+        /// <summary>
+        /// The time before which no requests are sent.
+        /// </summary>
+        private DateTime resumeTime = DateTime.MinValue;
+
+        /// <summary>
+        /// Initializes a new instance of the <see cref="RateLimiter"/> class.
+        /// </summary>
+        /// <param name="maxConcurrency">The maximum number of requests in flight.</param>
+        /// <param name="requestsPerSecond">The maximum rate of requests to each host,
+        /// or zero to not pace requests.</param>
+        public RateLimiter(int maxConcurrency, double requestsPerSecond = 0)
+        {
+            if (maxConcurrency <= 0)
+            {
+                throw new ArgumentOutOfRangeException("maxConcurrency");
+            }
+
+            if (requestsPerSecond < 0)
+            {
+                throw new ArgumentOutOfRangeException("requestsPerSecond");
+            }
+
+            this.MaxConcurrency = maxConcurrency;
+            this.RequestsPerSecond = requestsPerSecond;
+            this.limit = maxConcurrency;
+        }
+
+        /// <summary>
+        /// Gets the maximum number of requests in flight.
+        /// </summary>
+        public int MaxConcurrency { get; private set; }
+
+        /// <summary>
+        /// Gets the maximum rate of requests to each host, zero if requests are
+        /// not paced.
+        /// </summary>
+        public double RequestsPerSecond { get; private set; }
+
+        /// <summary>
+        /// Gets the current number of requests allowed in flight.
+        /// </summary>
+        public int ConcurrencyLimit
+        {
+            get
+            {
+                lock (this.sync)
+                {
+                    return (int)this.limit;
+                }
+            }
+        }
+
+        /// <summary>
+        /// Gets the number of requests in flight.
+        /// </summary>
+        public int InFlight
+        {
+            get
+            {
+                lock (this.sync)
+                {
+                    return this.inFlight;
+                }
+            }
+        }
+
+        /// <summary>
+        /// Gets the number of requests waiting to be sent.
+        /// </summary>
+        public int QueueDepth
+        {
+            get
+            {
+                lock (this.sync)
+                {
+                    return this.queueDepth;
+                }
+            }
+        }
+
+        /// <summary>
+        /// Gets the number of rate limit errors returned by the server.
+        /// </summary>
+        public long RateLimitedCount
+        {
+            get
+            {
+                lock (this.sync)
+                {
+                    return this.rateLimitedCount;
+                }
+            }
+        }
+
+        /// <summary>
+        /// Gets the UTC time until which requests are held back because of a rate
+        /// limit error, in the past if requests are not held back.
+        /// </summary>
+        public DateTime ResumeTime
+        {
+            get
+            {
+                lock (this.sync)
+                {
+                    return this.resumeTime;
+                }
+            }
+        }
+
+        /// <summary>
+        /// Waits until a request of the given class may be sent. Each call must be
+        /// followed by a call to <see cref="Exit"/>.
+        /// </summary>
+        /// <param name="routeClass">The class of the route, the host it is sent to.</param>
+        /// <returns>A task that completes when the request may be sent.</returns>
+        internal async Task EnterAsync(string routeClass)
+        {
+            lock (this.sync)
+            {
+                this.queueDepth++;
+            }
+
+            while (true)
+            {
+                TaskCompletionSource<bool> waiter = null;
+                TimeSpan delay;
+
+                lock (this.sync)
+                {
+                    var now = DateTime.UtcNow;
+                    if (now < this.resumeTime)
+                    {
+                        delay = this.resumeTime - now;
+                    }
+                    else if (this.inFlight >= (int)this.limit)
+                    {
+                        waiter = new TaskCompletionSource<bool>();
+                        this.waiters.Enqueue(waiter);
+                        delay = TimeSpan.Zero;
+                    }
+                    else
+                    {
+                        delay = this.TakeToken(routeClass, now);
+                        if (delay == TimeSpan.Zero)
+                        {
+                            this.inFlight++;
+                            this.queueDepth--;
+                            return;
+                        }
+                    }
+                }
+
+                if (waiter != null)
+                {
+                    await waiter.Task.ConfigureAwait(false);
+                }
+                else
+                {
+#if PORTABLE40
+                    await TaskEx.Delay(delay).ConfigureAwait(false);
+#else
+                    await Task.Delay(delay).ConfigureAwait(false);
+#endif
+                }
+            }
+        }
+
+        /// <summary>
+        /// Records that a request has completed.
+        /// </summary>
+        /// <param name="succeeded">If the request succeeded, which lets the
+        /// concurrency limit grow.</param>
+        internal void Exit(bool succeeded)
+        {
+            TaskCompletionSource<bool> next = null;
+
+            lock (this.sync)
+            {
+                this.inFlight--;
+                if (succeeded)
+                {
+                    this.limit = Math.Min(this.MaxConcurrency, this.limit + (1 / this.limit));
+                }
+
+                if (this.waiters.Count > 0)
+                {
+                    next = this.waiters.Dequeue();
+                }
+            }
+
+            if (next != null)
+            {
+                next.TrySetResult(true);
+            }
+        }
+
+        /// <summary>
+        /// Records a rate limit error, which halves the concurrency limit and holds
+        /// back all requests for the given time.
+        /// </summary>
+        /// <param name="retryAfter">The time to wait given by the server.</param>
+        internal void OnRateLimited(TimeSpan retryAfter)
+        {
+            lock (this.sync)
+            {
+                var resume = DateTime.UtcNow + retryAfter;
+                if (resume > this.resumeTime)
+                {
+                    this.resumeTime = resume;
+                }
+
+                this.limit = Math.Max(1, this.limit / 2);
+                this.rateLimitedCount++;
+            }
+        }
+
+        /// <summary>
+        /// Takes a token from the bucket of a route class, the caller must hold the lock.
+        /// </summary>
+        /// <param name="routeClass">The route class.</param>
+        /// <param name="now">The current time.</param>
+        /// <returns><see cref="TimeSpan.Zero"/> if a token was taken, otherwise how long
+        /// until one is available.</returns>
+        private TimeSpan TakeToken(string routeClass, DateTime now)
+        {
+            if (this.RequestsPerSecond == 0)
+            {
+                return TimeSpan.Zero;
+            }
+
+            var burst = Math.Max(1, this.RequestsPerSecond);
+
+            Bucket bucket;
+            if (!this.buckets.TryGetValue(routeClass, out bucket))
+            {
+                bucket = new Bucket { Tokens = burst, Updated = now };
+                this.buckets.Add(routeClass, bucket);
+            }
+
+            var elapsed = (now - bucket.Updated).TotalSeconds;
+            bucket.Tokens = Math.Min(burst, bucket.Tokens + (elapsed * this.RequestsPerSecond));
+            bucket.Updated = now;
+
+            if (bucket.Tokens >= 1)
+            {
+                bucket.Tokens--;
+                return TimeSpan.Zero;
+            }
+
+            var wait = TimeSpan.FromSeconds((1 - bucket.Tokens) / this.RequestsPerSecond);
+            return wait < TimeSpan.FromMilliseconds(1) ? TimeSpan.FromMilliseconds(1) : wait;
+        }
+
+        /// <summary>
+        /// The token bucket of a route class.
+        /// </summary>
+        private class Bucket
+        {
+            /// <summary>
+            /// Gets or sets the number of tokens available.
+            /// </summary>
+            public double Tokens { get; set; }
+
+            /// <summary>
+            /// Gets or sets when the tokens were last refilled.
+            /// </summary>
+            public DateTime Updated { get; set; }
+        }
+    }
+}
@@ -0,0 +1,108 @@
+//-----------------------------------------------------------------------------
+// <copyright file="RequestCoalescer.cs" company="Dropbox Inc">
+//  Copyright (c) Dropbox Inc. All rights reserved.
+// </copyright>
+//-----------------------------------------------------------------------------
+
+namespace Dropbox.Api
+{
+    using System;
+    using System.Collections.Generic;
+    using System.Threading.Tasks;
+
+    /// <summary>
+    /// Lets identical concurrent requests share one call.
+    /// </summary>
+    /// <remarks>
+    /// The first caller for a key makes the call, callers with the same key
+    /// that arrive while it is in flight wait for it and get the same result
+    /// or exception. Once the call completes the next caller makes a new one.
+    /// </remarks>
+    internal sealed class RequestCoalescer
+    {
+        /// <summary>
+        /// The completion sources of the calls in flight, keyed by request key.
+        /// Also used as the lock.
+        /// </summary>
+        private readonly Dictionary<string, object> inFlight =
+            new Dictionary<string, object>(StringComparer.Ordinal);
+
+        /// <summary>
+        /// Gets the number of calls in flight.
+        /// </summary>
+        public int Count
+        {
+            get
+            {
+                lock (this.inFlight)
+                {
+                    return this.inFlight.Count;
+                }
+            }
+        }
+
+        /// <summary>
+        /// Makes a call, or joins the call in flight with the same key.
+        /// </summary>
+        /// <typeparam name="T">The type of the result, which must be the same
+        /// for all calls with the same key.</typeparam>
+        /// <param name="key">The request key.</param>
+        /// <param name="call">Makes the call.</param>
+        /// <returns>An asynchronous task for the result.</returns>
+        public async Task<T> RunAsync<T>(string key, Func<Task<T>> call)
+        {
+            TaskCompletionSource<T> completion;
+            var owner = false;
+            lock (this.inFlight)
+            {
+                object existing;
+                if (this.inFlight.TryGetValue(key, out existing))
+                {
+                    completion = (TaskCompletionSource<T>)existing;
+                }
+                else
+                {
+                    completion = new TaskCompletionSource<T>();
+                    this.inFlight.Add(key, completion);
+                    owner = true;
+                }
+            }
+
+            if (!owner)
+            {
+                return await completion.Task.ConfigureAwait(false);
+            }
+
+            T result;
+            try
+            {
+                result = await call().ConfigureAwait(false);
+            }
+            catch (Exception e)
+            {
+                this.Remove(key);
+                completion.SetException(e);
+
+                // Observe the exception, as there may be no caller waiting for it.
+                var ignored = completion.Task.Exception;
+                throw;
+            }
+
+            this.Remove(key);
+            completion.SetResult(result);
+            return result;
+        }
+
+        /// <summary>
+        /// Removes a completed call.
+        /// </summary>
+        /// <param name="key">The request key.</param>
+        private void Remove(string key)
+        {
+            lock (this.inFlight)
+            {
+                this.inFlight.Remove(key);
+            }
+        }
+    }
+}
@@ -0,0 +1,344 @@
+//-----------------------------------------------------------------------------
+// <copyright file="ResponseCache.cs" company="Dropbox Inc">
+//  Copyright (c) Dropbox Inc. All rights reserved.
+// </copyright>
+//-----------------------------------------------------------------------------
+
+namespace Dropbox.Api
+{
+    using System;
+    using System.Collections.Generic;
+
+    /// <summary>
+    /// A client side cache for the responses of read only routes.
+    /// </summary>
+    /// <remarks>
+    /// <para>Set an instance on <see cref="DropboxClientConfig.ResponseCache"/> to
+    /// enable caching, the same instance can be shared by several clients. Only
+    /// routes that the API marks as cacheable, such as
+    /// <c>users/get_current_account</c>, are cached.</para>
+    /// <para>Entries are keyed by the route, the request argument and the
+    /// credentials and user selection of the client, so clients acting for
+    /// different users never share entries. Entries expire after
+    /// <see cref="TimeToLive"/>, and when there are more than
+    /// <see cref="MaxEntries"/> the least recently used ones are evicted. A
+    /// successful call to a route of a namespace that may change data, that is
+    /// one neither cacheable nor idempotent, invalidates the cached responses of
+    /// that namespace.</para>
+    /// </remarks>
+    public sealed class ResponseCache
+    {
+        /// <summary>
+        /// The entries, most recently used first.
+        /// </summary>
+        private readonly LinkedList<Entry> entries = new LinkedList<Entry>();
+
+        /// <summary>
+        /// The entry nodes, keyed by cache key. Also used as the lock.
+        /// </summary>
+        private readonly Dictionary<string, LinkedListNode<Entry>> index =
+            new Dictionary<string, LinkedListNode<Entry>>(StringComparer.Ordinal);
+
+        /// <summary>
+        /// The number of times each namespace has been invalidated.
+        /// </summary>
+        private readonly Dictionary<string, long> generations =
+            new Dictionary<string, long>(StringComparer.Ordinal);
+
+        /// <summary>
+        /// The number of times the cache has been cleared.
+        /// </summary>
+        private long clears;
+
+        /// <summary>
+        /// The number of lookups that found an entry.
+        /// </summary>
+        private long hits;
+
+        /// <summary>
+        /// The number of lookups that did not find an entry.
+        /// </summary>
+        private long misses;
+
+        /// <summary>
+        /// Initializes a new instance of the <see cref="ResponseCache"/> class.
+        /// </summary>
+        /// <param name="maxEntries">The maximum number of responses to keep.</param>
+        /// <param name="timeToLive">How long a response is kept.</param>
+        public ResponseCache(int maxEntries, TimeSpan timeToLive)
+        {
+            if (maxEntries <= 0)
+            {
+                throw new ArgumentOutOfRangeException("maxEntries");
+            }
+
+            if (timeToLive <= TimeSpan.Zero)
+            {
+                throw new ArgumentOutOfRangeException("timeToLive");
+            }
+
+            this.MaxEntries = maxEntries;
+            this.TimeToLive = timeToLive;
+        }
+
+        /// <summary>
+        /// Gets the maximum number of responses kept.
+        /// </summary>
+        public int MaxEntries { get; private set; }
+
+        /// <summary>
+        /// Gets how long a response is kept.
+        /// </summary>
+        public TimeSpan TimeToLive { get; private set; }
+
+        /// <summary>
+        /// Gets the number of lookups that found a response.
+        /// </summary>
+        public long Hits
+        {
+            get
+            {
+                lock (this.index)
+                {
+                    return this.hits;
+                }
+            }
+        }
+
+        /// <summary>
+        /// Gets the number of lookups that did not find a response.
+        /// </summary>
+        public long Misses
+        {
+            get
+            {
+                lock (this.index)
+                {
+                    return this.misses;
+                }
+            }
+        }
+
+        /// <summary>
+        /// Gets the number of responses currently cached, including expired
+        /// responses that have not been removed yet.
+        /// </summary>
+        public int Count
+        {
+            get
+            {
+                lock (this.index)
+                {
+                    return this.index.Count;
+                }
+            }
+        }
+
+        /// <summary>
+        /// Removes all cached responses.
+        /// </summary>
+        public void Clear()
+        {
+            lock (this.index)
+            {
+                this.index.Clear();
+                this.entries.Clear();
+                this.clears++;
+            }
+        }
+
+        /// <summary>
+        /// Removes the cached responses of the routes in a namespace.
+        /// </summary>
+        /// <param name="namespaceName">The namespace, for example <c>files</c>.</param>
+        public void Invalidate(string namespaceName)
+        {
+            if (namespaceName == null)
+            {
+                throw new ArgumentNullException("namespaceName");
+            }
+
+            lock (this.index)
+            {
+                long generation;
+                this.generations.TryGetValue(namespaceName, out generation);
+                this.generations[namespaceName] = generation + 1;
+
+                var node = this.entries.First;
+                while (node != null)
+                {
+                    var next = node.Next;
+                    if (node.Value.Namespace == namespaceName)
+                    {
+                        this.Remove(node);
+                    }
+
+                    node = next;
+                }
+            }
+        }
+
+        /// <summary>
+        /// Creates the key of a request.
+        /// </summary>
+        /// <param name="route">The route path.</param>
+        /// <param name="context">Identifies the credentials and user selection of the client.</param>
+        /// <param name="requestArg">The serialized request argument.</param>
+        /// <returns>The key.</returns>
+        internal static string CreateKey(string route, string context, string requestArg)
+        {
+            return string.Join("\n", route, context, requestArg);
+        }
+
+        /// <summary>
+        /// Gets the namespace of a route path.
+        /// </summary>
+        /// <param name="route">The route path, for example <c>/files/get_metadata</c>.</param>
+        /// <returns>The namespace.</returns>
+        internal static string GetNamespace(string route)
+        {
+            var end = route.IndexOf('/', 1);
+            return end < 0 ? route.Substring(1) : route.Substring(1, end - 1);
+        }
+
+        /// <summary>
+        /// Looks up a cached response.
+        /// </summary>
+        /// <param name="key">The key.</param>
+        /// <param name="response">The cached response json.</param>
+        /// <returns><c>true</c> if a live response was found.</returns>
+        internal bool TryGet(string key, out string response)
+        {
+            lock (this.index)
+            {
+                LinkedListNode<Entry> node;
+                if (this.index.TryGetValue(key, out node))
+                {
+                    if (node.Value.Expires > DateTime.UtcNow)
+                    {
+                        this.entries.Remove(node);
+                        this.entries.AddFirst(node);
+                        this.hits++;
+                        response = node.Value.Response;
+                        return true;
+                    }
+
+                    this.Remove(node);
+                }
+
+                this.misses++;
+                response = null;
+                return false;
+            }
+        }
+
+        /// <summary>
+        /// Gets the generation of the namespace of a route, which changes when
+        /// its responses are invalidated or the cache is cleared.
+        /// </summary>
+        /// <param name="route">The route path.</param>
+        /// <returns>The generation.</returns>
+        internal long GetGeneration(string route)
+        {
+            lock (this.index)
+            {
+                return this.GetGenerationLocked(GetNamespace(route));
+            }
+        }
+
+        /// <summary>
+        /// Caches a response, evicting the least recently used responses if
+        /// the cache is full.
+        /// </summary>
+        /// <remarks>
+        /// The response is dropped if the namespace has been invalidated since
+        /// <paramref name="generation"/> was taken, as it may predate the change.
+        /// </remarks>
+        /// <param name="route">The route path.</param>
+        /// <param name="key">The key.</param>
+        /// <param name="response">The response json.</param>
+        /// <param name="generation">The generation of the namespace, from
+        /// <see cref="GetGeneration"/>, before the request was sent.</param>
+        internal void Add(string route, string key, string response, long generation)
+        {
+            var entry = new Entry
+            {
+                Key = key,
+                Namespace = GetNamespace(route),
+                Response = response,
+                Expires = DateTime.UtcNow + this.TimeToLive
+            };
+
+            lock (this.index)
+            {
+                if (this.GetGenerationLocked(entry.Namespace) != generation)
+                {
+                    return;
+                }
+
+                LinkedListNode<Entry> node;
+                if (this.index.TryGetValue(key, out node))
+                {
+                    this.Remove(node);
+                }
+
+                this.index[key] = this.entries.AddFirst(entry);
+
+                while (this.index.Count > this.MaxEntries)
+                {
+                    this.Remove(this.entries.Last);
+                }
+            }
+        }
+
+        /// <summary>
+        /// Gets the generation of a namespace, the caller must hold the lock.
+        /// </summary>
+        /// <param name="namespaceName">The namespace.</param>
+        /// <returns>The generation.</returns>
+        private long GetGenerationLocked(string namespaceName)
+        {
+            long generation;
+            this.generations.TryGetValue(namespaceName, out generation);
+
+            // Both counts only grow, so their sum changes whenever either does.
+            return generation + this.clears;
+        }
+
+        /// <summary>
+        /// Removes an entry, the caller must hold the lock.
+        /// </summary>
+        /// <param name="node">The node of the entry.</param>
+        private void Remove(LinkedListNode<Entry> node)
+        {
+            this.entries.Remove(node);
+            this.index.Remove(node.Value.Key);
+        }
+
+        /// <summary>
+        /// A cached response.
+        /// </summary>
+        private class Entry
+        {
+            /// <summary>
+            /// Gets or sets the key.
+            /// </summary>
+            public string Key { get; set; }
+
+            /// <summary>
+            /// Gets or sets the namespace of the route.
+            /// </summary>
+            public string Namespace { get; set; }
+
+            /// <summary>
+            /// Gets or sets the response json.
+            /// </summary>
+            public string Response { get; set; }
+
+            /// <summary>
+            /// Gets or sets when the entry expires.
+            /// </summary>
+            public DateTime Expires { get; set; }
+        }
+    }
+}
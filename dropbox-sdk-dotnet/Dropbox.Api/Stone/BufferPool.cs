@@ -0,0 +1,78 @@
+//-----------------------------------------------------------------------------
+// <copyright file="BufferPool.cs" company="Dropbox Inc">
+//  Copyright (c) Dropbox Inc. All rights reserved.
+// </copyright>
+//-----------------------------------------------------------------------------
+
+namespace Dropbox.Api.Stone
+{
+    using System.Collections.Generic;
+
+    /// <summary>
+    /// A process wide pool of byte buffers used for serialization.
+    /// </summary>
+    /// <remarks>
+    /// Only buffers of <see cref="BufferSize"/> bytes are pooled, larger
+    /// requests are allocated and left to the garbage collector.
+    /// </remarks>
+    internal static class BufferPool
+    {
+        /// <summary>
+        /// The size of the pooled buffers.
+        /// </summary>
+        public const int BufferSize = 16 * 1024;
+
+        /// <summary>
+        /// The maximum number of buffers kept in the pool.
+        /// </summary>
+        private const int MaxPooledBuffers = 32;
+
+        /// <summary>
+        /// The pooled buffers, also used as the lock.
+        /// </summary>
+        private static readonly Stack<byte[]> Buffers = new Stack<byte[]>();
+
+        /// <summary>
+        /// Gets a buffer of at least the given length.
+        /// </summary>
+        /// <param name="minimumLength">The minimum length.</param>
+        /// <returns>The buffer.</returns>
+        public static byte[] Rent(int minimumLength)
+        {
+            if (minimumLength > BufferSize)
+            {
+                return new byte[minimumLength];
+            }
+
+            lock (Buffers)
+            {
+                if (Buffers.Count > 0)
+                {
+                    return Buffers.Pop();
+                }
+            }
+
+            return new byte[BufferSize];
+        }
+
+        /// <summary>
+        /// Returns a buffer to the pool, the caller must not use it afterwards.
+        /// </summary>
+        /// <param name="buffer">The buffer.</param>
+        public static void Return(byte[] buffer)
+        {
+            if (buffer == null || buffer.Length != BufferSize)
+            {
+                return;
+            }
+
+            lock (Buffers)
+            {
+                if (Buffers.Count < MaxPooledBuffers)
+                {
+                    Buffers.Push(buffer);
+                }
+            }
+        }
+    }
+}
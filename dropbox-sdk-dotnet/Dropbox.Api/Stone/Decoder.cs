@@ -27,6 +27,14 @@ namespace Dropbox.Api.Stone
         }
     }
 
+    /// <summary>
+    /// Marker argument that selects the constructor used by generated decoders,
+    /// which assigns already decoded field values without validating them.
+    /// </summary>
+    internal struct Unvalidated
+    {
+    }
+
     /// <summary>
     /// Decoder for nullable struct.
     /// </summary>
@@ -272,6 +280,111 @@ namespace Dropbox.Api.Stone
         }
     }
 
+    /// <summary>
+    /// Decoder for DateTime in the fixed ISO 8601 format <c>yyyy-MM-ddTHH:mm:ssZ</c>.
+    /// </summary>
+    internal sealed class Iso8601DateTimeDecoder : IDecoder<DateTime>
+    {
+        /// <summary>
+        /// The instance.
+        /// </summary>
+        public static readonly IDecoder<DateTime> Instance = new Iso8601DateTimeDecoder();
+
+        /// <summary>
+        /// The instance for nullable.
+        /// </summary>
+        public static readonly IDecoder<DateTime?> NullableInstance = new NullableDecoder<DateTime>(Instance);
+
+        /// <summary>
+        /// The decode.
+        /// </summary>
+        /// <remarks>
+        /// Values that are not in the fixed format fall back to general date
+        /// parsing.
+        /// </remarks>
+        /// <param name="reader">The reader.</param>
+        /// <returns>The value.</returns>
+        public DateTime Decode(IJsonReader reader)
+        {
+            var value = reader.ReadString();
+
+            DateTime result;
+            if (TryParse(value, out result))
+            {
+                return result;
+            }
+
+            return DateTime.Parse(
+                value,
+                CultureInfo.InvariantCulture,
+                DateTimeStyles.AdjustToUniversal | DateTimeStyles.AssumeUniversal);
+        }
+
+        /// <summary>
+        /// Parses a value in the fixed format.
+        /// </summary>
+        /// <param name="value">The value.</param>
+        /// <param name="result">The parsed UTC time.</param>
+        /// <returns>If the value is in the fixed format.</returns>
+        internal static bool TryParse(string value, out DateTime result)
+        {
+            result = default(DateTime);
+
+            if (value == null || value.Length != 20 ||
+                value[4] != '-' || value[7] != '-' || value[10] != 'T' ||
+                value[13] != ':' || value[16] != ':' || value[19] != 'Z')
+            {
+                return false;
+            }
+
+            int year, month, day, hour, minute, second;
+            if (!TryParseDigits(value, 0, 4, out year) ||
+                !TryParseDigits(value, 5, 2, out month) ||
+                !TryParseDigits(value, 8, 2, out day) ||
+                !TryParseDigits(value, 11, 2, out hour) ||
+                !TryParseDigits(value, 14, 2, out minute) ||
+                !TryParseDigits(value, 17, 2, out second))
+            {
+                return false;
+            }
+
+            if (year < 1 || month < 1 || month > 12 || day < 1 || day > DateTime.DaysInMonth(year, month) ||
+                hour > 23 || minute > 59 || second > 59)
+            {
+                return false;
+            }
+
+            result = new DateTime(year, month, day, hour, minute, second, DateTimeKind.Utc);
+            return true;
+        }
+
+        /// <summary>
+        /// Parses a run of decimal digits.
+        /// </summary>
+        /// <param name="value">The string.</param>
+        /// <param name="offset">The offset of the first digit.</param>
+        /// <param name="count">The number of digits.</param>
+        /// <param name="result">The parsed number.</param>
+        /// <returns>If all the characters are digits.</returns>
+        private static bool TryParseDigits(string value, int offset, int count, out int result)
+        {
+            result = 0;
+
+            for (var i = offset; i < offset + count; i++)
+            {
+                var digit = value[i] - '0';
+                if (digit < 0 || digit > 9)
+                {
+                    return false;
+                }
+
+                result = (result * 10) + digit;
+            }
+
+            return true;
+        }
+    }
+
     /// <summary>
     /// Decoder for bytes.
     /// </summary>
@@ -391,6 +504,19 @@ namespace Dropbox.Api.Stone
             return ListDecoder<TItem>.Decode(reader, itemDecoder);
         }
 
+        /// <summary>
+        /// Read list of specific type, passing each item to a callback as it is
+        /// decoded instead of collecting them.
+        /// </summary>
+        /// <typeparam name="TItem">The item type.</typeparam>
+        /// <param name="reader">The json reader.</param>
+        /// <param name="itemDecoder">The item decoder.</param>
+        /// <param name="onItem">The callback that receives each item.</param>
+        protected static void ReadListItems<TItem>(IJsonReader reader, IDecoder<TItem> itemDecoder, Action<TItem> onItem)
+        {
+            ListDecoder<TItem>.DecodeItems(reader, itemDecoder, onItem);
+        }
+
         /// <summary>
         /// Create a struct instance.
         /// </summary>
@@ -544,6 +670,26 @@ namespace Dropbox.Api.Stone
             return list;
         }
 
+        /// <summary>
+        /// Decode list items one at a time, passing each to a callback.
+        /// </summary>
+        /// <param name="reader">The json reader.</param>
+        /// <param name="itemDecoder">The item decoder.</param>
+        /// <param name="onItem">The callback that receives each item.</param>
+        public static void DecodeItems(IJsonReader reader, IDecoder<T> itemDecoder, Action<T> onItem)
+        {
+            EnsureStartArray(reader);
+
+            T item;
+
+            while (TryReadArrayItem(reader, itemDecoder, out item))
+            {
+                onItem(item);
+            }
+
+            EnsureEndArray(reader);
+        }
+
         /// <summary>
         /// The decode.
         /// </summary>
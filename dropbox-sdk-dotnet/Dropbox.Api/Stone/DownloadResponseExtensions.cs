@@ -0,0 +1,51 @@
+//-----------------------------------------------------------------------------
+// <copyright file="DownloadResponseExtensions.cs" company="Dropbox Inc">
+//  Copyright (c) Dropbox Inc. All rights reserved.
+// </copyright>
+//-----------------------------------------------------------------------------
+
+#if !PORTABLE && !PORTABLE40
+namespace Dropbox.Api.Stone
+{
+    using System;
+    using System.IO;
+    using System.Threading;
+    using System.Threading.Tasks;
+
+    /// <summary>
+    /// Extension methods for <see cref="T:Dropbox.Api.Stone.IDownloadResponse`1"/> which are
+    /// only available on platforms with a file system.
+    /// </summary>
+    public static class DownloadResponseExtensions
+    {
+        /// <summary>
+        /// Asynchronously copies the content to a file, without holding more than
+        /// a small pooled buffer of it in memory.
+        /// </summary>
+        /// <typeparam name="TResponse">The type of the response.</typeparam>
+        /// <param name="response">The download response.</param>
+        /// <param name="path">The path of the file, which is created or overwritten.</param>
+        /// <param name="progress">Reports the number of bytes copied so far, or <c>null</c>.</param>
+        /// <param name="cancellationToken">Cancels the copy.</param>
+        /// <returns>The task that represents the asynchronous copy. The TResult
+        /// parameter contains the number of bytes copied.</returns>
+        public static async Task<long> CopyContentToFileAsync<TResponse>(
+            this IDownloadResponse<TResponse> response,
+            string path,
+            IProgress<long> progress = null,
+            CancellationToken cancellationToken = default(CancellationToken))
+        {
+            if (response == null)
+            {
+                throw new ArgumentNullException("response");
+            }
+
+            using (var file = new FileStream(
+                path, FileMode.Create, FileAccess.Write, FileShare.None, BufferPool.BufferSize, useAsync: true))
+            {
+                return await response.CopyContentToAsync(file, progress, cancellationToken).ConfigureAwait(false);
+            }
+        }
+    }
+}
+#endif
@@ -266,6 +266,74 @@ namespace Dropbox.Api.Stone
         }
     }
 
+    /// <summary>
+    /// Encoder for DateTime in the fixed ISO 8601 format <c>yyyy-MM-ddTHH:mm:ssZ</c>.
+    /// </summary>
+    internal sealed class Iso8601DateTimeEncoder : IEncoder<DateTime>
+    {
+        /// <summary>
+        /// The instance.
+        /// </summary>
+        public static readonly IEncoder<DateTime> Instance = new Iso8601DateTimeEncoder();
+
+        /// <summary>
+        /// The nullable instance.
+        /// </summary>
+        public static readonly IEncoder<DateTime?> NullableInstance = new NullableEncoder<DateTime>(Instance);
+
+        /// <summary>
+        /// The encode.
+        /// </summary>
+        /// <param name="value">The value.</param>
+        /// <param name="writer">The writer.</param>
+        public void Encode(DateTime value, IJsonWriter writer)
+        {
+            writer.WriteString(Format(value));
+        }
+
+        /// <summary>
+        /// Formats the value as UTC without going through culture aware formatting.
+        /// </summary>
+        /// <param name="value">The value.</param>
+        /// <returns>The formatted value.</returns>
+        internal static string Format(DateTime value)
+        {
+            value = value.ToUniversalTime();
+            var chars = new char[20];
+
+            WriteDigits(chars, 0, value.Year, 4);
+            chars[4] = '-';
+            WriteDigits(chars, 5, value.Month, 2);
+            chars[7] = '-';
+            WriteDigits(chars, 8, value.Day, 2);
+            chars[10] = 'T';
+            WriteDigits(chars, 11, value.Hour, 2);
+            chars[13] = ':';
+            WriteDigits(chars, 14, value.Minute, 2);
+            chars[16] = ':';
+            WriteDigits(chars, 17, value.Second, 2);
+            chars[19] = 'Z';
+
+            return new string(chars);
+        }
+
+        /// <summary>
+        /// Writes a zero padded number.
+        /// </summary>
+        /// <param name="chars">The destination.</param>
+        /// <param name="offset">The offset of the first digit.</param>
+        /// <param name="value">The number.</param>
+        /// <param name="count">The number of digits.</param>
+        private static void WriteDigits(char[] chars, int offset, int value, int count)
+        {
+            for (var i = offset + count - 1; i >= offset; i--)
+            {
+                chars[i] = (char)('0' + (value % 10));
+                value /= 10;
+            }
+        }
+    }
+
     /// <summary>
     /// Encoder for bytes.
     /// </summary>
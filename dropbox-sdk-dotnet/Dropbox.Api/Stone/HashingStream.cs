@@ -0,0 +1,222 @@
+//-----------------------------------------------------------------------------
+// <copyright file="HashingStream.cs" company="Dropbox Inc">
+//  Copyright (c) Dropbox Inc. All rights reserved.
+// </copyright>
+//-----------------------------------------------------------------------------
+
+#if !PORTABLE && !PORTABLE40
+namespace Dropbox.Api.Stone
+{
+    using System;
+    using System.IO;
+
+    /// <summary>
+    /// A read only stream that computes the content hash of another stream as it
+    /// is read, so that content being uploaded is hashed without reading it twice.
+    /// </summary>
+    /// <remarks>
+    /// Seeking back to the position the stream started at, as a retried upload
+    /// does, starts the hash over. Seeking anywhere else leaves no hash.
+    /// </remarks>
+    internal sealed class HashingStream : Stream
+    {
+        /// <summary>
+        /// The stream that is read.
+        /// </summary>
+        private readonly Stream inner;
+
+        /// <summary>
+        /// The position of the inner stream when reading started.
+        /// </summary>
+        private readonly long origin;
+
+        /// <summary>
+        /// The length of the inner stream, or -1 if it cannot seek.
+        /// </summary>
+        private readonly long length;
+
+        /// <summary>
+        /// The hasher.
+        /// </summary>
+        private readonly DropboxContentHasher hasher = new DropboxContentHasher();
+
+        /// <summary>
+        /// The position after the last byte hashed.
+        /// </summary>
+        private long next;
+
+        /// <summary>
+        /// Whether the bytes hashed are no longer the bytes from the origin on.
+        /// </summary>
+        private bool invalid;
+
+        /// <summary>
+        /// Initializes a new instance of the <see cref="HashingStream"/> class.
+        /// </summary>
+        /// <param name="inner">The stream to read.</param>
+        public HashingStream(Stream inner)
+        {
+            if (inner == null)
+            {
+                throw new ArgumentNullException("inner");
+            }
+
+            this.inner = inner;
+            this.origin = this.next = inner.CanSeek ? inner.Position : 0;
+            this.length = inner.CanSeek ? inner.Length : -1;
+        }
+
+        /// <summary>
+        /// Gets a value indicating whether the stream can be read.
+        /// </summary>
+        public override bool CanRead
+        {
+            get { return true; }
+        }
+
+        /// <summary>
+        /// Gets a value indicating whether the stream can seek.
+        /// </summary>
+        public override bool CanSeek
+        {
+            get { return this.inner.CanSeek; }
+        }
+
+        /// <summary>
+        /// Gets a value indicating whether the stream can be written, always false.
+        /// </summary>
+        public override bool CanWrite
+        {
+            get { return false; }
+        }
+
+        /// <summary>
+        /// Gets the length of the inner stream.
+        /// </summary>
+        public override long Length
+        {
+            get { return this.inner.Length; }
+        }
+
+        /// <summary>
+        /// Gets or sets the position in the inner stream.
+        /// </summary>
+        public override long Position
+        {
+            get
+            {
+                return this.inner.Position;
+            }
+
+            set
+            {
+                this.Seek(value, SeekOrigin.Begin);
+            }
+        }
+
+        /// <summary>
+        /// Finishes the hash of the bytes read. It can be called once, after the
+        /// stream has been disposed.
+        /// </summary>
+        /// <returns>The content hash in hexadecimal form, or <c>null</c> if the stream
+        /// was seeked away from where it started or not read to its end.</returns>
+        public string GetHash()
+        {
+            using (this.hasher)
+            {
+                if (this.invalid || (this.length >= 0 && this.next != this.length))
+                {
+                    return null;
+                }
+
+                this.hasher.TransformFinalBlock(new byte[0], 0, 0);
+                return DropboxContentHasher.ToHex(this.hasher.Hash);
+            }
+        }
+
+        /// <summary>
+        /// Reads from the inner stream and hashes the bytes read.
+        /// </summary>
+        /// <param name="buffer">The buffer to read into.</param>
+        /// <param name="offset">The offset in the buffer.</param>
+        /// <param name="count">The maximum number of bytes to read.</param>
+        /// <returns>The number of bytes read.</returns>
+        public override int Read(byte[] buffer, int offset, int count)
+        {
+            var read = this.inner.Read(buffer, offset, count);
+            if (read > 0)
+            {
+                this.hasher.TransformBlock(buffer, offset, read, null, 0);
+                this.next += read;
+            }
+
+            return read;
+        }
+
+        /// <summary>
+        /// Seeks the inner stream, starting the hash over if it seeks back to where
+        /// the stream started.
+        /// </summary>
+        /// <param name="offset">The offset.</param>
+        /// <param name="origin">Where the offset is from.</param>
+        /// <returns>The new position.</returns>
+        public override long Seek(long offset, SeekOrigin origin)
+        {
+            var position = this.inner.Seek(offset, origin);
+            if (position == this.origin)
+            {
+                this.hasher.Initialize();
+                this.next = position;
+                this.invalid = false;
+            }
+            else if (position != this.next)
+            {
+                this.invalid = true;
+            }
+
+            return position;
+        }
+
+        /// <summary>
+        /// Does nothing, the stream is read only.
+        /// </summary>
+        public override void Flush()
+        {
+        }
+
+        /// <summary>
+        /// Not supported, the stream is read only.
+        /// </summary>
+        /// <param name="value">The length.</param>
+        public override void SetLength(long value)
+        {
+            throw new NotSupportedException();
+        }
+
+        /// <summary>
+        /// Not supported, the stream is read only.
+        /// </summary>
+        /// <param name="buffer">The buffer.</param>
+        /// <param name="offset">The offset.</param>
+        /// <param name="count">The count.</param>
+        public override void Write(byte[] buffer, int offset, int count)
+        {
+            throw new NotSupportedException();
+        }
+
+        /// <summary>
+        /// Disposes the inner stream, the hash stays available.
+        /// </summary>
+        /// <param name="disposing">If called from <see cref="IDisposable.Dispose"/>.</param>
+        protected override void Dispose(bool disposing)
+        {
+            if (disposing)
+            {
+                this.inner.Dispose();
+            }
+
+            base.Dispose(disposing);
+        }
+    }
+}
+#endif
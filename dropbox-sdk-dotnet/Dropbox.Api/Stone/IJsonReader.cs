@@ -113,5 +113,11 @@ namespace Dropbox.Api.Stone
         /// </summary>
         /// <returns>The value.</returns>
         string ReadString();
+
+        /// <summary>
+        /// Read the current value, including any nested values, as raw json.
+        /// </summary>
+        /// <returns>The json of the value.</returns>
+        string ReadRaw();
     }
 }
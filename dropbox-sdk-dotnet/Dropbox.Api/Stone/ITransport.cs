@@ -9,6 +9,7 @@ namespace Dropbox.Api.Stone
     using System;
     using System.Collections.Generic;
     using System.IO;
+    using System.Threading;
     using System.Threading.Tasks;
 
     /// <summary>
@@ -43,6 +44,36 @@ namespace Dropbox.Api.Stone
         /// </summary>
         /// <returns>The downloaded content as a string.</returns>
         Task<string> GetContentAsStringAsync();
+
+        /// <summary>
+        /// Asynchronously copies the content to a stream, without holding more than
+        /// a small pooled buffer of it in memory.
+        /// </summary>
+        /// <param name="destination">The stream to write the content to.</param>
+        /// <param name="progress">Reports the number of bytes copied so far, or <c>null</c>.</param>
+        /// <param name="cancellationToken">Cancels the copy.</param>
+        /// <returns>The task that represents the asynchronous copy. The TResult
+        /// parameter contains the number of bytes copied.</returns>
+        Task<long> CopyContentToAsync(
+            Stream destination,
+            IProgress<long> progress = null,
+            CancellationToken cancellationToken = default(CancellationToken));
+
+        /// <summary>
+        /// Asynchronously passes the content to a callback, one pooled buffer at a
+        /// time.
+        /// </summary>
+        /// <param name="write">Called with each part of the content. The buffer is
+        /// reused once the returned task completes, so the callback must not keep
+        /// a reference to it.</param>
+        /// <param name="progress">Reports the number of bytes copied so far, or <c>null</c>.</param>
+        /// <param name="cancellationToken">Cancels the copy.</param>
+        /// <returns>The task that represents the asynchronous copy. The TResult
+        /// parameter contains the number of bytes copied.</returns>
+        Task<long> CopyContentToAsync(
+            Func<ArraySegment<byte>, Task> write,
+            IProgress<long> progress = null,
+            CancellationToken cancellationToken = default(CancellationToken));
     }
 
     /// <summary>
@@ -120,5 +151,34 @@ namespace Dropbox.Api.Stone
             IEncoder<TRequest> requestEncoder,
             IDecoder<TResponse> resposneDecoder,
             IDecoder<TError> errorDecoder);
+
+        /// <summary>
+        /// Sends the download request for a byte range of the content asynchronously.
+        /// </summary>
+        /// <typeparam name="TRequest">The type of the request.</typeparam>
+        /// <typeparam name="TResponse">The type of the response.</typeparam>
+        /// <typeparam name="TError">The type of the error.</typeparam>
+        /// <param name="request">The request.</param>
+        /// <param name="offset">The offset of the first byte of the range.</param>
+        /// <param name="length">The length of the range.</param>
+        /// <param name="host">The server host to send the request to.</param>
+        /// <param name="route">The route name.</param>
+        /// <param name="auth">The auth type of the route.</param>
+        /// <param name="requestEncoder">The request encoder.</param>
+        /// <param name="resposneDecoder">The response decoder.</param>
+        /// <param name="errorDecoder">The error decoder.</param>
+        /// <returns>An asynchronous task for the response, whose content is the
+        /// range, shorter if the content ends before the range does. For empty
+        /// content the first range is empty too.</returns>
+        Task<IDownloadResponse<TResponse>> SendDownloadRangeRequestAsync<TRequest, TResponse, TError>(
+            TRequest request,
+            long offset,
+            long length,
+            string host,
+            string route,
+            string auth,
+            IEncoder<TRequest> requestEncoder,
+            IDecoder<TResponse> resposneDecoder,
+            IDecoder<TError> errorDecoder);
     }
 }
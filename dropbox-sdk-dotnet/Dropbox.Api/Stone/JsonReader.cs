@@ -10,6 +10,7 @@ namespace Dropbox.Api.Stone
     using System.Collections.Generic;
     using System.Globalization;
     using System.IO;
+    using System.Text;
 
     using Newtonsoft.Json;
 
@@ -90,7 +91,24 @@ namespace Dropbox.Api.Stone
         /// <returns>The decoded object.</returns>
         public static T Read<T>(string json, IDecoder<T> decoder)
         {
-            var reader = new JsonReader(new JsonTextReader(new StringReader(json)));
+            return Read(new StringReader(json), decoder);
+        }
+
+        /// <summary>
+        /// Read specific type from the json of a text reader.
+        /// </summary>
+        /// <typeparam name="T">The type.</typeparam>
+        /// <param name="json">The reader of the json.</param>
+        /// <param name="decoder">The decoder.</param>
+        /// <returns>The decoded object.</returns>
+        public static T Read<T>(TextReader json, IDecoder<T> decoder)
+        {
+            var textReader = new JsonTextReader(json)
+            {
+                DateParseHandling = DateParseHandling.None
+            };
+
+            var reader = new JsonReader(textReader);
             return decoder.Decode(reader);
         }
 
@@ -172,7 +190,24 @@ namespace Dropbox.Api.Stone
         /// <returns>The value</returns>
         DateTime IJsonReader.ReadDateTime()
         {
-            return this.ReadValue<DateTime>();
+            var value = this.reader.Value as string;
+            if (value == null)
+            {
+                return this.ReadValue<DateTime>();
+            }
+
+            this.reader.Read();
+
+            DateTime result;
+            if (Iso8601DateTimeDecoder.TryParse(value, out result))
+            {
+                return result;
+            }
+
+            return DateTime.Parse(
+                value,
+                CultureInfo.InvariantCulture,
+                DateTimeStyles.AdjustToUniversal | DateTimeStyles.AssumeUniversal);
         }
 
         /// <summary>
@@ -202,6 +237,25 @@ namespace Dropbox.Api.Stone
             return this.ReadValue<string>();
         }
 
+        /// <summary>
+        /// Read the current value, including any nested values, as raw json.
+        /// </summary>
+        /// <returns>The json of the value.</returns>
+        string IJsonReader.ReadRaw()
+        {
+            var builder = new StringBuilder();
+            var textWriter = new JsonTextWriter(new StringWriter(builder, CultureInfo.InvariantCulture))
+            {
+                DateFormatString = "yyyy-MM-ddTHH:mm:ssZ"
+            };
+
+            textWriter.WriteToken(this.reader, true);
+            textWriter.Flush();
+            this.reader.Read();
+
+            return builder.ToString();
+        }
+
         /// <summary>
         /// Read next token as specific value type.
         /// </summary>
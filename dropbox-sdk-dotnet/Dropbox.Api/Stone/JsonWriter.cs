@@ -58,6 +58,47 @@ namespace Dropbox.Api.Stone
             return !string.IsNullOrEmpty(json) ? json .Replace("\x7f", "\\u007f"): "null";
         }
 
+        /// <summary>
+        /// Write the specified object to a text writer.
+        /// </summary>
+        /// <typeparam name="T">The type of the object to write.</typeparam>
+        /// <param name="encodable">The object to write.</param>
+        /// <param name="encoder">The encoder.</param>
+        /// <param name="output">The text writer, which is flushed but not closed.</param>
+        public static void Write<T>(T encodable, IEncoder<T> encoder, TextWriter output)
+        {
+            var textWriter = new JsonTextWriter(output) { DateFormatString = "yyyy-MM-ddTHH:mm:ssZ" };
+
+            var writer = new JsonWriter(textWriter);
+            encoder.Encode(encodable, writer);
+            textWriter.Flush();
+        }
+
+        /// <summary>
+        /// Write the specified object as UTF-8 into a pooled buffer.
+        /// </summary>
+        /// <typeparam name="T">The type of the object to write.</typeparam>
+        /// <param name="encodable">The object to write.</param>
+        /// <param name="encoder">The encoder.</param>
+        /// <returns>The writer holding the encoded object, dispose it to return
+        /// the buffer to the pool.</returns>
+        public static Utf8BufferWriter WriteUtf8<T>(T encodable, IEncoder<T> encoder)
+        {
+            var buffer = new Utf8BufferWriter();
+            var textWriter = new JsonTextWriter(buffer) { DateFormatString = "yyyy-MM-ddTHH:mm:ssZ" };
+
+            var writer = new JsonWriter(textWriter);
+            encoder.Encode(encodable, writer);
+            textWriter.Flush();
+
+            if (buffer.Length == 0)
+            {
+                buffer.Write("null");
+            }
+
+            return buffer;
+        }
+
         /// <summary>
         /// Write a Int32 value.
         /// </summary>
@@ -0,0 +1,89 @@
+//-----------------------------------------------------------------------------
+// <copyright file="LazyValue.cs" company="Dropbox Inc">
+//  Copyright (c) Dropbox Inc. All rights reserved.
+// </copyright>
+//-----------------------------------------------------------------------------
+
+namespace Dropbox.Api.Stone
+{
+    /// <summary>
+    /// Holds a field value that is decoded from its raw json the first time
+    /// it is accessed.
+    /// </summary>
+    /// <typeparam name="T">The type of the value.</typeparam>
+    internal sealed class LazyValue<T> where T : class
+    {
+        /// <summary>
+        /// The lock that guards decoding.
+        /// </summary>
+        private readonly object syncRoot = new object();
+
+        /// <summary>
+        /// The raw json, cleared once decoded.
+        /// </summary>
+        private string json;
+
+        /// <summary>
+        /// The decoder, cleared once decoded.
+        /// </summary>
+        private IDecoder<T> decoder;
+
+        /// <summary>
+        /// The value.
+        /// </summary>
+        private T value;
+
+        /// <summary>
+        /// Whether <see cref="value"/> holds the decoded value.
+        /// </summary>
+        private volatile bool isDecoded;
+
+        /// <summary>
+        /// Initializes a new instance of the <see cref="LazyValue{T}"/> class
+        /// with raw json that is decoded on first access.
+        /// </summary>
+        /// <param name="json">The raw json.</param>
+        /// <param name="decoder">The decoder.</param>
+        public LazyValue(string json, IDecoder<T> decoder)
+        {
+            this.json = json;
+            this.decoder = decoder;
+        }
+
+        /// <summary>
+        /// Initializes a new instance of the <see cref="LazyValue{T}"/> class
+        /// with an already decoded value.
+        /// </summary>
+        /// <param name="value">The value.</param>
+        public LazyValue(T value)
+        {
+            this.value = value;
+            this.isDecoded = true;
+        }
+
+        /// <summary>
+        /// Gets the value, decoding it if this is the first access.
+        /// </summary>
+        public T Value
+        {
+            get
+            {
+                if (!this.isDecoded)
+                {
+                    lock (this.syncRoot)
+                    {
+                        if (!this.isDecoded)
+                        {
+                            this.value = JsonReader.Read(this.json, this.decoder);
+                            this.json = null;
+                            this.decoder = null;
+                            this.isDecoded = true;
+                        }
+                    }
+                }
+
+                return this.value;
+            }
+        }
+    }
+}
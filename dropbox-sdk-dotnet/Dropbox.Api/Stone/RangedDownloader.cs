@@ -0,0 +1,420 @@
+//-----------------------------------------------------------------------------
+// <copyright file="RangedDownloader.cs" company="Dropbox Inc">
+//  Copyright (c) Dropbox Inc. All rights reserved.
+// </copyright>
+//-----------------------------------------------------------------------------
+
+#if !PORTABLE && !PORTABLE40
+namespace Dropbox.Api.Stone
+{
+    using System;
+    using System.Collections.Generic;
+    using System.Globalization;
+    using System.IO;
+    using System.Threading.Tasks;
+
+    /// <summary>
+    /// Downloads the content of a download style route to a file in byte ranges,
+    /// several at a time, and resumes the missing ranges of an earlier download
+    /// that failed.
+    /// </summary>
+    /// <remarks>
+    /// The completed ranges are recorded in a file next to the destination, named
+    /// after it with a <c>.ranges</c> suffix, which is deleted once the download
+    /// has completed. The record is only used if it was made for content with the
+    /// same hash, or the same revision and size when the route reports no hash.
+    /// </remarks>
+    internal static class RangedDownloader
+    {
+        /// <summary>
+        /// The default size of a range.
+        /// </summary>
+        public const long DefaultRangeSize = 8 * 1024 * 1024;
+
+        /// <summary>
+        /// The suffix of the file that records the completed ranges.
+        /// </summary>
+        private const string RangesSuffix = ".ranges";
+
+        /// <summary>
+        /// Downloads content to a file.
+        /// </summary>
+        /// <typeparam name="TResponse">The type of the response.</typeparam>
+        /// <param name="sendRange">Sends the request for a range, given its offset and length.</param>
+        /// <param name="getSize">Gets the size of the content from the response.</param>
+        /// <param name="getContentHash">Gets the content hash from the response, or
+        /// <c>null</c> if the route does not report one.</param>
+        /// <param name="getRevision">Gets a value which changes with the content, such
+        /// as its revision, from the response, or <c>null</c>. Only used when there is
+        /// no content hash.</param>
+        /// <param name="path">The path of the destination file.</param>
+        /// <param name="parallelism">The number of ranges downloaded at a time.</param>
+        /// <param name="rangeSize">The size of a range.</param>
+        /// <returns>The task that represents the asynchronous download. The TResult
+        /// parameter contains the response of the route.</returns>
+        /// <exception cref="InvalidDataException">The downloaded content does not match
+        /// the content hash reported by the route.</exception>
+        public static async Task<TResponse> DownloadToFileAsync<TResponse>(
+            Func<long, long, Task<IDownloadResponse<TResponse>>> sendRange,
+            Func<TResponse, ulong> getSize,
+            Func<TResponse, string> getContentHash,
+            Func<TResponse, string> getRevision,
+            string path,
+            int parallelism,
+            long rangeSize = DefaultRangeSize)
+        {
+            if (path == null)
+            {
+                throw new ArgumentNullException("path");
+            }
+
+            if (parallelism <= 0)
+            {
+                throw new ArgumentOutOfRangeException("parallelism");
+            }
+
+            if (rangeSize <= 0)
+            {
+                throw new ArgumentOutOfRangeException("rangeSize");
+            }
+
+            var rangesPath = path + RangesSuffix;
+
+            // When an earlier download already has the first range, only probe its
+            // first byte for the metadata of the content instead of downloading it again.
+            var probe = Download.RecordContains(rangesPath, 0);
+            var first = await sendRange(0, probe ? 1 : rangeSize).ConfigureAwait(false);
+            var response = first.Response;
+            var size = (long)getSize(response);
+            var contentHash = getContentHash != null ? getContentHash(response) : null;
+            var revision = getRevision != null ? getRevision(response) : null;
+            var identity = contentHash ?? (revision != null
+                ? revision + " " + size.ToString(CultureInfo.InvariantCulture)
+                : size.ToString(CultureInfo.InvariantCulture));
+            var rangeCount = (int)((size + rangeSize - 1) / rangeSize);
+
+            Download download;
+            try
+            {
+                download = new Download(path, rangesPath, identity, size);
+            }
+            catch
+            {
+                first.Dispose();
+                throw;
+            }
+
+            using (download)
+            {
+                var missing = new Queue<int>();
+                for (var i = 0; i < rangeCount; i++)
+                {
+                    if (!download.Completed.Contains(i))
+                    {
+                        missing.Enqueue(i);
+                    }
+                }
+
+                using (first)
+                {
+                    if (probe)
+                    {
+                        // Read the probed byte so the connection can be reused.
+                        await first.GetContentAsByteArrayAsync().ConfigureAwait(false);
+                    }
+                    else if (missing.Count > 0 && missing.Peek() == 0)
+                    {
+                        missing.Dequeue();
+                        await download.WriteRangeAsync(first, 0, Math.Min(rangeSize, size)).ConfigureAwait(false);
+                        download.Complete(0);
+                    }
+                }
+
+                var workerCount = Math.Min(parallelism, missing.Count);
+                var workers = new List<Task>(workerCount);
+                for (var i = 0; i < workerCount; i++)
+                {
+                    workers.Add(RunWorkerAsync(sendRange, download, missing, rangeSize, size));
+                }
+
+                await Task.WhenAll(workers).ConfigureAwait(false);
+
+                if (contentHash != null && !string.Equals(download.ComputeHash(), contentHash, StringComparison.Ordinal))
+                {
+                    download.Discard();
+                    throw new InvalidDataException("The downloaded content of " + path + " does not match its content hash.");
+                }
+            }
+
+            File.Delete(rangesPath);
+            return response;
+        }
+
+        /// <summary>
+        /// Downloads missing ranges until there are none left.
+        /// </summary>
+        /// <typeparam name="TResponse">The type of the response.</typeparam>
+        /// <param name="sendRange">Sends the request for a range.</param>
+        /// <param name="download">The download.</param>
+        /// <param name="missing">The indexes of the missing ranges, shared by the workers.</param>
+        /// <param name="rangeSize">The size of a range.</param>
+        /// <param name="size">The size of the content.</param>
+        /// <returns>The task that represents the asynchronous work.</returns>
+        private static async Task RunWorkerAsync<TResponse>(
+            Func<long, long, Task<IDownloadResponse<TResponse>>> sendRange,
+            Download download,
+            Queue<int> missing,
+            long rangeSize,
+            long size)
+        {
+            while (true)
+            {
+                int index;
+                lock (missing)
+                {
+                    if (missing.Count == 0)
+                    {
+                        return;
+                    }
+
+                    index = missing.Dequeue();
+                }
+
+                var offset = index * rangeSize;
+                var length = Math.Min(rangeSize, size - offset);
+                using (var range = await sendRange(offset, length).ConfigureAwait(false))
+                {
+                    await download.WriteRangeAsync(range, offset, length).ConfigureAwait(false);
+                }
+
+                download.Complete(index);
+            }
+        }
+
+        /// <summary>
+        /// The destination file of a download and the record of its completed ranges.
+        /// </summary>
+        private sealed class Download : IDisposable
+        {
+            /// <summary>
+            /// The destination file, preallocated to the size of the content. Also used
+            /// as the lock for the file and the record.
+            /// </summary>
+            private readonly FileStream file;
+
+            /// <summary>
+            /// The record of the completed ranges.
+            /// </summary>
+            private readonly StreamWriter record;
+
+            /// <summary>
+            /// The path of the record.
+            /// </summary>
+            private readonly string rangesPath;
+
+            /// <summary>
+            /// Initializes a new instance of the <see cref="Download"/> class, reading
+            /// the record of an earlier download of the same content if there is one.
+            /// </summary>
+            /// <param name="path">The path of the destination file.</param>
+            /// <param name="rangesPath">The path of the record.</param>
+            /// <param name="identity">Identifies the content.</param>
+            /// <param name="size">The size of the content.</param>
+            public Download(string path, string rangesPath, string identity, long size)
+            {
+                this.rangesPath = rangesPath;
+                this.Completed = ReadRecord(path, rangesPath, identity, size);
+
+                this.file = new FileStream(path, FileMode.OpenOrCreate, FileAccess.ReadWrite, FileShare.None);
+                try
+                {
+                    this.file.SetLength(size);
+
+                    if (this.Completed.Count == 0)
+                    {
+                        this.record = new StreamWriter(rangesPath, false);
+                        this.record.WriteLine(identity);
+                    }
+                    else
+                    {
+                        this.record = new StreamWriter(rangesPath, true);
+                    }
+
+                    this.record.Flush();
+                }
+                catch
+                {
+                    this.file.Dispose();
+                    throw;
+                }
+            }
+
+            /// <summary>
+            /// Gets the indexes of the completed ranges read from the record.
+            /// </summary>
+            public HashSet<int> Completed { get; private set; }
+
+            /// <summary>
+            /// Copies the content of a range response to the file.
+            /// </summary>
+            /// <typeparam name="TResponse">The type of the response.</typeparam>
+            /// <param name="response">The response.</param>
+            /// <param name="offset">The offset of the range.</param>
+            /// <param name="length">The length of the range.</param>
+            /// <returns>The task that represents the asynchronous copy.</returns>
+            /// <exception cref="IOException">The response ended before the range did.</exception>
+            public async Task WriteRangeAsync<TResponse>(IDownloadResponse<TResponse> response, long offset, long length)
+            {
+                var buffer = BufferPool.Rent(BufferPool.BufferSize);
+                try
+                {
+                    using (var content = await response.GetContentAsStreamAsync().ConfigureAwait(false))
+                    {
+                        var written = 0L;
+                        while (written < length)
+                        {
+                            var count = (int)Math.Min(buffer.Length, length - written);
+                            var read = await content.ReadAsync(buffer, 0, count).ConfigureAwait(false);
+                            if (read == 0)
+                            {
+                                throw new IOException("The response ended before the range at " + offset + " did.");
+                            }
+
+                            lock (this.file)
+                            {
+                                this.file.Position = offset + written;
+                                this.file.Write(buffer, 0, read);
+                            }
+
+                            written += read;
+                        }
+                    }
+                }
+                finally
+                {
+                    BufferPool.Return(buffer);
+                }
+            }
+
+            /// <summary>
+            /// Records a range as completed, once its content is on disk.
+            /// </summary>
+            /// <param name="index">The index of the range.</param>
+            public void Complete(int index)
+            {
+                lock (this.file)
+                {
+                    this.file.Flush(true);
+                    this.record.WriteLine(index.ToString(CultureInfo.InvariantCulture));
+                    this.record.Flush();
+                }
+            }
+
+            /// <summary>
+            /// Computes the content hash of the file.
+            /// </summary>
+            /// <returns>The content hash.</returns>
+            public string ComputeHash()
+            {
+                lock (this.file)
+                {
+                    this.file.Position = 0;
+                    using (var hasher = new DropboxContentHasher())
+                    {
+                        return DropboxContentHasher.ToHex(hasher.ComputeHash(this.file));
+                    }
+                }
+            }
+
+            /// <summary>
+            /// Forgets the completed ranges, so the next download starts over.
+            /// </summary>
+            public void Discard()
+            {
+                this.record.Dispose();
+                File.Delete(this.rangesPath);
+            }
+
+            /// <summary>
+            /// Closes the file and the record.
+            /// </summary>
+            public void Dispose()
+            {
+                this.record.Dispose();
+                this.file.Dispose();
+            }
+
+            /// <summary>
+            /// Checks whether the record of an earlier download, whatever content it
+            /// was made for, has a range as completed.
+            /// </summary>
+            /// <param name="rangesPath">The path of the record.</param>
+            /// <param name="index">The index of the range.</param>
+            /// <returns><c>true</c> if the record has the range.</returns>
+            public static bool RecordContains(string rangesPath, int index)
+            {
+                if (!File.Exists(rangesPath))
+                {
+                    return false;
+                }
+
+                var value = index.ToString(CultureInfo.InvariantCulture);
+                using (var reader = new StreamReader(rangesPath))
+                {
+                    // The first line is the identity of the content.
+                    reader.ReadLine();
+
+                    string line;
+                    while ((line = reader.ReadLine()) != null)
+                    {
+                        if (line == value)
+                        {
+                            return true;
+                        }
+                    }
+                }
+
+                return false;
+            }
+
+            /// <summary>
+            /// Reads the completed ranges of an earlier download.
+            /// </summary>
+            /// <param name="path">The path of the destination file.</param>
+            /// <param name="rangesPath">The path of the record.</param>
+            /// <param name="identity">Identifies the content.</param>
+            /// <param name="size">The size of the content.</param>
+            /// <returns>The completed ranges, empty if the record is missing or was
+            /// made for other content.</returns>
+            private static HashSet<int> ReadRecord(string path, string rangesPath, string identity, long size)
+            {
+                var completed = new HashSet<int>();
+                if (!File.Exists(rangesPath) || !File.Exists(path) || new FileInfo(path).Length != size)
+                {
+                    return completed;
+                }
+
+                using (var reader = new StreamReader(rangesPath))
+                {
+                    if (reader.ReadLine() != identity)
+                    {
+                        return completed;
+                    }
+
+                    string line;
+                    while ((line = reader.ReadLine()) != null)
+                    {
+                        int index;
+                        if (int.TryParse(line, NumberStyles.None, CultureInfo.InvariantCulture, out index))
+                        {
+                            completed.Add(index);
+                        }
+                    }
+                }
+
+                return completed;
+            }
+        }
+    }
+}
+#endif
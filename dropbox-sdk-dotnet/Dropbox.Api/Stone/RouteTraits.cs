@@ -0,0 +1,79 @@
+//-----------------------------------------------------------------------------
+// <copyright file="RouteTraits.cs" company="Dropbox Inc">
+//  Copyright (c) Dropbox Inc. All rights reserved.
+// </copyright>
+//-----------------------------------------------------------------------------
+
+namespace Dropbox.Api.Stone
+{
+    using System;
+    using System.Collections.Generic;
+
+    /// <summary>
+    /// The traits a route can have, which control how the transport may send it.
+    /// </summary>
+    [Flags]
+    internal enum RouteTrait
+    {
+        /// <summary>
+        /// The route has no special traits.
+        /// </summary>
+        None = 0,
+
+        /// <summary>
+        /// The route only reads, so its response may be cached by the client.
+        /// </summary>
+        Cacheable = 1,
+
+        /// <summary>
+        /// Sending the route several times has the same effect as sending it once,
+        /// so identical concurrent requests may share one call.
+        /// </summary>
+        Idempotent = 2,
+    }
+
+    /// <summary>
+    /// The traits of the routes defined by the API, keyed by route path such as
+    /// <c>/files/get_metadata</c>.
+    /// </summary>
+    /// <remarks>
+    /// The traits are supplied by the generated part of this class, routes
+    /// without an entry have no traits.
+    /// </remarks>
+    internal static partial class RouteTraits
+    {
+        /// <summary>
+        /// The traits, keyed by route path.
+        /// </summary>
+        private static readonly Dictionary<string, RouteTrait> Traits = CreateTraits();
+
+        /// <summary>
+        /// Gets whether a route has the given trait.
+        /// </summary>
+        /// <param name="route">The route path.</param>
+        /// <param name="trait">The trait.</param>
+        /// <returns><c>true</c> if the route has the trait.</returns>
+        public static bool Has(string route, RouteTrait trait)
+        {
+            RouteTrait traits;
+            return Traits.TryGetValue(route, out traits) && (traits & trait) == trait;
+        }
+
+        /// <summary>
+        /// Creates the table from the generated traits.
+        /// </summary>
+        /// <returns>The table.</returns>
+        private static Dictionary<string, RouteTrait> CreateTraits()
+        {
+            var traits = new Dictionary<string, RouteTrait>(StringComparer.Ordinal);
+            AddGeneratedTraits(traits);
+            return traits;
+        }
+
+        /// <summary>
+        /// Adds the traits of the routes defined by the API.
+        /// </summary>
+        /// <param name="traits">The traits, keyed by route path.</param>
+        static partial void AddGeneratedTraits(IDictionary<string, RouteTrait> traits);
+    }
+}
@@ -0,0 +1,82 @@
+//-----------------------------------------------------------------------------
+// <copyright file="UploadSkipper.cs" company="Dropbox Inc">
+//  Copyright (c) Dropbox Inc. All rights reserved.
+// </copyright>
+//-----------------------------------------------------------------------------
+
+#if !PORTABLE && !PORTABLE40
+namespace Dropbox.Api.Stone
+{
+    using System;
+    using System.IO;
+    using System.Threading.Tasks;
+
+    /// <summary>
+    /// Uploads content unless its content hash shows the server already has it.
+    /// </summary>
+    internal static class UploadSkipper
+    {
+        /// <summary>
+        /// Uploads a body unless it matches the metadata of the file already on
+        /// the server.
+        /// </summary>
+        /// <remarks>
+        /// The body is only hashed before the upload when it can seek and has the
+        /// size of the existing file, any other body has changed. Otherwise it is
+        /// hashed while it is uploaded, and the hash is checked against the one
+        /// the server reports for the uploaded file. The body is disposed either
+        /// way, as the upload does.
+        /// </remarks>
+        /// <typeparam name="TResponse">The type of the response.</typeparam>
+        /// <param name="body">The content to upload.</param>
+        /// <param name="existing">The metadata of the file on the server, or <c>null</c>.</param>
+        /// <param name="upload">Uploads a body.</param>
+        /// <param name="getSize">Gets the size from the metadata.</param>
+        /// <param name="getContentHash">Gets the content hash from the metadata.</param>
+        /// <returns>The task that represents the asynchronous upload. The TResult
+        /// parameter contains <paramref name="existing"/> if the upload was skipped,
+        /// otherwise the response of the upload.</returns>
+        /// <exception cref="InvalidDataException">The server reported a different
+        /// content hash than the content read from the body.</exception>
+        public static async Task<TResponse> UploadIfChangedAsync<TResponse>(
+            Stream body,
+            TResponse existing,
+            Func<Stream, Task<TResponse>> upload,
+            Func<TResponse, ulong> getSize,
+            Func<TResponse, string> getContentHash)
+            where TResponse : class
+        {
+            if (body == null)
+            {
+                throw new ArgumentNullException("body");
+            }
+
+            var existingHash = existing != null ? getContentHash(existing) : null;
+            if (existingHash != null && body.CanSeek && body.Length - body.Position == (long)getSize(existing))
+            {
+                var start = body.Position;
+                var hash = await DropboxContentHasher.HashStreamAsync(body).ConfigureAwait(false);
+                if (string.Equals(hash, existingHash, StringComparison.Ordinal))
+                {
+                    body.Dispose();
+                    return existing;
+                }
+
+                body.Position = start;
+            }
+
+            var hashing = new HashingStream(body);
+            var response = await upload(hashing).ConfigureAwait(false);
+
+            var bodyHash = hashing.GetHash();
+            var uploadedHash = getContentHash(response);
+            if (bodyHash != null && uploadedHash != null && !string.Equals(bodyHash, uploadedHash, StringComparison.Ordinal))
+            {
+                throw new InvalidDataException("The content hash of the uploaded file does not match the content read.");
+            }
+
+            return response;
+        }
+    }
+}
+#endif
@@ -0,0 +1,196 @@
+//-----------------------------------------------------------------------------
+// <copyright file="Utf8BufferWriter.cs" company="Dropbox Inc">
+//  Copyright (c) Dropbox Inc. All rights reserved.
+// </copyright>
+//-----------------------------------------------------------------------------
+
+namespace Dropbox.Api.Stone
+{
+    using System;
+    using System.IO;
+    using System.Text;
+
+    /// <summary>
+    /// A text writer that encodes what is written as UTF-8 directly into a
+    /// buffer from the <see cref="BufferPool"/>.
+    /// </summary>
+    /// <remarks>
+    /// <para>Disposing the writer returns the buffer to the pool, so streams opened
+    /// with <see cref="OpenStream"/> must not be used afterwards.</para>
+    /// <para>DEL characters are written as <c>\u007f</c>, matching
+    /// <see cref="JsonWriter.Write{T}(T, IEncoder{T}, bool)"/>. DEL is only valid
+    /// inside JSON strings, so the escape never changes the meaning of the text.</para>
+    /// </remarks>
+    internal sealed class Utf8BufferWriter : TextWriter
+    {
+        /// <summary>
+        /// The encoding, without a byte order mark.
+        /// </summary>
+        private static readonly UTF8Encoding Utf8 = new UTF8Encoding(false);
+
+        /// <summary>
+        /// The bytes written in place of a DEL character.
+        /// </summary>
+        private static readonly byte[] EscapedDelete = Utf8.GetBytes("\\u007f");
+
+        /// <summary>
+        /// The encoder, which keeps surrogate pairs split across writes.
+        /// </summary>
+        private readonly System.Text.Encoder encoder = Utf8.GetEncoder();
+
+        /// <summary>
+        /// Scratch space for writing single characters and strings.
+        /// </summary>
+        private readonly char[] chars = new char[256];
+
+        /// <summary>
+        /// The buffer.
+        /// </summary>
+        private byte[] buffer = BufferPool.Rent(BufferPool.BufferSize);
+
+        /// <summary>
+        /// The number of bytes written to the buffer.
+        /// </summary>
+        private int length;
+
+        /// <summary>
+        /// Gets the encoding.
+        /// </summary>
+        public override Encoding Encoding
+        {
+            get { return Utf8; }
+        }
+
+        /// <summary>
+        /// Gets the number of bytes written.
+        /// </summary>
+        public int Length
+        {
+            get { return this.length; }
+        }
+
+        /// <summary>
+        /// Opens a read only stream over the bytes written.
+        /// </summary>
+        /// <returns>The stream.</returns>
+        public Stream OpenStream()
+        {
+            this.Flush();
+            return new MemoryStream(this.buffer, 0, this.length, false);
+        }
+
+        /// <summary>
+        /// Writes a character.
+        /// </summary>
+        /// <param name="value">The character.</param>
+        public override void Write(char value)
+        {
+            this.chars[0] = value;
+            this.Write(this.chars, 0, 1);
+        }
+
+        /// <summary>
+        /// Writes a range of characters.
+        /// </summary>
+        /// <param name="buffer">The characters.</param>
+        /// <param name="index">The index of the first character.</param>
+        /// <param name="count">The number of characters.</param>
+        public override void Write(char[] buffer, int index, int count)
+        {
+            var end = index + count;
+            var delete = Array.IndexOf(buffer, '\x7f', index, count);
+
+            while (delete >= 0)
+            {
+                this.Encode(buffer, index, delete - index);
+
+                this.EnsureCapacity(EscapedDelete.Length);
+                Buffer.BlockCopy(EscapedDelete, 0, this.buffer, this.length, EscapedDelete.Length);
+                this.length += EscapedDelete.Length;
+
+                index = delete + 1;
+                delete = Array.IndexOf(buffer, '\x7f', index, end - index);
+            }
+
+            this.Encode(buffer, index, end - index);
+        }
+
+        /// <summary>
+        /// Writes a string.
+        /// </summary>
+        /// <param name="value">The string.</param>
+        public override void Write(string value)
+        {
+            if (value == null)
+            {
+                return;
+            }
+
+            for (var offset = 0; offset < value.Length; offset += this.chars.Length)
+            {
+                var count = Math.Min(this.chars.Length, value.Length - offset);
+                value.CopyTo(offset, this.chars, 0, count);
+                this.Write(this.chars, 0, count);
+            }
+        }
+
+        /// <summary>
+        /// Writes out any characters held by the encoder.
+        /// </summary>
+        public override void Flush()
+        {
+            this.EnsureCapacity(Utf8.GetMaxByteCount(0));
+            this.length += this.encoder.GetBytes(this.chars, 0, 0, this.buffer, this.length, true);
+        }
+
+        /// <summary>
+        /// Returns the buffer to the pool.
+        /// </summary>
+        /// <param name="disposing">If called from <see cref="IDisposable.Dispose"/>.</param>
+        protected override void Dispose(bool disposing)
+        {
+            if (disposing && this.buffer != null)
+            {
+                BufferPool.Return(this.buffer);
+                this.buffer = null;
+            }
+
+            base.Dispose(disposing);
+        }
+
+        /// <summary>
+        /// Encodes a range of characters into the buffer.
+        /// </summary>
+        /// <param name="buffer">The characters.</param>
+        /// <param name="index">The index of the first character.</param>
+        /// <param name="count">The number of characters.</param>
+        private void Encode(char[] buffer, int index, int count)
+        {
+            if (count == 0)
+            {
+                return;
+            }
+
+            this.EnsureCapacity(Utf8.GetMaxByteCount(count));
+            this.length += this.encoder.GetBytes(buffer, index, count, this.buffer, this.length, false);
+        }
+
+        /// <summary>
+        /// Makes sure there is space for the given number of bytes, moving to a
+        /// larger buffer if needed.
+        /// </summary>
+        /// <param name="count">The number of bytes.</param>
+        private void EnsureCapacity(int count)
+        {
+            if (this.length + count <= this.buffer.Length)
+            {
+                return;
+            }
+
+            var larger = BufferPool.Rent(Math.Max(this.buffer.Length * 2, this.length + count));
+            Buffer.BlockCopy(this.buffer, 0, larger, 0, this.length);
+            BufferPool.Return(this.buffer);
+            this.buffer = larger;
+        }
+    }
+}
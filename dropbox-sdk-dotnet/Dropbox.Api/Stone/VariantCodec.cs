@@ -0,0 +1,204 @@
+//-----------------------------------------------------------------------------
+// <copyright file="VariantCodec.cs" company="Dropbox Inc">
+//  Copyright (c) Dropbox Inc. All rights reserved.
+// </copyright>
+//-----------------------------------------------------------------------------
+
+namespace Dropbox.Api.Stone
+{
+    using System;
+
+    /// <summary>
+    /// Shared encoder and decoder for union variants that carry no value.
+    /// </summary>
+    /// <typeparam name="T">The variant type.</typeparam>
+    internal static class VoidVariantCodec<T> where T : class
+    {
+        /// <summary>
+        /// The encoder instance, void variants have no fields to encode.
+        /// </summary>
+        public static readonly StructEncoder<T> Encoder = new VoidVariantEncoder();
+
+        /// <summary>
+        /// Creates a decoder that returns the singleton instance of the variant.
+        /// </summary>
+        /// <param name="instance">The singleton instance.</param>
+        /// <returns>The decoder.</returns>
+        public static StructDecoder<T> CreateDecoder(T instance)
+        {
+            return new VoidVariantDecoder(instance);
+        }
+
+        /// <summary>
+        /// Encoder for a void variant.
+        /// </summary>
+        private sealed class VoidVariantEncoder : StructEncoder<T>
+        {
+            /// <summary>
+            /// Encode fields of given value.
+            /// </summary>
+            /// <param name="value">The value.</param>
+            /// <param name="writer">The writer.</param>
+            public override void EncodeFields(T value, IJsonWriter writer)
+            {
+            }
+        }
+
+        /// <summary>
+        /// Decoder for a void variant.
+        /// </summary>
+        private sealed class VoidVariantDecoder : StructDecoder<T>
+        {
+            /// <summary>
+            /// The singleton instance.
+            /// </summary>
+            private readonly T instance;
+
+            /// <summary>
+            /// Initializes a new instance of the <see cref="VoidVariantDecoder"/> class.
+            /// </summary>
+            /// <param name="instance">The singleton instance.</param>
+            public VoidVariantDecoder(T instance)
+            {
+                this.instance = instance;
+            }
+
+            /// <summary>
+            /// Create a struct instance.
+            /// </summary>
+            /// <returns>The struct instance.</returns>
+            protected override T Create()
+            {
+                return this.instance;
+            }
+        }
+    }
+
+    /// <summary>
+    /// Shared encoder and decoder for union variants that wrap a struct
+    /// value. The struct fields are decoded inline with the union tag.
+    /// </summary>
+    /// <typeparam name="T">The variant type.</typeparam>
+    /// <typeparam name="TValue">The type of the wrapped struct.</typeparam>
+    internal static class StructVariantCodec<T, TValue>
+        where T : class
+        where TValue : class
+    {
+        /// <summary>
+        /// Creates an encoder for the variant.
+        /// </summary>
+        /// <param name="tag">The union tag of the variant.</param>
+        /// <param name="getValue">Gets the wrapped value from a variant instance.</param>
+        /// <param name="valueEncoder">The encoder for the wrapped value.</param>
+        /// <returns>The encoder.</returns>
+        public static StructEncoder<T> CreateEncoder(string tag, Func<T, TValue> getValue, IEncoder<TValue> valueEncoder)
+        {
+            return new StructVariantEncoder(tag, getValue, valueEncoder);
+        }
+
+        /// <summary>
+        /// Creates a decoder for the variant.
+        /// </summary>
+        /// <param name="create">Creates a variant instance from the wrapped value.</param>
+        /// <param name="valueDecoder">The decoder for the wrapped value.</param>
+        /// <returns>The decoder.</returns>
+        public static StructDecoder<T> CreateDecoder(Func<TValue, T> create, StructDecoder<TValue> valueDecoder)
+        {
+            return new StructVariantDecoder(create, valueDecoder);
+        }
+
+        /// <summary>
+        /// Encoder for a struct variant.
+        /// </summary>
+        private sealed class StructVariantEncoder : StructEncoder<T>
+        {
+            /// <summary>
+            /// The union tag.
+            /// </summary>
+            private readonly string tag;
+
+            /// <summary>
+            /// Gets the wrapped value.
+            /// </summary>
+            private readonly Func<T, TValue> getValue;
+
+            /// <summary>
+            /// The value encoder.
+            /// </summary>
+            private readonly IEncoder<TValue> valueEncoder;
+
+            /// <summary>
+            /// Initializes a new instance of the <see cref="StructVariantEncoder"/> class.
+            /// </summary>
+            /// <param name="tag">The union tag.</param>
+            /// <param name="getValue">Gets the wrapped value.</param>
+            /// <param name="valueEncoder">The value encoder.</param>
+            public StructVariantEncoder(string tag, Func<T, TValue> getValue, IEncoder<TValue> valueEncoder)
+            {
+                this.tag = tag;
+                this.getValue = getValue;
+                this.valueEncoder = valueEncoder;
+            }
+
+            /// <summary>
+            /// Encode fields of given value.
+            /// </summary>
+            /// <param name="value">The value.</param>
+            /// <param name="writer">The writer.</param>
+            public override void EncodeFields(T value, IJsonWriter writer)
+            {
+                var wrapped = this.getValue(value);
+                if (wrapped != null)
+                {
+                    WriteProperty(this.tag, wrapped, writer, this.valueEncoder);
+                }
+            }
+        }
+
+        /// <summary>
+        /// Decoder for a struct variant.
+        /// </summary>
+        private sealed class StructVariantDecoder : StructDecoder<T>
+        {
+            /// <summary>
+            /// Creates a variant instance.
+            /// </summary>
+            private readonly Func<TValue, T> create;
+
+            /// <summary>
+            /// The value decoder.
+            /// </summary>
+            private readonly StructDecoder<TValue> valueDecoder;
+
+            /// <summary>
+            /// Initializes a new instance of the <see cref="StructVariantDecoder"/> class.
+            /// </summary>
+            /// <param name="create">Creates a variant instance.</param>
+            /// <param name="valueDecoder">The value decoder.</param>
+            public StructVariantDecoder(Func<TValue, T> create, StructDecoder<TValue> valueDecoder)
+            {
+                this.create = create;
+                this.valueDecoder = valueDecoder;
+            }
+
+            /// <summary>
+            /// Decode fields without ensuring start and end object.
+            /// </summary>
+            /// <param name="reader">The json reader.</param>
+            /// <returns>The decoded object.</returns>
+            public override T DecodeFields(IJsonReader reader)
+            {
+                return this.create(this.valueDecoder.DecodeFields(reader));
+            }
+
+            /// <summary>
+            /// Create a struct instance.
+            /// </summary>
+            /// <returns>The struct instance.</returns>
+            protected override T Create()
+            {
+                throw new InvalidOperationException();
+            }
+        }
+    }
+}
@@ -36,6 +36,14 @@ namespace Dropbox.Api
         /// </value>
         public TError ErrorResponse { get; private set; }
 
+        /// <summary>
+        /// Gets the message for the end user, if the server provided one.
+        /// </summary>
+        /// <value>
+        /// The user message, or <c>null</c>.
+        /// </value>
+        public string UserMessage { get; private set; }
+
         /// <summary>
         /// Gets the exception message.
         /// </summary>
@@ -117,11 +125,59 @@ namespace Dropbox.Api
                     case "error_summary":
                         value.ErrorMessage = StringDecoder.Instance.Decode(reader);
                         break;
+                    case "user_message":
+                        value.UserMessage = UserMessageDecoder.Instance.Decode(reader);
+                        break;
                     default:
                         reader.Skip();
                         break;
                 }
             }
         }
+
+        /// <summary>
+        /// Decodes the text of the localized <c>user_message</c> object.
+        /// </summary>
+        private sealed class UserMessageDecoder : StructDecoder<string>
+        {
+            /// <summary>
+            /// The instance.
+            /// </summary>
+            public static readonly UserMessageDecoder Instance = new UserMessageDecoder();
+
+            /// <summary>
+            /// Decode fields without ensuring start and end object.
+            /// </summary>
+            /// <param name="reader">The json reader.</param>
+            /// <returns>The message text.</returns>
+            public override string DecodeFields(IJsonReader reader)
+            {
+                string text = null;
+                string fieldName;
+
+                while (TryReadPropertyName(reader, out fieldName))
+                {
+                    if (fieldName == "text")
+                    {
+                        text = StringDecoder.Instance.Decode(reader);
+                    }
+                    else
+                    {
+                        reader.Skip();
+                    }
+                }
+
+                return text;
+            }
+
+            /// <summary>
+            /// Create a struct instance.
+            /// </summary>
+            /// <returns>The struct instance.</returns>
+            protected override string Create()
+            {
+                throw new InvalidOperationException();
+            }
+        }
     }
 }
@@ -1,15 +1,113 @@
 #!/usr/bin/env python
 from __future__ import absolute_import, division, print_function
 
+import argparse
 import glob
 import os
 import shutil
 import subprocess
 
 
+_cmdline_parser = argparse.ArgumentParser(description='Generates the Dropbox .NET SDK.')
+_cmdline_parser.add_argument(
+    '--sdk-csproj',
+    action='store_true',
+    help='Generate a single SDK-style multi-targeted project instead of one project per target.',
+)
+_cmdline_parser.add_argument(
+    '--union-shard-size',
+    type=int,
+    default=0,
+    help='Split unions with more than this many variants into partial class files.',
+)
+_cmdline_parser.add_argument(
+    '--lazy-fields',
+    action='append',
+    default=[],
+    help='Comma separated struct fields, as namespace.Struct.field, to decode on first access.',
+)
+_cmdline_parser.add_argument(
+    '--cacheable-routes',
+    action='append',
+    default=[],
+    help='Comma separated read only routes, as namespace/route, to allow in the response cache.',
+)
+_cmdline_parser.add_argument(
+    '--idempotent-routes',
+    action='append',
+    default=[],
+    help='Comma separated idempotent routes, as namespace/route, to allow request coalescing for.',
+)
+_cmdline_parser.add_argument(
+    '--batch-routes',
+    action='append',
+    default=[],
+    help='Comma separated pairs, as namespace/route=namespace/batch_route, to generate aggregators for.',
+)
+_cmdline_parser.add_argument(
+    '--ranged-download-routes',
+    action='append',
+    default=[],
+    help='Comma separated download routes, as namespace/route, to generate ranged file downloads for.',
+)
+_cmdline_parser.add_argument(
+    '--upload-skip-routes',
+    action='append',
+    default=[],
+    help='Comma separated upload routes, as namespace/route, to generate content hash upload skipping for.',
+)
+
+# The per-target projects that --sdk-csproj folds into Dropbox.Api.csproj.
+_PER_TARGET_PROJECTS = ['Dropbox.Api.Portable', 'Dropbox.Api.Portable40']
+
+
+def _remove_projects_from_solution(sln_path, names):
+    """Removes projects, and their configurations, from a solution file."""
+
+    with open(sln_path) as f:
+        lines = f.readlines()
+
+    guids = set()
+    for line in lines:
+        if line.startswith('Project(') and line.split('"')[3] in names:
+            guids.add(line.split('"')[7].upper())
+
+    result = []
+    skipping = False
+    for line in lines:
+        if line.startswith('Project(') and line.split('"')[7].upper() in guids:
+            skipping = True
+        elif skipping:
+            skipping = not line.startswith('EndProject')
+        elif not any(guid in line.upper() for guid in guids):
+            result.append(line)
+
+    with open(sln_path, 'w') as f:
+        f.writelines(result)
+
+
 def main():
     """The entry point for the program."""
     
+    args = _cmdline_parser.parse_args()
+    generator_args = []
+    if args.sdk_csproj:
+        generator_args.append('--sdk-csproj')
+    if args.union_shard_size:
+        generator_args.extend(['--union-shard-size', str(args.union_shard_size)])
+    for lazy_fields in args.lazy_fields:
+        generator_args.extend(['--lazy-fields', lazy_fields])
+    for cacheable_routes in args.cacheable_routes:
+        generator_args.extend(['--cacheable-routes', cacheable_routes])
+    for idempotent_routes in args.idempotent_routes:
+        generator_args.extend(['--idempotent-routes', idempotent_routes])
+    for batch_routes in args.batch_routes:
+        generator_args.extend(['--batch-routes', batch_routes])
+    for ranged_download_routes in args.ranged_download_routes:
+        generator_args.extend(['--ranged-download-routes', ranged_download_routes])
+    for upload_skip_routes in args.upload_skip_routes:
+        generator_args.extend(['--upload-skip-routes', upload_skip_routes])
+
     repo_path = 'dropbox-sdk-dotnet'
     print('Generating code')
     try:
@@ -21,10 +119,14 @@ def main():
     try:
         subprocess.check_output(
             (['python', '-m', 'stone.cli', '--filter-by-route-attr', 'alpah_group=null', '-a:all', 'generator/csharp.stoneg.py'] +
-             [os.path.join(repo_path, 'Dropbox.Api')] + glob.glob('spec/*.stone')),
+             [os.path.join(repo_path, 'Dropbox.Api')] + glob.glob('spec/*.stone') +
+             (['--'] + generator_args if generator_args else [])),
             env={'PYTHONPATH': 'stone'})
     except subprocess.CalledProcessError as e:
         print(e.output)
 
+    if args.sdk_csproj:
+        _remove_projects_from_solution(os.path.join(repo_path, 'Dropbox.Api.sln'), _PER_TARGET_PROJECTS)
+
 if __name__ == '__main__':
     main()
@@ -47,6 +47,7 @@ def memo_one(fn):
     return wrapper
 
 ConstructorArg = namedtuple('ConstructorArg', ('type', 'name', 'arg', 'doc'))
+UnionMemberNames = namedtuple('UnionMemberNames', ('tag', 'tags', 'visitor', 'accept'))
 
 
 class _CSharpGenerator(CodeGenerator):
@@ -67,6 +68,8 @@ class _CSharpGenerator(CodeGenerator):
         'uint', 'ulong', 'unchecked', 'unsafe', 'ushort', 'using', 'value',
         'var', 'virtual', 'void', 'volatile', 'where', 'while', 'yield',
     })
+    # Timestamps in this format use the fixed format ISO 8601 codecs.
+    _ISO_8601_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
 
     def __init__(self, namespace_name, app_name, *args, **kwargs):
         """
@@ -91,8 +94,51 @@ class _CSharpGenerator(CodeGenerator):
         self._namespace_name = namespace_name
         self._app_name = app_name
 
+        # Unions with more variants than this are emitted as partial classes
+        # split across several files. Zero disables sharding.
+        self._union_shard_size = 0
+
+        # Struct fields, as 'namespace.Struct.field', whose values are kept as
+        # raw json by the decoder and only decoded on first access.
+        self._lazy_fields = set()
+        self._lazy_field_ids = set()
+
+        # Routes, as 'namespace/route', whose responses may be cached by the
+        # client. Routes with a true 'cacheable' attribute are added to these.
+        self._cacheable_routes = set()
+        self._idempotent_routes = set()
+
+        # Single routes mapped to the batch routes that take a list of their
+        # arguments, as 'namespace/route' to 'namespace/route'. Each pair gets
+        # an aggregator helper that sends concurrent single calls as one batch.
+        self._batch_routes = {}
+        self._batch_route_pairs = {}
+        self._default_batch_size = 100
+
+        # Download style routes, as 'namespace/route', that get a helper which
+        # downloads the content to a file in parallel byte ranges, resuming the
+        # missing ranges after a failure.
+        self._ranged_download_routes = set()
+        self._ranged_download_route_ids = set()
+
+        # Upload style routes, as 'namespace/route', that get a helper which
+        # skips the upload when the content hash of the body matches the
+        # metadata of the file already on the server.
+        self._upload_skip_routes = set()
+        self._upload_skip_route_ids = set()
+
+        # Names of list fields in route results that can be streamed to a
+        # per-item callback instead of being collected into a list.
+        self._streamed_list_fields = set(['entries', 'events', 'members'])
+
     def generate(self, api):
         self._generate_route_auth_map(api)
+        self._resolve_lazy_fields(api)
+        self._resolve_batch_routes(api)
+        self._ranged_download_route_ids = self._resolve_content_routes(
+            api, self._ranged_download_routes, 'download', False)
+        self._upload_skip_route_ids = self._resolve_content_routes(
+            api, self._upload_skip_routes, 'upload', True)
 
         for namespace in api.namespaces.itervalues():
             self._compute_related_types(namespace)
@@ -101,6 +147,7 @@ class _CSharpGenerator(CodeGenerator):
         self._generate_client(api, '{0}Client'.format(self._app_name), 'user')
         self._generate_client(api, '{0}TeamClient'.format(self._app_name), 'team')
         self._generate_client(api, '{0}AppClient'.format(self._app_name), 'app')
+        self._generate_route_traits(api)
 
         self._generate(api)
 
@@ -927,6 +974,57 @@ class _CSharpGenerator(CodeGenerator):
                         for ns_name in enumerate_ns():
                             self.emit('this.{0} = new {0}{1}Routes(transport);'.format(ns_name, auth_name))
 
+    def _get_route_traits(self, ns, route):
+        """
+        Returns the names of the RouteTrait flags that apply to a route.
+
+        Args:
+            ns (stone.api.ApiNamespace): The namespace of the route.
+            route (stone.api.ApiRoute): The route in question.
+        """
+        name = '{0}/{1}'.format(ns.name, route.name)
+        traits = []
+        if name in self._cacheable_routes or route.attrs.get('cacheable'):
+            traits.append('Cacheable')
+        if name in self._idempotent_routes or route.attrs.get('idempotent'):
+            traits.append('Idempotent')
+        return traits
+
+    def _generate_route_traits(self, api):
+        """
+        Generates the traits of the routes that have any, these are looked up
+        by the transport using the route path.
+
+        Args:
+            api (stone.api.Api): The API specification.
+        """
+        known = set()
+        traits = []
+        for ns in api.namespaces.itervalues():
+            for route in ns.routes:
+                known.add('{0}/{1}'.format(ns.name, route.name))
+                route_traits = self._get_route_traits(ns, route)
+                if route_traits:
+                    traits.append(('/{0}/{1}'.format(ns.name, route.name), route_traits))
+
+        unknown = (self._cacheable_routes | self._idempotent_routes) - known
+        assert not unknown, 'Unknown routes: {0}'.format(', '.join(sorted(unknown)))
+
+        with self.output_to_relative_path('RouteTraits.cs'):
+            self.auto_generated()
+            with self.namespace('Stone'):
+                self.emit('using col = System.Collections.Generic;')
+                self.emit()
+                with self.class_('RouteTraits', access='internal static partial'):
+                    with self.doc_comment():
+                        self.emit_summary('Adds the traits of the routes defined by the API.')
+                        self.emit_xml('The traits, keyed by route path.', 'param', name='traits')
+                    with self.cs_block(before='static partial void AddGeneratedTraits('
+                                              'col.IDictionary<string, RouteTrait> traits)'):
+                        for path, route_traits in traits:
+                            self.emit('traits["{0}"] = {1};'.format(
+                                path, ' | '.join('RouteTrait.{0}'.format(t) for t in route_traits)))
+
     def _compute_related_types(self, ns): 
         """
         This creates a map of supertype-subtype relationships.
@@ -964,6 +1062,193 @@ class _CSharpGenerator(CodeGenerator):
 
         self._route_auth_map = d
 
+    def _resolve_lazy_fields(self, api):
+        """
+        Resolves the configured lazy fields to the field definitions.
+
+        Only struct and union fields without a default can be lazy.
+
+        Args:
+            api (stone.api.Api): The API specification.
+        """
+        resolved = set()
+        for ns in api.namespaces.itervalues():
+            for data_type in ns.data_types:
+                if not is_struct_type(data_type):
+                    continue
+                for field in data_type.fields:
+                    key = '{0}.{1}.{2}'.format(ns.name, data_type.name, field.name)
+                    if key not in self._lazy_fields:
+                        continue
+                    field_type, _, is_list = self._parse_data_type(field.data_type)
+                    assert is_user_defined_type(field_type) and not is_list, (
+                        'Lazy field {0} must be a struct or union'.format(key))
+                    assert not field.has_default, (
+                        'Lazy field {0} must not have a default'.format(key))
+                    self._lazy_field_ids.add(id(field))
+                    resolved.add(key)
+
+        unknown = self._lazy_fields - resolved
+        assert not unknown, 'Unknown lazy fields: {0}'.format(', '.join(sorted(unknown)))
+
+    def _resolve_batch_routes(self, api):
+        """
+        Resolves the configured batch routes to the route definitions.
+
+        The single route must take a struct with one field, and the batch
+        route, in the same namespace and with the same auth type, must take a
+        struct with one list field of the same type and return a list of the
+        single route's result, in request order.
+
+        Args:
+            api (stone.api.Api): The API specification.
+        """
+        routes = {}
+        for ns in api.namespaces.itervalues():
+            for route in ns.routes:
+                routes['{0}/{1}'.format(ns.name, route.name)] = (ns, route)
+
+        for single_name, batch_name in sorted(self._batch_routes.iteritems()):
+            assert single_name in routes, 'Unknown batch route: {0}'.format(single_name)
+            assert batch_name in routes, 'Unknown batch route: {0}'.format(batch_name)
+            single_ns, single = routes[single_name]
+            batch_ns, batch = routes[batch_name]
+            assert single_ns is batch_ns and self._get_auth_type(single) == self._get_auth_type(batch), (
+                'Batch route {0} must be in the namespace and auth type of {1}'.format(
+                    batch_name, single_name))
+
+            assert (is_struct_type(single.arg_data_type) and
+                    len(single.arg_data_type.all_fields) == 1), (
+                'Route {0} must take a struct with one field'.format(single_name))
+            assert (is_struct_type(batch.arg_data_type) and
+                    len(batch.arg_data_type.all_fields) == 1), (
+                'Route {0} must take a struct with one field'.format(batch_name))
+
+            item_field = single.arg_data_type.all_fields[0]
+            list_field = batch.arg_data_type.all_fields[0]
+            item_type = self._typename(item_field.data_type, is_property=True)
+            list_type, is_nullable, is_list = self._parse_data_type(list_field.data_type)
+            assert is_list and not is_nullable and self._typename(list_type, is_property=True) == item_type, (
+                'Route {0} must take a list of {1}'.format(batch_name, item_type))
+
+            result_type, is_nullable, is_list = self._parse_data_type(batch.result_data_type)
+            assert is_list and not is_nullable and result_type is single.result_data_type, (
+                'Route {0} must return a list of the result of {1}'.format(batch_name, single_name))
+
+            self._batch_route_pairs[id(single)] = batch
+
+    def _resolve_content_routes(self, api, names, style, require_hash):
+        """
+        Resolves routes configured for one of the content helpers to the route
+        definitions, and returns the ids of the routes.
+
+        The route must have the given style and return a struct with a UInt64
+        'size' field and, if required, a 'content_hash' field. Where the hash is
+        optional it is verified if the struct has it.
+
+        Args:
+            api (stone.api.Api): The API specification.
+            names (set of str): The routes, as 'namespace/route'.
+            style (str): The style the routes must have.
+            require_hash (bool): Whether the result must have a content hash.
+        """
+        ids = set()
+        resolved = set()
+        for ns in api.namespaces.itervalues():
+            for route in ns.routes:
+                name = '{0}/{1}'.format(ns.name, route.name)
+                if name not in names:
+                    continue
+
+                assert route.attrs.get('style', 'rpc') == style, (
+                    'Route {0} must be {1} style'.format(name, style))
+                size_field, hash_field = self._get_content_fields(route)
+                assert size_field is not None, (
+                    'Route {0} must return a struct with a size field'.format(name))
+                assert hash_field is not None or not require_hash, (
+                    'Route {0} must return a struct with a content_hash field'.format(name))
+                ids.add(id(route))
+                resolved.add(name)
+
+        unknown = names - resolved
+        assert not unknown, 'Unknown {0} routes: {1}'.format(style, ', '.join(sorted(unknown)))
+        return ids
+
+    @staticmethod
+    def _get_content_fields(route):
+        """
+        Returns the size and content hash fields of the result of a download
+        or upload route, either may be None.
+
+        Args:
+            route (stone.api.ApiRoute): The route in question.
+        """
+        result_type = route.result_data_type
+        if not is_struct_type(result_type):
+            return None, None
+
+        fields = dict((f.name, f) for f in result_type.all_fields)
+        size = fields.get('size')
+        if size is not None and not isinstance(size.data_type, UInt64):
+            size = None
+        content_hash = fields.get('content_hash')
+        return size, content_hash
+
+    @staticmethod
+    def _get_revision_field(route):
+        """
+        Returns the field of the result of a download route which changes
+        with the content, the rev or else the server_modified field, or None
+        if there is neither.
+
+        Args:
+            route (stone.api.ApiRoute): The route in question.
+        """
+        result_type = route.result_data_type
+        if not is_struct_type(result_type):
+            return None
+
+        fields = dict((f.name, f) for f in result_type.all_fields)
+        rev = fields.get('rev')
+        if rev is not None and is_string_type(rev.data_type):
+            return rev
+        server_modified = fields.get('server_modified')
+        if server_modified is not None and is_timestamp_type(server_modified.data_type):
+            return server_modified
+        return None
+
+    def _is_lazy_field(self, field):
+        """
+        Returns true if the field is decoded lazily.
+
+        Args:
+            field (stone.data_type.Field): The field in question.
+        """
+        return id(field) in self._lazy_field_ids
+
+    def _get_streamed_list_field(self, data_type):
+        """
+        Returns the list field of a struct whose items can be streamed to a
+        callback while decoding, or None if there is no such field.
+
+        Only structs decoded through DecodeFields, that is structs without
+        enumerated subtypes, are supported.
+
+        Args:
+            data_type (stone.data_type.DataType): The type in question.
+        """
+        if not is_struct_type(data_type) or data_type.has_enumerated_subtypes():
+            return None
+
+        for field in data_type.all_fields:
+            if field.name not in self._streamed_list_fields or self._is_lazy_field(field):
+                continue
+            _, _, is_list = self._parse_data_type(field.data_type)
+            if is_list:
+                return field
+
+        return None
+
     def _generate_namespace(self, ns):
         """
         Perform code generation for the namespace.
@@ -982,20 +1267,18 @@ class _CSharpGenerator(CodeGenerator):
         if ns.routes:
             self._generate_routes(ns)
 
-    def _generate_data_type(self, ns_name, data_type):
+    @contextmanager
+    def _data_type_file(self, ns_name, file_name):
         """
-        Generate the classes for a data type.
-
-        This generates the framework of the code file and calls an appropriate 
-        method for structs and unions to generate the type itself.
+        Context manager that emits the framework of a data type code file. All
+        code emitted within the context is within the namespace, after the
+        using statements.
 
         Args:
             ns_name (Union[str, unicode]): The name of the namespace.
-            data_type (stone.data_type.DataType): The type to generate.
+            file_name (Union[str, unicode]): The file name without extension.
         """
-        assert is_user_defined_type(data_type)
-        class_name = self._public_name(data_type.name)
-        with self.output_to_relative_path(os.path.join(ns_name, class_name + ".cs")):
+        with self.output_to_relative_path(os.path.join(ns_name, file_name + ".cs")):
             # this stops stylecop from analyzing the file
             self.auto_generated()
 
@@ -1009,12 +1292,36 @@ class _CSharpGenerator(CodeGenerator):
                 self.emit('using enc = {0}.Stone;'.format(self._namespace_name))
                 self.emit()
 
-                if is_struct_type(data_type):
-                    self._generate_struct(data_type)
-                elif is_union_type(data_type):
-                    self._generate_union(data_type)
-                else:
-                    assert False, 'Unknown composite type: %r' % data_type
+                yield
+
+    def _generate_data_type(self, ns_name, data_type):
+        """
+        Generate the classes for a data type.
+
+        This generates the framework of the code file and calls an appropriate 
+        method for structs and unions to generate the type itself. Unions that
+        are large enough to be sharded have their field types emitted into
+        additional files.
+
+        Args:
+            ns_name (Union[str, unicode]): The name of the namespace.
+            data_type (stone.data_type.DataType): The type to generate.
+        """
+        assert is_user_defined_type(data_type)
+        class_name = self._public_name(data_type.name)
+        shards = self._get_union_shards(data_type) if is_union_type(data_type) else []
+
+        with self._data_type_file(ns_name, class_name):
+            if is_struct_type(data_type):
+                self._generate_struct(data_type)
+            elif is_union_type(data_type):
+                self._generate_union(data_type, is_partial=bool(shards))
+            else:
+                assert False, 'Unknown composite type: %r' % data_type
+
+        for index, fields in enumerate(shards):
+            with self._data_type_file(ns_name, '{0}.Part{1}'.format(class_name, index + 1)):
+                self._generate_union_shard(data_type, fields)
 
     def _emit_explicit_interface_suppress(self):
         """
@@ -1043,8 +1350,8 @@ class _CSharpGenerator(CodeGenerator):
 
         return data_type, is_nullable, is_list
 
-    @staticmethod
-    def _get_primitive_prefix(data_type):
+    @classmethod
+    def _get_primitive_prefix(cls, data_type):
         """
         Get encoder/decoder name prefix for primitive types.
 
@@ -1070,6 +1377,8 @@ class _CSharpGenerator(CodeGenerator):
         elif isinstance(data_type, Float64):
             return 'Double'
         elif is_timestamp_type(data_type):
+            if data_type.format == cls._ISO_8601_FORMAT:
+                return 'Iso8601DateTime'
             return 'DateTime'
         elif is_void_type(data_type):
             return 'Empty'
@@ -1102,6 +1411,43 @@ class _CSharpGenerator(CodeGenerator):
 
         return fields
 
+    def _get_union_member_names(self, union):
+        """
+        Get the names of the tag and visitor members generated for a union.
+
+        A name that collides with one of the union field types is prefixed
+        with the union name.
+
+        Args:
+            union (stone.data_type.Union): The union in question.
+        """
+        class_name = self._public_name(union.name)
+        field_names = set(self._public_name(f.name) for f in self._get_union_fields(union))
+
+        def member_name(name):
+            return class_name + name if name in field_names else name
+
+        return UnionMemberNames(member_name('Tag'), member_name('Tags'),
+                                member_name('IVisitor'), member_name('Accept'))
+
+    def _get_union_shards(self, union):
+        """
+        Get the union fields split into shards, one list per shard file.
+
+        Returns an empty list if the union is small enough to be emitted in a
+        single file, or if sharding is disabled.
+
+        Args:
+            union (stone.data_type.Union): The union in question.
+        """
+        fields = self._get_union_fields(union)
+        size = self._union_shard_size
+
+        if not size or len(fields) <= size:
+            return []
+
+        return [fields[i:i + size] for i in range(0, len(fields), size)]
+
     @staticmethod
     def _get_auth_type(route):
         auth_type = route.attrs.get('auth', 'user')
@@ -1157,13 +1503,15 @@ class _CSharpGenerator(CodeGenerator):
                 self._get_primitive_prefix(data_type),
                 self._get_primitive_instance_name(is_nullable))
 
-    def _emit_decoder(self, field, field_public_name=None):
+    def _emit_decoder(self, field, field_public_name=None, target=None):
         """
         Emits a decoder fragment for a struct field
 
         Args:
             field (stone.data_type.Field): The field to be decoded.
             field_public_name (Union[str, unicode]): Optional field public name.
+            target (Union[str, unicode]): Optional variable to assign the decoded
+                value to, defaults to the field property of `value`.
         """
         field_public_name = field_public_name or self._public_name(field.name)
         data_type, is_nullable, is_list = self._parse_data_type(field.data_type)
@@ -1173,7 +1521,7 @@ class _CSharpGenerator(CodeGenerator):
         else:
             value = '{0}.Decode(reader)'.format(self._get_decoder(data_type))
 
-        self.emit('value.{0} = {1};'.format(field_public_name, value))
+        self.emit('{0} = {1};'.format(target or 'value.{0}'.format(field_public_name), value))
     
     def _emit_encoder(self, field, field_public_name=None, inline_composite_type=False):
         """
@@ -1270,25 +1618,36 @@ class _CSharpGenerator(CodeGenerator):
 
         return constructor_args
 
-    def _generate_encoder_decoder_instance(self, class_name):
+    def _generate_encoder_decoder_instance(self, class_name, encoder=None, decoder=None):
         """
         Emits the encoder and decoder instance.
 
+        These are static readonly fields, so the JIT can treat them as
+        constants. The class has no static constructor, so the runtime
+        creates them when a codec is first used rather than when the type is
+        first touched.
+
         Args:
             class_name (Union[str, unicode]): The C# class name of the struct.
+            encoder (Union[str, unicode]): Optional expression that creates the
+                encoder, defaults to the private encoder class.
+            decoder (Union[str, unicode]): Optional expression that creates the
+                decoder, defaults to the private decoder class.
         """
+        encoder = encoder or 'new {0}Encoder()'.format(class_name)
+        decoder = decoder or 'new {0}Decoder()'.format(class_name)
 
         self.emit('#pragma warning disable 108')
         self.emit()
 
         with self.doc_comment():
             self.emit_summary('The encoder instance.')
-        self.emit('internal static enc.StructEncoder<{0}> Encoder = new {0}Encoder();'.format(class_name))
+        self.emit('internal static readonly enc.StructEncoder<{0}> Encoder = {1};'.format(class_name, encoder))
         self.emit()
 
         with self.doc_comment():
             self.emit_summary('The decoder instance.')
-        self.emit('internal static enc.StructDecoder<{0}> Decoder = new {0}Decoder();'.format(class_name))
+        self.emit('internal static readonly enc.StructDecoder<{0}> Decoder = {1};'.format(class_name, decoder))
         self.emit()
 
     def _generate_struct_init_ctor(self, struct, class_name, parent_type, parent_type_fields):
@@ -1392,6 +1751,76 @@ class _CSharpGenerator(CodeGenerator):
                         self.emit('this.{0} = {1};'.format(
                             self._public_name(field.name), self._process_literal(field.default)))
 
+    def _generate_struct_decoding_ctor(self, struct, class_name, parent_type, parent_type_fields):
+        """
+        Generates the constructor used by the decoder.
+
+        This takes already decoded values for all fields, including fields
+        in parent types, and assigns them without validation or default
+        handling; the decoder applies defaults for fields that were absent.
+        The trailing marker argument distinguishes it from the initializing
+        constructor.
+
+        Args:
+            struct (stone.data_type.Struct): The struct to generate a
+                constructor for.
+            class_name (Union[str, unicode]): The C# class name for the struct.
+            parent_type (stone.data_type.Struct): The parent type of this
+                struct, if any.
+            parent_type_fields (set): A set containing the names of fields
+                that are implemented by this struct's parent type hierarchy.
+        """
+        assert len(struct.all_fields), ('Only generate a decoding ctor when '
+                                        'the struct {0} has fields'.format(struct.name))
+
+        self.emit()
+        with self.doc_comment():
+            self.emit_ctor_summary(class_name)
+            for field in struct.all_fields:
+                arg_name = self._arg_name(field.name)
+                doc_name = arg_name[1:] if arg_name.startswith('@') else arg_name
+                self.emit_xml('The decoded {0}.'.format(self._name_words(field.name)),
+                              'param', name=doc_name)
+            self.emit_xml('Selects this constructor.', 'param', name='unvalidated')
+            self.emit_xml('This is used by the decoder, the field values are not '
+                          'validated.', 'remarks')
+
+        args = ['{0} {1}'.format(self._decoded_typename(field), self._arg_name(field.name))
+                for field in struct.all_fields]
+        args.append('enc.Unvalidated unvalidated')
+        self.generate_multiline_list(
+            args,
+            before='internal {0}'.format(class_name),
+            skip_last_sep=True
+        )
+        if parent_type and parent_type.all_fields:
+            super_args = [self._arg_name(field.name) for field in parent_type.all_fields]
+            super_args.append('unvalidated')
+            with self.indent():
+                self.emit(': base({0})'.format(', '.join(super_args)))
+
+        with self.cs_block():
+            for field in struct.all_fields:
+                if field.name in parent_type_fields:
+                    continue
+                if self._is_lazy_field(field):
+                    self.emit('this.lazy{0} = {1};'.format(self._public_name(field.name), self._arg_name(field.name)))
+                else:
+                    self.emit('this.{0} = {1};'.format(self._public_name(field.name), self._arg_name(field.name)))
+
+    def _decoded_typename(self, field):
+        """
+        Returns the C# type a field is decoded into, this is the lazy value
+        holder for lazy fields and the property type otherwise.
+
+        Args:
+            field (stone.data_type.Field): The field in question.
+        """
+        fieldtype = self._typename(field.data_type, is_property=True)
+        if self._is_lazy_field(field):
+            return 'enc.LazyValue<{0}>'.format(fieldtype)
+        return fieldtype
+
     def _generate_struct_strunion_is_as(self, struct):
         """
         Generates the IsFoo AsFoo properties for the subtypes of this struct.
@@ -1442,9 +1871,37 @@ class _CSharpGenerator(CodeGenerator):
                 self.emit_summary(doc)
 
             fieldtype = self._typename(field.data_type, is_property=True)
-            self.emit('public {0} {1} {{ get; {2} set; }}'.format(fieldtype,
-                                                                  self._public_name(field.name),
-                                                                  'protected'))
+            if self._is_lazy_field(field):
+                self._generate_struct_lazy_property(field, fieldtype)
+            else:
+                self.emit('public {0} {1} {{ get; {2} set; }}'.format(fieldtype,
+                                                                      self._public_name(field.name),
+                                                                      'protected'))
+
+    def _generate_struct_lazy_property(self, field, fieldtype):
+        """
+        Generates the property for a lazy struct field.
+
+        The value is held by a lazy value, which the decoder populates with
+        the raw json of the field; it is decoded the first time the property
+        is read.
+
+        Args:
+            field (stone.data_type.Field): The field in question.
+            fieldtype (Union[str, unicode]): The C# type of the property.
+        """
+        public_name = self._public_name(field.name)
+        with self.cs_block(before='public {0} {1}'.format(fieldtype, public_name)):
+            with self.cs_block(before='get'):
+                self.emit('return this.lazy{0} == null ? null : this.lazy{0}.Value;'.format(public_name))
+            self.emit()
+            with self.cs_block(before='protected set'):
+                self.emit('this.lazy{0} = new enc.LazyValue<{1}>(value);'.format(public_name, fieldtype))
+
+        self.emit()
+        with self.doc_comment():
+            self.emit_summary('The lazily decoded value of <see cref="{0}" />.'.format(public_name))
+        self.emit('private enc.LazyValue<{0}> lazy{1};'.format(fieldtype, public_name))
 
     def _get_struct_tag(self, struct):
         if struct.parent_type and struct.parent_type.has_enumerated_subtypes():
@@ -1501,10 +1958,138 @@ class _CSharpGenerator(CodeGenerator):
                             with self.case(needs_break=False):
                                 self.emit('throw new sys.InvalidOperationException();')
 
-            with self.decoder_set_field_block(class_name=class_name):
-                for field in struct.all_fields:
-                    with self.case('"{0}"'.format(field.name), needs_break=True):
-                        self._emit_decoder(field)   
+                with self.decoder_set_field_block(class_name=class_name):
+                    for field in struct.all_fields:
+                        with self.case('"{0}"'.format(field.name), needs_break=True):
+                            self._emit_decoder(field)
+            elif struct.all_fields:
+                self._generate_struct_decode_fields(struct, class_name)
+
+    def _generate_struct_decode_fields(self, struct, class_name, streamed_field=None):
+        """
+        Generates the DecodeFields override for a struct without enumerated
+        subtypes.
+
+        Fields are decoded into locals, defaults are applied only to fields
+        that were absent, and the instance is constructed once through the
+        decoding constructor.
+
+        Args:
+            struct (stone.data_type.Struct): The struct in question.
+            class_name (Union[str, unicode]): The C# class name of the struct.
+            streamed_field (stone.data_type.Field): Optional list field whose
+                items are passed to the decoder's onItem callback instead of
+                being collected.
+        """
+        with self.decoder_decode_fields_block(class_name=class_name):
+            for field in struct.all_fields:
+                field_type = self._decoded_typename(field)
+                arg_name = self._arg_name(field.name)
+                if field.has_default and not is_user_defined_type(field.data_type):
+                    initial = self._process_literal(field.default)
+                elif (is_nullable_type(field.data_type) or self._could_be_null(field.data_type) or
+                      is_bytes_type(field.data_type)):
+                    initial = 'null'
+                else:
+                    initial = 'default({0})'.format(field_type)
+                self.emit('{0} {1} = {2};'.format(field_type, arg_name, initial))
+
+            self.emit()
+            self.emit('string fieldName;')
+            with self.cs_block(before='while (TryReadPropertyName(reader, out fieldName))'):
+                with self.switch('fieldName'):
+                    for field in struct.all_fields:
+                        with self.case('"{0}"'.format(field.name), needs_break=True):
+                            if field is streamed_field:
+                                data_type, _, _ = self._parse_data_type(field.data_type)
+                                self.emit('{0} = new col.List<{1}>();'.format(
+                                    self._arg_name(field.name), self._typename(data_type, is_property=True)))
+                                self.emit('ReadListItems(reader, {0}, this.onItem);'.format(
+                                    self._get_decoder(data_type)))
+                            elif self._is_lazy_field(field):
+                                data_type, _, _ = self._parse_data_type(field.data_type)
+                                self.emit('{0} = new {1}(reader.ReadRaw(), {2});'.format(
+                                    self._arg_name(field.name), self._decoded_typename(field),
+                                    self._get_decoder(data_type)))
+                            else:
+                                self._emit_decoder(field, target=self._arg_name(field.name))
+                    with self.case(needs_break=True):
+                        self.emit('reader.Skip();')
+
+            defaults = [f for f in struct.all_fields if f.has_default and is_user_defined_type(f.data_type)]
+            if defaults:
+                self.emit()
+                for field in defaults:
+                    self._process_composite_default(field)
+
+            self.emit()
+            args = [self._arg_name(field.name) for field in struct.all_fields]
+            args.append('new enc.Unvalidated()')
+            self.generate_multiline_list(args, before='return new {0}'.format(class_name),
+                                         after=';', skip_last_sep=True)
+
+    def _generate_struct_streaming_decoder_factory(self, class_name, field):
+        """
+        Emits the method that creates a decoder which streams the items of a
+        list field to a callback.
+
+        Args:
+            class_name (Union[str, unicode]): The C# class name of the struct.
+            field (stone.data_type.Field): The streamed list field.
+        """
+        data_type, _, _ = self._parse_data_type(field.data_type)
+        item_type = self._typename(data_type, is_property=True)
+        field_public_name = self._public_name(field.name)
+
+        with self.doc_comment():
+            self.emit_summary('Creates a decoder that passes each item of <see cref="{0}"/> to '
+                              'a callback as it is decoded.'.format(field_public_name))
+            self.emit_xml('The callback that receives each item.', 'param', name='onItem')
+            self.emit_xml('The decoder, the decoded instance has an empty <see cref="{0}"/> '
+                          'list.'.format(field_public_name), 'returns')
+        with self.cs_block(before='internal static enc.StructDecoder<{0}> CreateStreamingDecoder(sys.Action<{1}> onItem)'
+                           .format(class_name, item_type)):
+            self.emit('return new {0}StreamingDecoder(onItem);'.format(class_name))
+        self.emit()
+
+    def _generate_struct_streaming_decoder(self, struct, class_name, field):
+        """
+        Generates the private decoder that streams the items of a list field
+        to a callback.
+
+        Args:
+            struct (stone.data_type.Struct): The struct in question.
+            class_name (Union[str, unicode]): The C# class name of the struct.
+            field (stone.data_type.Field): The streamed list field.
+        """
+        data_type, _, _ = self._parse_data_type(field.data_type)
+        item_type = self._typename(data_type, is_property=True)
+        decoder_name = '{0}StreamingDecoder'.format(class_name)
+
+        self.emit()
+        with self.region('Streaming decoder class'):
+            with self.doc_comment():
+                self.emit_summary('Decoder for  <see cref="{0}" /> that streams the items of <see cref="{0}.{1}" />.'
+                                  .format(class_name, self._public_name(field.name)))
+            with self.class_(decoder_name, inherits=['enc.StructDecoder<{0}>'.format(class_name)],
+                             access='private'):
+                with self.doc_comment():
+                    self.emit_summary('The callback that receives each item.')
+                self.emit('private readonly sys.Action<{0}> onItem;'.format(item_type))
+                self.emit()
+                with self.doc_comment():
+                    self.emit_ctor_summary(decoder_name)
+                    self.emit_xml('The callback that receives each item.', 'param', name='onItem')
+                with self.cs_block(before='public {0}(sys.Action<{1}> onItem)'.format(decoder_name, item_type)):
+                    self.emit('this.onItem = onItem;')
+                self.emit()
+                with self.doc_comment():
+                    self.emit_summary('Create a new instance of type <see cref="{0}" />.'.format(class_name))
+                    self.emit_xml('The struct instance.', 'returns')
+                with self.cs_block(before='protected override {0} Create()'.format(class_name)):
+                    self.emit('return new {0}();'.format(class_name))
+                self.emit()
+                self._generate_struct_decode_fields(struct, class_name, streamed_field=field)
 
     def _generate_struct(self, struct):
         """
@@ -1543,13 +2128,19 @@ class _CSharpGenerator(CodeGenerator):
             # Generate encoder and decoder
             self._generate_encoder_decoder_instance(class_name)
 
+            streamed_field = self._get_streamed_list_field(struct)
+            if streamed_field:
+                self._generate_struct_streaming_decoder_factory(class_name, streamed_field)
+
             # Generate the initializing constructor.
             self._generate_struct_init_ctor(struct, class_name, parent_type, parent_type_fields)
 
             # Generate a default constructor
             if len(struct.all_fields):
-                # the default constructor is only needed if the struct has fields
+                # the default and decoding constructors are only needed if the
+                # struct has fields
                 self._generate_struct_default_ctor(struct, class_name, parent_type_fields)
+                self._generate_struct_decoding_ctor(struct, class_name, parent_type, parent_type_fields)
 
             if struct.has_enumerated_subtypes():
                 # Generate properties for checking/getting the actual type
@@ -1563,6 +2154,9 @@ class _CSharpGenerator(CodeGenerator):
 
             # Emit private decoder class.
             self._generate_struct_decoder(struct)
+
+            if streamed_field:
+                self._generate_struct_streaming_decoder(struct, class_name, streamed_field)
     
     def _generate_union_is_as_properties(self, union):
         """
@@ -1589,6 +2183,91 @@ class _CSharpGenerator(CodeGenerator):
                 with self.cs_block(before='get'):
                     self.emit('return this as {0};'.format(field_type))
     
+    def _generate_union_tag_and_visitor(self, union):
+        """
+        Generates the tag enum, the Tag property, the visitor interface and
+        the Accept method for a union.
+
+        These allow code to switch on, or dispatch over, the union fields
+        without a type test per field. The field types override Tag and
+        Accept.
+
+        Args:
+            union (stone.data_type.Union): The union in question.
+        """
+        names = self._get_union_member_names(union)
+        class_name = self._public_name(union.name)
+        fields = self._get_union_fields(union)
+
+        self.emit()
+        with self.doc_comment():
+            self.emit_summary('The tags of the fields of <see cref="{0}" />.'.format(class_name))
+        with self.cs_block(before='public enum {0}'.format(names.tags)):
+            for i, field in enumerate(fields):
+                field_type = self._public_name(field.name)
+                with self.doc_comment():
+                    self.emit_summary('The tag of <see cref="{0}.{1}" />.'.format(class_name, field_type))
+                self.emit('{0},'.format(field_type) if i < len(fields) - 1 else field_type)
+                if i < len(fields) - 1:
+                    self.emit()
+
+        self.emit()
+        with self.doc_comment():
+            self.emit_summary('Gets the tag of this instance.')
+        with self.cs_block(before='public virtual {0} {1}'.format(names.tags, names.tag)):
+            with self.cs_block(before='get'):
+                self.emit('throw new sys.InvalidOperationException();')
+
+        self.emit()
+        with self.doc_comment():
+            self.emit_summary('A visitor for the fields of <see cref="{0}" />.'.format(class_name))
+            self.emit_xml('The type of the result of a visit.', 'typeparam', name='TResult')
+        with self.cs_block(before='public interface {0}<TResult>'.format(names.visitor)):
+            for i, field in enumerate(fields):
+                field_type = self._public_name(field.name)
+                if i:
+                    self.emit()
+                with self.doc_comment():
+                    self.emit_summary('Visits a <see cref="{0}" /> instance.'.format(field_type))
+                    self.emit_xml('The instance.', 'param', name='value')
+                    self.emit_xml('The result of the visit.', 'returns')
+                self.emit('TResult Visit{0}({0} value);'.format(field_type))
+
+        self.emit()
+        with self.doc_comment():
+            self.emit_summary('Calls the method of the visitor that matches the type of this instance.')
+            self.emit_xml('The type of the result of the visit.', 'typeparam', name='TResult')
+            self.emit_xml('The visitor.', 'param', name='visitor')
+            self.emit_xml('The result of the visit.', 'returns')
+        with self.cs_block(before='public virtual TResult {0}<TResult>({1}<TResult> visitor)'.format(
+                names.accept, names.visitor)):
+            self.emit('throw new sys.InvalidOperationException();')
+
+    def _generate_union_field_tag_and_visitor(self, field_type, names):
+        """
+        Generates the Tag and Accept overrides for a union field type.
+
+        Args:
+            field_type (Union[str, unicode]): The C# type name of the union field.
+            names (UnionMemberNames): The tag and visitor member names of the union.
+        """
+        self.emit()
+        with self.doc_comment():
+            self.emit_summary('Gets the tag of this instance.')
+        with self.cs_block(before='public override {0} {1}'.format(names.tags, names.tag)):
+            with self.cs_block(before='get'):
+                self.emit('return {0}.{1};'.format(names.tags, field_type))
+
+        self.emit()
+        with self.doc_comment():
+            self.emit_summary('Calls the <c>Visit{0}</c> method of the visitor.'.format(field_type))
+            self.emit_xml('The type of the result of the visit.', 'typeparam', name='TResult')
+            self.emit_xml('The visitor.', 'param', name='visitor')
+            self.emit_xml('The result of the visit.', 'returns')
+        with self.cs_block(before='public override TResult {0}<TResult>({1}<TResult> visitor)'.format(
+                names.accept, names.visitor)):
+            self.emit('return visitor.Visit{0}(this);'.format(field_type))
+
     def _generate_union_encoder(self, union, class_name):
         """
         Generates private encoder class for a union.
@@ -1628,42 +2307,59 @@ class _CSharpGenerator(CodeGenerator):
         """
         Generates the inner type for a union field that is void.
 
-        This has a private constructor and a singleton static instance.
+        This has a private constructor and a singleton static instance, and
+        uses the shared void variant encoder and decoder.
 
         Args:
             field (stone.data_type.UnionField): The union field in question.
             field_type (Union[str, unicode]): The C# type name of the union field.
         """
-        # constructor
-        with self.doc_comment():
-            self.emit_ctor_summary(field_type)
-        with self.cs_block(before='private {0}()'.format(field_type)):
-            pass
-
-        # singleton instance
-        self.emit()
+        # singleton instance, this must be initialized before the decoder.
         with self.doc_comment():
             self.emit_summary('A singleton instance of {0}'.format(field_type))
         self.emit('public static readonly {0} Instance = new {0}();'.format(field_type))
+        self.emit()
 
-        # Private encoder.
-        with self.encoder_block(class_name=field_type):
-            pass
-        
-        # Private decoder.
-        with self.decoder_block(class_name=field_type, inherit='StructDecoder', is_void=True):
+        self._generate_encoder_decoder_instance(
+            field_type,
+            encoder='enc.VoidVariantCodec<{0}>.Encoder'.format(field_type),
+            decoder='enc.VoidVariantCodec<{0}>.CreateDecoder(Instance)'.format(field_type))
+
+        # constructor
+        with self.doc_comment():
+            self.emit_ctor_summary(field_type)
+        with self.cs_block(before='private {0}()'.format(field_type)):
             pass
 
     def _generate_union_field_value_type(self, field, field_type):
         """
         Generates the inner type for a union field that has a value.
 
-        This has a public constructor and a Value property.
+        This has a public constructor and a Value property. Fields that wrap
+        a struct use the shared struct variant encoder and decoder, all other
+        fields get private encoder and decoder classes.
 
         Args:
             field (stone.data_type.UnionField): The union field in question.
             field_type (Union[str, unicode]): The C# type name of the union field.
         """
+        data_type = field.data_type
+        if is_nullable_type(data_type):
+            data_type = data_type.data_type
+
+        is_struct_variant = is_struct_type(data_type) and not data_type.has_enumerated_subtypes()
+
+        if is_struct_variant:
+            wrapped_type = self._typename(data_type, include_namespace=True)
+            self._generate_encoder_decoder_instance(
+                field_type,
+                encoder='enc.StructVariantCodec<{0}, {1}>.CreateEncoder("{2}", v => v.Value, {3})'.format(
+                    field_type, wrapped_type, field.name, self._get_encoder(data_type)),
+                decoder='enc.StructVariantCodec<{0}, {1}>.CreateDecoder(v => new {0}(v), {2})'.format(
+                    field_type, wrapped_type, self._get_decoder(data_type)))
+        else:
+            self._generate_encoder_decoder_instance(field_type)
+
         with self.doc_comment():
             self.emit_ctor_summary(field_type)
             self.emit('<param name="value">The value</param>')
@@ -1677,10 +2373,12 @@ class _CSharpGenerator(CodeGenerator):
             else:
                 self.emit('this.Value = value;')
 
-        with self.doc_comment():
-            self.emit_ctor_summary(field_type)
-        with self.cs_block(before='private {0}()'.format(field_type)):
-            pass
+        if not is_struct_variant:
+            # the private decoder needs a default constructor.
+            with self.doc_comment():
+                self.emit_ctor_summary(field_type)
+            with self.cs_block(before='private {0}()'.format(field_type)):
+                pass
 
         self.emit()
         with self.doc_comment():
@@ -1688,32 +2386,28 @@ class _CSharpGenerator(CodeGenerator):
         value_type = self._typename(field.data_type, is_property=True)
         self.emit('public {0} Value {{ get; private set; }}'.format(value_type))
 
+        if is_struct_variant:
+            return
+
         # Private encoder.
         with self.encoder_block(class_name=field_type):
             self._emit_encoder(field, 'Value', True)
-        
-        data_type = field.data_type
-        if is_nullable_type(data_type):
-            data_type = data_type.data_type
 
         # Private decoder.
         with self.decoder_block(class_name=field_type, inherit='StructDecoder', is_void=False):
-            if is_struct_type(data_type) and not data_type.has_enumerated_subtypes():
-                with self.decoder_decode_fields_block(class_name=field_type):
-                    self.emit('return new {0}({1}.DecodeFields(reader));'.format(
-                        field_type, self._get_decoder(data_type)))
-            else:
-                with self.decoder_set_field_block(class_name=field_type):
-                    with self.case('"{0}"'.format(field.name), needs_break=True):
-                        self._emit_decoder(field, 'Value')
+            with self.decoder_set_field_block(class_name=field_type):
+                with self.case('"{0}"'.format(field.name), needs_break=True):
+                    self._emit_decoder(field, 'Value')
 
-    def _generate_union_field_type(self, field, class_name):
+    def _generate_union_field_type(self, field, class_name, names):
         """
         Generates the inner class for a union field.
 
         Args:
             field (stone.data_type.UnionField): The union field in question.
             class_name (Union[str, unicode]): The C# type name of the parent union.
+            names (UnionMemberNames): The tag and visitor member names of the
+                parent union.
         """
         field_type = self._public_name(field.name)
         self.emit()
@@ -1722,14 +2416,14 @@ class _CSharpGenerator(CodeGenerator):
             self.emit_summary(field.doc or 'The {0} object'.format(self._name_words(field.name)))
 
         with self.class_(field_type, inherits=(class_name,), access='public sealed'):
-            self._generate_encoder_decoder_instance(field_type)
-
             if is_void_type(field.data_type):
                 self._generate_union_field_void_type(field, field_type)
             else:
                 self._generate_union_field_value_type(field, field_type)
 
-    def _generate_union(self, union):
+            self._generate_union_field_tag_and_visitor(field_type, names)
+
+    def _generate_union(self, union, is_partial=False):
         """
         Generates the class for a union.
 
@@ -1739,18 +2433,26 @@ class _CSharpGenerator(CodeGenerator):
             - Generates the class level documentation for the union class
             - Generates the class and its default constructor
             - Generates type helper ('Is<field>' and 'As<field>') properties
+            - Generates the tag enum, Tag property, visitor interface and
+                Accept method
             - Generates encodable methos
-            - Generates an inner type for each union field.
+            - Generates an inner type for each union field, unless the union
+                is partial, in which case they are emitted by
+                _generate_union_shard.
 
         Args:
             union (stone.data_type.Union): The union in question.
+            is_partial (bool): If True, the class is declared partial and the
+                inner field types are left to the shard files.
         """
+        names = self._get_union_member_names(union)
         union_field_names = [self._public_name(f.name) for f in self._get_union_fields(union)]
-        with self._local_names(union_field_names):
+        with self._local_names(union_field_names + [names.tags, names.visitor]):
             with self.doc_comment():
                 self.emit_summary(union.doc or 'The {0} object'.format(self._name_words(union.name)))
             class_name = self._public_name(union.name)
-            with self.class_(class_name, access='public'):
+            access = 'public partial' if is_partial else 'public'
+            with self.class_(class_name, access=access):
                 self._generate_encoder_decoder_instance(class_name)
 
                 with self.doc_comment():
@@ -1761,6 +2463,9 @@ class _CSharpGenerator(CodeGenerator):
                 # generate type helper properties
                 self._generate_union_is_as_properties(union)
 
+                # generate tag enum and visitor dispatch
+                self._generate_union_tag_and_visitor(union)
+
                 # Emit private encoder class for the union.
                 self._generate_union_encoder(union, class_name)
 
@@ -1768,8 +2473,26 @@ class _CSharpGenerator(CodeGenerator):
                 self._generate_union_decoder(union, class_name)
 
                 # generate types for each union field
-                for field in self._get_union_fields(union):
-                    self._generate_union_field_type(field, class_name)
+                if not is_partial:
+                    for field in self._get_union_fields(union):
+                        self._generate_union_field_type(field, class_name, names)
+
+    def _generate_union_shard(self, union, fields):
+        """
+        Generates a part of a partial union class containing the inner types
+        for a subset of the union fields.
+
+        Args:
+            union (stone.data_type.Union): The union in question.
+            fields (list of stone.data_type.UnionField): The fields in this shard.
+        """
+        names = self._get_union_member_names(union)
+        union_field_names = [self._public_name(f.name) for f in self._get_union_fields(union)]
+        with self._local_names(union_field_names + [names.tags, names.visitor]):
+            class_name = self._public_name(union.name)
+            with self.class_(class_name, access='public partial'):
+                for field in fields:
+                    self._generate_union_field_type(field, class_name, names)
 
     def _generate_routes(self, ns):
         """
@@ -1816,6 +2539,13 @@ class _CSharpGenerator(CodeGenerator):
 
                         for route in routes:
                             self._generate_route(ns, route)
+                            if id(route) in self._batch_route_pairs:
+                                self._generate_route_aggregator(
+                                    ns, route, self._batch_route_pairs[id(route)])
+                            if id(route) in self._ranged_download_route_ids:
+                                self._generate_route_ranged_download(ns, route)
+                            if id(route) in self._upload_skip_route_ids:
+                                self._generate_route_upload_skip(ns, route)
 
     def _generate_route(self, ns, route):
         """
@@ -1945,6 +2675,10 @@ class _CSharpGenerator(CodeGenerator):
             self.emit()
             self.emit('return enc.Util.ToApm(task, callback, state);')
 
+        streamed_field = self._get_streamed_list_field(route.result_data_type)
+        if route_style == 'rpc' and streamed_field:
+            self._generate_route_streaming_overload(ns, route, streamed_field)
+
         if len(ctor_args) > (1 if route_style == 'upload' else 0):
             arg_list = [item.arg for item in ctor_args]
             arg_name_list = [item.name for item in ctor_args]
@@ -2046,6 +2780,291 @@ class _CSharpGenerator(CodeGenerator):
                 self.emit()
                 self.emit('return task.Result;')
     
+    def _generate_route_streaming_overload(self, ns, route, field):
+        """
+        Generates the *Async overload of an RPC route that passes the items of
+        a list field in the result to a callback as they are decoded, rather
+        than collecting the whole list in memory.
+
+        Args:
+            ns (stone.api.ApiNamespace): The namespace of the route.
+            route (stone.api.ApiRoute): The route in question.
+            field (stone.data_type.Field): The streamed list field of the result.
+        """
+        public_name = self._public_name(route.name)
+        async_name = '{0}Async'.format(public_name)
+        auth_type = route.attrs.get('auth', 'user')
+
+        arg_type = self._typename(route.arg_data_type, void='enc.Empty')
+        arg_is_void = is_void_type(route.arg_data_type)
+        arg_name = (self._arg_name(route.arg_data_type.name) if
+                    is_user_defined_type(route.arg_data_type) else 'request')
+        result_type = self._typename(route.result_data_type, is_response=True)
+        error_type = self._typename(route.error_data_type, void='enc.Empty')
+        error_is_void = is_void_type(route.error_data_type)
+
+        data_type, _, _ = self._parse_data_type(field.data_type)
+        item_type = self._typename(data_type, is_property=True)
+        field_public_name = self._public_name(field.name)
+
+        route_args = []
+        if not arg_is_void:
+            route_args.append('{0} {1}'.format(arg_type, arg_name))
+        route_args.append('sys.Action<{0}> onItem'.format(item_type))
+
+        self.emit()
+        with self.doc_comment():
+            self.emit_summary(route.doc or 'The {0} route'.format(self._name_words(route.name)))
+            if not arg_is_void:
+                self.emit_xml('The request parameters', 'param', name=arg_name)
+            self.emit_xml('Called with each item of <see cref="{0}.{1}"/> as it is decoded '
+                          'from the response.'.format(result_type, field_public_name),
+                          'param', name='onItem')
+            self.emit_xml('The task that represents the asynchronous send operation. '
+                          'The TResult parameter contains the response from the server, '
+                          'with an empty <see cref="{0}.{1}"/> list.'.format(result_type, field_public_name),
+                          'returns')
+            if not error_is_void:
+                self.emit_xml('Thrown if there is an error processing the request; '
+                              'This will contain a <see cref="{0}"/>.'.format(error_type),
+                              'exception', cref='{1}.ApiException{{TError}}'.format(error_type, self._namespace_name))
+            self.emit_xml('The items are not collected, so memory use does not grow with '
+                          'the size of the page. The callback runs on the thread that '
+                          'decodes the response.', 'remarks')
+
+        self._generate_obsolete_attribute(route.deprecated, suffix='Async')
+        with self.cs_block(before='public t.Task<{0}> {1}({2})'.format(
+                result_type, async_name, ', '.join(route_args))):
+            args = [
+                'enc.Empty.Instance' if arg_is_void else arg_name,
+                '"{0}"'.format(route.attrs.get('host', 'api')),
+                '"/{0}/{1}"'.format(ns.name, route.name),
+                '"{0}"'.format(auth_type),
+                self._get_encoder(route.arg_data_type),
+                '{0}.CreateStreamingDecoder(onItem)'.format(
+                    self._typename(route.result_data_type, include_namespace=True)),
+                self._get_decoder(route.error_data_type),
+            ]
+
+            self.emit('return this.Transport.SendRpcRequestAsync<{0}>({1});'.format(
+                ', '.join((arg_type, result_type, error_type)),
+                ', '.join(args)))
+
+    def _generate_route_aggregator(self, ns, route, batch):
+        """
+        Generates the factory for an aggregator that sends concurrent calls to
+        a route as calls to its batch route.
+
+        Args:
+            ns (stone.api.ApiNamespace): The namespace of the routes.
+            route (stone.api.ApiRoute): The single route.
+            batch (stone.api.ApiRoute): The batch route.
+        """
+        public_name = self._public_name(route.name)
+        batch_public_name = self._public_name(batch.name)
+
+        item_field = route.arg_data_type.all_fields[0]
+        item_type = self._typename(item_field.data_type, is_property=True)
+        result_type = self._typename(route.result_data_type, is_response=True)
+        aggregator_type = '{0}.BatchAggregator<{1}, {2}>'.format(
+            self._namespace_name, item_type, result_type)
+
+        list_type = batch.arg_data_type.all_fields[0].data_type
+        max_items = list_type.max_items or self._default_batch_size
+
+        self.emit()
+        with self.doc_comment():
+            self.emit_summary('Creates an aggregator that sends concurrent calls to the {0} '
+                              'route as calls to the {1} route.'.format(
+                                  self._name_words(route.name), self._name_words(batch.name)))
+            self.emit_xml('How long to wait for more calls before sending a batch. A batch '
+                          'is sent straight away once it has {0} items.'.format(max_items),
+                          'param', name='window')
+            self.emit_xml('The aggregator.', 'returns')
+            self.emit_xml('If the batch route rejects a batch, each call in it is sent to '
+                          'the {0} route on its own, so callers get the result or error of '
+                          'their own call.'.format(self._name_words(route.name)), 'remarks')
+
+        self._generate_obsolete_attribute(route.deprecated, prefix='Create', suffix='Aggregator')
+        with self.cs_block(before='public {0} Create{1}Aggregator(sys.TimeSpan window)'.format(
+                aggregator_type, public_name)):
+            self.emit('return new {0}('.format(aggregator_type))
+            with self.indent():
+                self.emit('async items =>')
+                with self.cs_block(after=','):
+                    send = 'return await this.{0}Async(new {1}(items)).ConfigureAwait(false);'.format(
+                        batch_public_name, self._typename(batch.arg_data_type))
+                    if is_void_type(batch.error_data_type):
+                        self.emit(send)
+                    else:
+                        with self.cs_block(before='try'):
+                            self.emit(send)
+                        with self.cs_block(before='catch ({0}.ApiException<{1}>)'.format(
+                                self._namespace_name, self._typename(batch.error_data_type))):
+                            self.emit('return null;')
+                self.emit('item => this.{0}Async(new {1}(item)),'.format(
+                    public_name, self._typename(route.arg_data_type)))
+                self.emit('{0},'.format(max_items))
+                self.emit('window);')
+
+    def _generate_route_ranged_download(self, ns, route):
+        """
+        Generates the method that downloads the content of a download route
+        to a file in parallel byte ranges.
+
+        The method is only available in the full framework build, which has
+        file access.
+
+        Args:
+            ns (stone.api.ApiNamespace): The namespace of the route.
+            route (stone.api.ApiRoute): The route in question.
+        """
+        public_name = self._public_name(route.name)
+        auth_type = route.attrs.get('auth', 'user')
+
+        arg_type = self._typename(route.arg_data_type, void='enc.Empty')
+        arg_is_void = is_void_type(route.arg_data_type)
+        arg_name = (self._arg_name(route.arg_data_type.name) if
+                    is_user_defined_type(route.arg_data_type) else 'request')
+        result_type = self._typename(route.result_data_type, is_response=True)
+        error_type = self._typename(route.error_data_type, void='enc.Empty')
+        error_is_void = is_void_type(route.error_data_type)
+        size_field, hash_field = self._get_content_fields(route)
+        revision_field = self._get_revision_field(route)
+
+        route_args = []
+        if not arg_is_void:
+            route_args.append('{0} {1}'.format(arg_type, arg_name))
+        route_args.append('string path')
+        route_args.append('int parallelism = 4')
+
+        self.emit()
+        self.emit_raw('#if !PORTABLE && !PORTABLE40\n')
+        with self.doc_comment():
+            self.emit_summary('Downloads the content of the {0} route to a file, several '
+                              'byte ranges at a time.'.format(self._name_words(route.name)))
+            if not arg_is_void:
+                self.emit_xml('The request parameters', 'param', name=arg_name)
+            self.emit_xml('The path of the file to write, which is created or overwritten.',
+                          'param', name='path')
+            self.emit_xml('The number of ranges downloaded at a time.', 'param', name='parallelism')
+            self.emit_xml('The task that represents the asynchronous download. The TResult '
+                          'parameter contains the response from the server.', 'returns')
+            if not error_is_void:
+                self.emit_xml('Thrown if there is an error processing the request; '
+                              'This will contain a <see cref="{0}"/>.'.format(error_type),
+                              'exception', cref='{1}.ApiException{{TError}}'.format(error_type, self._namespace_name))
+            if hash_field is not None:
+                self.emit_xml('The downloaded content does not match the content hash '
+                              'reported by the server.', 'exception', cref='io.InvalidDataException')
+            self.emit_xml('The ranges that completed are recorded next to the file, so '
+                          'calling this method again after a failure only downloads the '
+                          'missing ranges.', 'remarks')
+
+        self._generate_obsolete_attribute(route.deprecated, suffix='ToFileAsync')
+        with self.cs_block(before='public t.Task<{0}> {1}ToFileAsync({2})'.format(
+                result_type, public_name, ', '.join(route_args))):
+            args = [
+                'enc.Empty.Instance' if arg_is_void else arg_name,
+                'offset',
+                'length',
+                '"{0}"'.format(route.attrs.get('host', 'api')),
+                '"/{0}/{1}"'.format(ns.name, route.name),
+                '"{0}"'.format(auth_type),
+                self._get_encoder(route.arg_data_type),
+                self._get_decoder(route.result_data_type),
+                self._get_decoder(route.error_data_type),
+            ]
+
+            self.emit('return enc.RangedDownloader.DownloadToFileAsync(')
+            with self.indent():
+                self.emit('(offset, length) => this.Transport.SendDownloadRangeRequestAsync<{0}>({1}),'.format(
+                    ', '.join((arg_type, result_type, error_type)), ', '.join(args)))
+                self.emit('response => response.{0},'.format(self._public_name(size_field.name)))
+                if hash_field is not None:
+                    self.emit('response => response.{0},'.format(self._public_name(hash_field.name)))
+                    self.emit('null,')
+                elif revision_field is None:
+                    self.emit('null,')
+                    self.emit('null,')
+                elif is_string_type(revision_field.data_type):
+                    self.emit('null,')
+                    self.emit('response => response.{0},'.format(self._public_name(revision_field.name)))
+                else:
+                    self.emit('null,')
+                    self.emit('response => response.{0}.ToString("o", sys.Globalization.CultureInfo.InvariantCulture),'.format(
+                        self._public_name(revision_field.name)))
+                self.emit('path,')
+                self.emit('parallelism);')
+        self.emit_raw('#endif\n')
+
+    def _generate_route_upload_skip(self, ns, route):
+        """
+        Generates the method that uploads to an upload route unless the body
+        matches the metadata of the file already on the server.
+
+        The method is only available in the full framework build, which has
+        SHA-256.
+
+        Args:
+            ns (stone.api.ApiNamespace): The namespace of the route.
+            route (stone.api.ApiRoute): The route in question.
+        """
+        public_name = self._public_name(route.name)
+
+        arg_type = self._typename(route.arg_data_type, void='enc.Empty')
+        arg_is_void = is_void_type(route.arg_data_type)
+        arg_name = (self._arg_name(route.arg_data_type.name) if
+                    is_user_defined_type(route.arg_data_type) else 'request')
+        result_type = self._typename(route.result_data_type, is_response=True)
+        error_type = self._typename(route.error_data_type, void='enc.Empty')
+        error_is_void = is_void_type(route.error_data_type)
+        size_field, hash_field = self._get_content_fields(route)
+
+        route_args = []
+        if not arg_is_void:
+            route_args.append('{0} {1}'.format(arg_type, arg_name))
+        route_args.append('io.Stream body')
+        route_args.append('{0} existing'.format(result_type))
+
+        self.emit()
+        self.emit_raw('#if !PORTABLE && !PORTABLE40\n')
+        with self.doc_comment():
+            self.emit_summary('Sends the body to the {0} route unless its content hash matches '
+                              'the file already on the server.'.format(self._name_words(route.name)))
+            if not arg_is_void:
+                self.emit_xml('The request parameters', 'param', name=arg_name)
+            self.emit_xml('The document to upload', 'param', name='body')
+            self.emit_xml('The metadata of the file on the server, for example from a '
+                          'listing made earlier, or <c>null</c> if there is none.',
+                          'param', name='existing')
+            self.emit_xml('The task that represents the asynchronous send operation. The '
+                          'TResult parameter contains <paramref name="existing"/> if the body '
+                          'is unchanged, otherwise the response from the server.', 'returns')
+            if not error_is_void:
+                self.emit_xml('Thrown if there is an error processing the request; '
+                              'This will contain a <see cref="{0}"/>.'.format(error_type),
+                              'exception', cref='{1}.ApiException{{TError}}'.format(error_type, self._namespace_name))
+            self.emit_xml('The server reported a different content hash than the content '
+                          'read from the body.', 'exception', cref='io.InvalidDataException')
+            self.emit_xml('The body is only hashed before the upload when it can seek and has '
+                          'the size of the existing file. Otherwise it is hashed as it is '
+                          'uploaded, so it is read once.', 'remarks')
+
+        self._generate_obsolete_attribute(route.deprecated, suffix='IfChangedAsync')
+        with self.cs_block(before='public t.Task<{0}> {1}IfChangedAsync({2})'.format(
+                result_type, public_name, ', '.join(route_args))):
+            upload_args = [] if arg_is_void else [arg_name]
+            upload_args.append('stream')
+            self.emit('return enc.UploadSkipper.UploadIfChangedAsync(')
+            with self.indent():
+                self.emit('body,')
+                self.emit('existing,')
+                self.emit('stream => this.{0}Async({1}),'.format(public_name, ', '.join(upload_args)))
+                self.emit('response => response.{0},'.format(self._public_name(size_field.name)))
+                self.emit('response => response.{0});'.format(self._public_name(hash_field.name)))
+        self.emit_raw('#endif\n')
+
     def _generate_obsolete_attribute(self, deprecated, prefix='', suffix=''):
         """
         Generate obsolete attribute for deprecated route.
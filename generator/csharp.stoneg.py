@@ -5,7 +5,7 @@ import imp
 import os
 
 try:
-    from csproj import make_csproj_file
+    from csproj import make_csproj_file, make_sdk_csproj_file
     from csharp import _CSharpGenerator
 except ImportError:
     # The stone generate calls imp.load_source on this file, which precludes
@@ -14,6 +14,7 @@ except ImportError:
     csproj = os.path.join(os.path.dirname(__file__), 'csproj.py')
     csproj_module = imp.load_source('csproj_module', csproj)
     make_csproj_file = csproj_module.make_csproj_file
+    make_sdk_csproj_file = csproj_module.make_sdk_csproj_file
     csharp = os.path.join(os.path.dirname(__file__), 'csharp.py')
     csharp_module = imp.load_source('csharp_module', csharp)
     _CSharpGenerator = csharp_module._CSharpGenerator
@@ -23,6 +24,67 @@ Generate .NET project for Dropbox Api.
 """
 
 _cmdline_parser = argparse.ArgumentParser(description=cmdline_desc)
+_cmdline_parser.add_argument(
+    '--sdk-csproj',
+    action='store_true',
+    help='Emit a single SDK-style project that multi-targets net45 and the two portable '
+         'profiles instead of the separate Net45/Portable/Portable40 projects.',
+)
+_cmdline_parser.add_argument(
+    '--union-shard-size',
+    type=int,
+    default=0,
+    help='Emit unions with more than this many variants as partial classes, with the '
+         'variant types split across files of at most this many variants each. '
+         'Zero (the default) keeps every union in a single file.',
+)
+_cmdline_parser.add_argument(
+    '--lazy-fields',
+    action='append',
+    default=[],
+    help='Comma separated struct fields, as namespace.Struct.field, that are kept as raw '
+         'json when decoded and only decoded on first access. Can be repeated.',
+)
+_cmdline_parser.add_argument(
+    '--cacheable-routes',
+    action='append',
+    default=[],
+    help='Comma separated read only routes, as namespace/route, whose responses may be '
+         'kept in the client side response cache. Routes with a true cacheable attribute '
+         'are included as well. Can be repeated.',
+)
+_cmdline_parser.add_argument(
+    '--idempotent-routes',
+    action='append',
+    default=[],
+    help='Comma separated routes, as namespace/route, that can be sent any number of '
+         'times with the same effect, so identical concurrent calls may share one request. '
+         'Routes with a true idempotent attribute are included as well. Can be repeated.',
+)
+_cmdline_parser.add_argument(
+    '--batch-routes',
+    action='append',
+    default=[],
+    help='Comma separated pairs of routes, as namespace/route=namespace/batch_route, that '
+         'get an aggregator sending concurrent calls to the first route as calls to the '
+         'second. Can be repeated.',
+)
+_cmdline_parser.add_argument(
+    '--ranged-download-routes',
+    action='append',
+    default=[],
+    help='Comma separated download routes, as namespace/route, that get a method which '
+         'downloads the content to a file in parallel byte ranges and resumes the missing '
+         'ranges after a failure. Can be repeated.',
+)
+_cmdline_parser.add_argument(
+    '--upload-skip-routes',
+    action='append',
+    default=[],
+    help='Comma separated upload routes, as namespace/route, that get a method which skips '
+         'the upload when the content hash of the body matches the metadata of the file '
+         'already on the server. Can be repeated.',
+)
 
 
 class DropboxCSharpGenerator(_CSharpGenerator):
@@ -33,6 +95,22 @@ class DropboxCSharpGenerator(_CSharpGenerator):
 
     def __init__(self, *args, **kwargs):
         super(DropboxCSharpGenerator, self).__init__(self.DEFAULT_NAMESPACE, self.DEFAULT_APP_NAME, *args, **kwargs)
+        self._union_shard_size = self.args.union_shard_size
+        self._lazy_fields = set(name.strip() for value in self.args.lazy_fields
+                                for name in value.split(',') if name.strip())
+        self._cacheable_routes = set(name.strip() for value in self.args.cacheable_routes
+                                     for name in value.split(',') if name.strip())
+        self._idempotent_routes = set(name.strip() for value in self.args.idempotent_routes
+                                      for name in value.split(',') if name.strip())
+        for value in self.args.batch_routes:
+            for pair in value.split(','):
+                if pair.strip():
+                    single, _, batch = pair.partition('=')
+                    self._batch_routes[single.strip()] = batch.strip()
+        self._ranged_download_routes = set(name.strip() for value in self.args.ranged_download_routes
+                                           for name in value.split(',') if name.strip())
+        self._upload_skip_routes = set(name.strip() for value in self.args.upload_skip_routes
+                                       for name in value.split(',') if name.strip())
 
     def _generate(self, api):
         self.emit_summary('An HTTP exception that is caused by the server '
@@ -90,18 +168,30 @@ class DropboxCSharpGenerator(_CSharpGenerator):
 
     def _generate_csproj(self):
         """
-        Generates two csproj files.
+        Generates the csproj files.
 
-        One is a portable assembly - this is the assembly that is intended to
-        be distributed; the other is a regular desktop .Net assembly that is
-        used to generate documentation - the documentation tool SandCastle
-        cannot reliably generate documentation from a portable assembly.
+        By default one project is generated per target: the portable
+        assemblies and the regular desktop .Net assembly that are intended
+        to be distributed, and a desktop assembly that is used to generate
+        documentation - the documentation tool SandCastle cannot reliably
+        generate documentation from a portable assembly.
+
+        With --sdk-csproj the distributed targets are instead folded into a
+        single SDK-style, multi-targeted project; the documentation project
+        is still generated separately.
         """
         files = [f for f in self._generated_files if f.endswith('.cs')]
-        modes = [('Portable', '.Portable'),
-                 ('Portable40', '.Portable40'),
-                 ('Net45', ''),
-                 ('Doc', '.Doc')]
+
+        if self.args.sdk_csproj:
+            with self.output_to_relative_path(
+                    '{0}.csproj'.format(self.DEFAULT_NAMESPACE), folder=''):
+                self.emit_raw(make_sdk_csproj_file())
+            modes = [('Doc', '.Doc')]
+        else:
+            modes = [('Portable', '.Portable'),
+                     ('Portable40', '.Portable40'),
+                     ('Net45', ''),
+                     ('Doc', '.Doc')]
 
         for mode, suffix in modes:
             with self.output_to_relative_path(
@@ -12,20 +12,41 @@ COMPILE_INCLUDES = [
     "Stone\\IJsonReader.cs",
     "Stone\\IJsonWriter.cs",
     "Stone\\ITransport.cs",
+    "Stone\\DownloadResponseExtensions.cs",
     "Stone\\JsonReader.cs",
     "Stone\\JsonWriter.cs",
     "ApiException.cs",
     "StructuredException.cs",
     "Stone\\Util.cs",
+    "Stone\\Utf8BufferWriter.cs",
+    "Stone\\BufferPool.cs",
+    "Stone\\RouteTraits.cs",
+    "Stone\\VariantCodec.cs",
+    "Stone\\LazyValue.cs",
+    "Stone\\RangedDownloader.cs",
+    "Stone\\HashingStream.cs",
+    "Stone\\UploadSkipper.cs",
     "DropboxCertHelper.cs",
+    "BatchAggregator.cs",
     "DropboxClient.cs",
     "DropboxClientBase.cs",
     "DropboxAppClient.cs",
     "DropboxTeamClient.cs",
     "DropboxClientConfig.cs",
+    "DropboxContentHasher.cs",
     "DropboxException.cs",
     "DropboxOauth2Helper.cs",
     "DropboxRequestHandler.cs",
+    "RequestCoalescer.cs",
+    "RateLimiter.cs",
+    "HedgingPolicy.cs",
+    "HostSettings.cs",
+    "HttpClientPool.cs",
+    "ListFolderIndex.cs",
+    "FolderTreeWalker.cs",
+    "FolderWalkProgress.cs",
+    "LongpollWatcher.cs",
+    "ResponseCache.cs",
     "AppProperties\\AssemblyInfo.cs",
 ]
 
@@ -332,6 +353,64 @@ DOC_CSPROJ_END_BLOCK = r"""  <ItemGroup>
 </Project>
 """
 
+SDK_CSPROJ_START_BLOCK = r"""<Project Sdk="MSBuild.Sdk.Extras/1.6.68">
+  <PropertyGroup>
+    <TargetFrameworks>net45;portable-net45+win8+wpa81;portable-net40+sl5+wp80+win8+wpa81</TargetFrameworks>
+    <RootNamespace>Dropbox.Api</RootNamespace>
+    <AssemblyName>Dropbox.Api</AssemblyName>
+    <AppDesignerFolder>AppProperties</AppDesignerFolder>
+    <GenerateAssemblyInfo>false</GenerateAssemblyInfo>
+    <EnableDefaultCompileItems>false</EnableDefaultCompileItems>
+    <EnableDefaultNoneItems>false</EnableDefaultNoneItems>
+    <GenerateDocumentationFile>true</GenerateDocumentationFile>
+    <TreatWarningsAsErrors>false</TreatWarningsAsErrors>
+    <NoWarn>419</NoWarn>
+    <AppendTargetFrameworkToOutputPath>false</AppendTargetFrameworkToOutputPath>
+  </PropertyGroup>
+  <PropertyGroup Condition=" '$(Configuration)' == 'Debug' ">
+    <RunCodeAnalysis>true</RunCodeAnalysis>
+  </PropertyGroup>
+  <PropertyGroup Condition=" '$(TargetFramework)' == 'net45' ">
+    <OutputPath>bin\$(Configuration)\net45\</OutputPath>
+  </PropertyGroup>
+  <PropertyGroup Condition=" '$(TargetFramework)' == 'portable-net45+win8+wpa81' ">
+    <TargetFrameworkIdentifier>.NETPortable</TargetFrameworkIdentifier>
+    <TargetFrameworkVersion>v4.5</TargetFrameworkVersion>
+    <TargetFrameworkProfile>Profile111</TargetFrameworkProfile>
+    <DefineConstants>$(DefineConstants);PORTABLE</DefineConstants>
+    <OutputPath>bin\$(Configuration)\portable\</OutputPath>
+  </PropertyGroup>
+  <PropertyGroup Condition=" '$(TargetFramework)' == 'portable-net40+sl5+wp80+win8+wpa81' ">
+    <TargetFrameworkIdentifier>.NETPortable</TargetFrameworkIdentifier>
+    <TargetFrameworkVersion>v4.0</TargetFrameworkVersion>
+    <TargetFrameworkProfile>Profile344</TargetFrameworkProfile>
+    <DefineConstants>$(DefineConstants);PORTABLE40</DefineConstants>
+    <OutputPath>bin\$(Configuration)\portable40\</OutputPath>
+  </PropertyGroup>
+  <ItemGroup>
+    <PackageReference Include="Newtonsoft.Json" Version="7.0.1" />
+  </ItemGroup>
+  <ItemGroup Condition=" '$(TargetFramework)' == 'net45' ">
+    <Reference Include="System.Net.Http" />
+  </ItemGroup>
+  <ItemGroup Condition=" '$(TargetFramework)' == 'portable-net40+sl5+wp80+win8+wpa81' ">
+    <PackageReference Include="Microsoft.Bcl.Async" Version="1.0.168" />
+    <PackageReference Include="Microsoft.Net.Http" Version="2.2.29" />
+  </ItemGroup>
+"""
+
+SDK_CSPROJ_END_BLOCK = r"""</Project>
+"""
+
+# Globs used by the SDK-style project. MSBuild expands these once per
+# evaluation instead of parsing one item per generated file.
+SDK_COMPILE_GLOBS = [
+    "*.cs",
+    "AppProperties\\*.cs",
+    "Stone\\*.cs",
+    "Generated\\**\\*.cs",
+]
+
 def _include_items(buf, item_type, paths):
     buf.write('  <ItemGroup>\n')
     for path in paths:
@@ -370,3 +449,28 @@ def make_csproj_file(files, mode):
     buf.write(end)
 
     return buf.getvalue()
+
+
+def make_sdk_csproj_file():
+    """
+    Returns a single SDK-style project that multi-targets all of the
+    supported frameworks.
+
+    The Net45, Portable and Portable40 variants are folded into one project
+    as target frameworks, so a single (parallel) MSBuild invocation builds
+    all of them from one evaluation. Source files are picked up by glob, so
+    the generated file list does not need to be passed in.
+
+    The portable targets keep the PCL profiles of the per-target projects,
+    which the plain .NET SDK cannot build, hence MSBuild.Sdk.Extras. Each
+    target builds into the same bin folder as its per-target project did,
+    so Dropbox.Api.nuspec packs either layout unchanged.
+    """
+    buf = StringIO()
+    buf.write(SDK_CSPROJ_START_BLOCK)
+
+    _include_items(buf, 'Compile', SDK_COMPILE_GLOBS)
+
+    buf.write(SDK_CSPROJ_END_BLOCK)
+
+    return buf.getvalue()